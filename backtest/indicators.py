@@ -2,18 +2,49 @@
 """
 Module contenant tous les indicateurs techniques
 """
+import numpy as np
 import pandas as pd
 
+try:
+    from numba import njit
+except ImportError:  # numba optionnel : la boucle tourne alors en Python pur
+    njit = None
+
+def _wilder_rsi_py(close, period):
+    """RSI de Wilder en une passe (identique à ewm(alpha=1/period, adjust=False) sur gains/pertes)"""
+    n = close.shape[0]
+    rsi = np.empty(n)
+    alpha = 1.0 / period
+    avg_gain = 0.0
+    avg_loss = 0.0
+    
+    for i in range(n):
+        gain = 0.0
+        loss = 0.0
+        if i > 0:
+            delta = close[i] - close[i - 1]
+            if delta > 0:
+                gain = delta
+            elif delta < 0:
+                loss = -delta
+            avg_gain = (1.0 - alpha) * avg_gain + alpha * gain
+            avg_loss = (1.0 - alpha) * avg_loss + alpha * loss
+        
+        if avg_loss > 0:
+            rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        elif avg_gain > 0:
+            rsi[i] = 100.0  # Aucune perte : RS infini
+        else:
+            rsi[i] = np.nan  # Ni gain ni perte : RS indéfini
+    return rsi
+
+# Compilé en code machine si numba est disponible (cache disque entre les lancements)
+_wilder_rsi = njit(cache=True)(_wilder_rsi_py) if njit is not None else _wilder_rsi_py
+
 def calculate_rsi(series, period):
     """Calcule le RSI pour une série de prix donnée"""
-    delta = series.diff()
-    gain = delta.where(delta > 0, 0.0)
-    loss = -delta.where(delta < 0, 0.0)
-    avg_gain = gain.ewm(alpha=1/period, adjust=False).mean()
-    avg_loss = loss.ewm(alpha=1/period, adjust=False).mean()
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+    values = _wilder_rsi(series.to_numpy(dtype=np.float64), float(period))
+    return pd.Series(values, index=series.index, name=series.name)
 
 def compute_heikin_ashi(df):
     """Calcule les valeurs Heikin Ashi"""
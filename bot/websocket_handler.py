@@ -102,7 +102,7 @@ class BinanceWebSocketHandler:
         )
         
         # Démarrer dans un thread séparé
-        self.ws_thread = threading.Thread(target=self.ws.run_forever)
+        self.ws_thread = threading.Thread(target=self.ws.run_forever, kwargs={"skip_utf8_validation": True})
         self.ws_thread.daemon = True
         self.ws_thread.start()
     
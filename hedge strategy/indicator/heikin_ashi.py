@@ -0,0 +1,37 @@
+import math
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba optionnel : la boucle tourne alors en Python pur
+    njit = None
+
+def _ha_loop_py(o, h, l, c, seed_open, seed_close):
+    """
+    Heikin-Ashi d'une série de bougies (récurrence sur ha_open, non vectorisable)
+    
+    seed_open / seed_close : HA de la bougie précédant la série, NaN si aucune.
+    """
+    n = c.shape[0]
+    ha_open = np.empty(n)
+    ha_high = np.empty(n)
+    ha_low = np.empty(n)
+    ha_close = np.empty(n)
+    
+    prev_open = seed_open
+    prev_close = seed_close
+    for i in range(n):
+        ha_close[i] = (o[i] + h[i] + l[i] + c[i]) / 4
+        if math.isnan(prev_open) or math.isnan(prev_close):
+            ha_open[i] = (o[i] + c[i]) / 2
+        else:
+            ha_open[i] = (prev_open + prev_close) / 2
+        ha_high[i] = max(h[i], ha_open[i], ha_close[i])
+        ha_low[i] = min(l[i], ha_open[i], ha_close[i])
+        prev_open = ha_open[i]
+        prev_close = ha_close[i]
+    
+    return ha_open, ha_high, ha_low, ha_close
+
+# Compilé en code machine si numba est disponible (cache disque entre les lancements)
+ha_loop = njit(cache=True)(_ha_loop_py) if njit is not None else _ha_loop_py
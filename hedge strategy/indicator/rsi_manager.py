@@ -0,0 +1,80 @@
+import math
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba optionnel : le noyau tourne alors en Python pur
+    njit = None
+
+# Colonnes des paramètres RSI : période, alpha = 1/période et 1 - alpha (précalculés une fois)
+PERIOD, ALPHA, DECAY = 0, 1, 2
+
+# Colonnes de l'état RSI (une ligne par période)
+AVG_GAIN, AVG_LOSS, PREV_CLOSE, COUNT = 0, 1, 2, 3
+
+def _rsi_update_py(close_price, params, state, rsi_out):
+    """Intègre une clôture dans l'état RSI de Wilder (modifié en place) et écrit les RSI dans rsi_out"""
+    # Toutes les périodes voient la même série : variation, gain et perte calculés une seule fois
+    prev_close = state[0, PREV_CLOSE]
+    state[:, PREV_CLOSE] = close_price
+    if math.isnan(prev_close):
+        return
+    
+    delta = close_price - prev_close
+    gain = delta if delta > 0 else 0.0
+    loss = -delta if delta < 0 else 0.0
+    
+    for k in range(params.shape[0]):
+        period = params[k, PERIOD]
+        state[k, COUNT] += 1
+        count = state[k, COUNT]
+        
+        if count < period:
+            # Accumulation des premières variations
+            state[k, AVG_GAIN] += gain
+            state[k, AVG_LOSS] += loss
+            continue
+        
+        if count == period:
+            # Amorçage : moyenne simple des `period` premières variations
+            state[k, AVG_GAIN] = (state[k, AVG_GAIN] + gain) * params[k, ALPHA]
+            state[k, AVG_LOSS] = (state[k, AVG_LOSS] + loss) * params[k, ALPHA]
+        else:
+            state[k, AVG_GAIN] = state[k, AVG_GAIN] * params[k, DECAY] + gain * params[k, ALPHA]
+            state[k, AVG_LOSS] = state[k, AVG_LOSS] * params[k, DECAY] + loss * params[k, ALPHA]
+        
+        if state[k, AVG_LOSS] == 0:
+            rsi_out[k] = 100.0
+        else:
+            rs = state[k, AVG_GAIN] / state[k, AVG_LOSS]
+            rsi_out[k] = 100 - 100 / (1 + rs)
+
+def _rsi_seed_py(close_prices, params, state, rsi_out):
+    """Intègre un historique de clôtures (amorçage) en un seul appel"""
+    for i in range(close_prices.shape[0]):
+        rsi_update(close_prices[i], params, state, rsi_out)
+
+# Compilés en code machine si numba est disponible (cache disque entre les lancements)
+if njit is not None:
+    rsi_update = njit(cache=True)(_rsi_update_py)
+    rsi_seed = njit(cache=True)(_rsi_seed_py)
+else:
+    rsi_update = _rsi_update_py
+    rsi_seed = _rsi_seed_py
+
+def create_rsi_state(periods):
+    """
+    Prépare les tableaux du RSI incrémental
+    
+    Returns:
+        tuple: (paramètres (n, 3), état (n, 4), RSI courants à NaN tant que non amorcés)
+    """
+    periods = np.array(periods, dtype=np.float64)
+    params = np.empty((len(periods), 3))
+    params[:, PERIOD] = periods
+    params[:, ALPHA] = 1.0 / periods
+    params[:, DECAY] = 1.0 - params[:, ALPHA]
+    
+    state = np.zeros((len(periods), 4))
+    state[:, PREV_CLOSE] = np.nan
+    return params, state, np.full(len(periods), np.nan)
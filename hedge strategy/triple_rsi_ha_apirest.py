@@ -1,17 +1,122 @@
+import atexit
 import json
+import logging
+import math
+import queue
+import random
+import sys
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import pandas as pd
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 import numpy as np
-from ta.momentum import RSIIndicator
+from indicator.heikin_ashi import ha_loop
+from indicator.rsi_manager import create_rsi_state, rsi_seed, rsi_update
+
+# Flux kline WebSocket (websocket-client) ; sans lui on retombe sur le polling REST
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson optionnel : json standard (accepte aussi les bytes)
+    _json_loads = json.loads
+
+# Champ "x" (bougie fermée) tel qu'il apparaît dans le JSON compact des trames kline Binance
+_CLOSED_MARKER = '"x":true'
+_CLOSED_MARKER_BYTES = _CLOSED_MARKER.encode()
+
+try:
+    from numba import njit
+except ImportError:  # numba optionnel : le noyau tourne alors en Python pur
+    njit = None
+
+logger = logging.getLogger("trading.candle")
+_log_listener = None
+
+def start_log_listener():
+    """
+    Sortie console du logger par un thread dédié (QueueHandler -> QueueListener)
+    
+    Sans effet si déjà démarré ou si l'application a configuré ses propres handlers.
+    """
+    global _log_listener
+    if _log_listener is not None or logger.handlers:
+        return
+    
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    _log_listener = QueueListener(log_queue, stream_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)  # vide la file avant la sortie
+    
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+def create_http_session(pool_size=4):
+    """Session HTTP keep-alive avec pool de connexions et retries sur 429/5xx"""
+    session = requests.Session()
+    session.headers.update({"Connection": "keep-alive", "Accept-Encoding": "gzip"})
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        # raise_on_status=False : après les retries la dernière réponse (et son Retry-After) est rendue
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+# Durée des unités d'intervalle Binance alignées sur l'epoch ('w' et 'M' ne le sont pas)
+_INTERVAL_UNIT_MS = {'s': 1000, 'm': 60_000, 'h': 3_600_000, 'd': 86_400_000}
+
+def _ha_rsi_step_py(open_price, high_price, low_price, close_price, prev_ha_open, prev_ha_close, rsi_params, state, rsi_out):
+    """Heikin-Ashi de la bougie puis mise à jour RSI ; prev_ha_* à NaN pour la première bougie"""
+    ha_close = (open_price + high_price + low_price + close_price) / 4
+    if math.isnan(prev_ha_open) or math.isnan(prev_ha_close):
+        ha_open = (open_price + close_price) / 2
+    else:
+        ha_open = (prev_ha_open + prev_ha_close) / 2
+    ha_high = max(high_price, ha_open, ha_close)
+    ha_low = min(low_price, ha_open, ha_close)
+    
+    rsi_update(close_price, rsi_params, state, rsi_out)
+    return ha_open, ha_high, ha_low, ha_close
+
+# Compilé en code machine si numba est disponible (cache disque entre les lancements)
+_ha_rsi_step = njit(cache=True)(_ha_rsi_step_py) if njit is not None else _ha_rsi_step_py
+
+def warm_up_kernels():
+    """Compile (ou recharge du cache) les noyaux numba avant la première bougie live"""
+    if njit is None:
+        return
+    params, state, rsi_out = create_rsi_state((5,))
+    _ha_rsi_step(1.0, 1.0, 1.0, 1.0, np.nan, np.nan, params, state, rsi_out)
+
+@lru_cache(maxsize=4096)
+def _rsi_signal_str(rsi_tenths, label):
+    """Libellé RSI mis en cache par dixième de point (au plus ~1000 chaînes distinctes par libellé)"""
+    return f"{label} ({rsi_tenths / 10:.1f})"
 
 class CandleColorDetectorREST:
-    def __init__(self, symbol="btcusdt", interval="1m", callback=None, market_type="futures", poll_interval=5):
+    def __init__(self, symbol="btcusdt", interval="1m", callback=None, market_type="futures", poll_interval=5, session=None):
         self.symbol = symbol.lower()
+        self._symbol_upper = self.symbol.upper()  # forme attendue par l'API, calculée une fois
         self.interval = interval
         self.callback = callback
         self.market_type = market_type.lower()  # "spot" ou "futures"
+        self._market_type_upper = self.market_type.upper()  # affichage, calculé une fois
         self.poll_interval = poll_interval  # Intervalle de polling en secondes
         self.running = False
         
@@ -19,13 +124,37 @@ class CandleColorDetectorREST:
         if self.market_type == "futures":
             self.api_base_url = "https://fapi.binance.com"
             self.klines_endpoint = "/fapi/v1/klines"
+            self.ws_base_url = "wss://fstream.binance.com"
         else:
             self.api_base_url = "https://api.binance.com"
             self.klines_endpoint = "/api/v3/klines"
+            self.ws_base_url = "wss://stream.binance.com:9443"
+        
+        # WebSocket kline : reconnexion exponentielle et rotation avant la coupure Binance des 24h
+        self.ws = None
+        self.reconnect_delay = 1
+        self.max_reconnect_delay = 60
+        self.session_max_age = 23 * 3600  # secondes
+        
+        # Polling REST aligné sur la fermeture des bougies (None : intervalle fixe poll_interval)
+        try:
+            self.interval_ms = int(self.interval[:-1]) * _INTERVAL_UNIT_MS[self.interval[-1]]
+        except (KeyError, ValueError):
+            self.interval_ms = None
+        self.close_delay_ms = 300  # marge après la fermeture avant d'interroger l'API
+        
+        # Attente imposée par l'API (en-tête Retry-After d'une réponse 429/418), en secondes
+        self.retry_after = None
+        self.max_error_backoff = 60  # secondes
+        
+        # Session HTTP réutilisée (keep-alive) : évite une poignée de main TCP+TLS à chaque poll
+        # (peut être partagée entre plusieurs détecteurs, cf. monitor_multiple_pairs_rest)
+        self.session = session if session is not None else create_http_session()
         
         # Stockage des prix pour calculs RSI
-        self.prices = []
         self.max_history = 50  # Garde les 50 derniers prix
+        self.bootstrap_limit = 1000  # Bougies d'amorçage (maximum Binance) : RSI déjà stabilisé au démarrage
+        self.prices = deque(maxlen=self.max_history)
         
         # Variables Heikin-Ashi précédentes
         self.prev_ha_open = None
@@ -34,10 +163,9 @@ class CandleColorDetectorREST:
         # Stockage de la dernière bougie pour éviter les doublons
         self.last_candle_time = None
         
-        # Instances RSI de la bibliothèque TA
-        self.rsi_5_indicator = None
-        self.rsi_14_indicator = None
-        self.rsi_21_indicator = None
+        # État RSI de Wilder mis à jour en O(1) à chaque clôture (gains, pertes, clôture précédente, compteur)
+        self.rsi_periods = (5, 14, 21)
+        self._rsi_params, self._rsi_state, self._rsi_out = create_rsi_state(self.rsi_periods)
     
     def calculate_heikin_ashi(self, open_price, high_price, low_price, close_price):
         """
@@ -62,82 +190,45 @@ class CandleColorDetectorREST:
         self.prev_ha_open = ha_open
         self.prev_ha_close = ha_close
         
-        return {
-            'ha_open': ha_open,
-            'ha_high': ha_high,
-            'ha_low': ha_low,
-            'ha_close': ha_close
-        }
+        return ha_open, ha_high, ha_low, ha_close
     
-    def get_heikin_ashi_color_and_trend(self, ha_data):
+    def get_heikin_ashi_color_and_trend(self, ha_open, ha_close):
         """
         Détermine la couleur et la tendance basée sur Heikin-Ashi
+        (color_key : 'green' | 'red' | 'doji' pour les callbacks)
         """
-        ha_open = ha_data['ha_open']
-        ha_close = ha_data['ha_close']
-        
         # Détermine la couleur selon Heikin-Ashi
         if ha_close > ha_open:
             color = "🟢 VERTE (HA)"
+            color_key = "green"
             trend = "BULLISH"
         elif ha_close < ha_open:
             color = "🔴 ROUGE (HA)"
+            color_key = "red"
             trend = "BEARISH"
         else:
             color = "⚪ DOJI (HA)"
+            color_key = "doji"
             trend = "NEUTRAL"
         
-        # Calcul du changement en % basé sur Heikin-Ashi
-        if ha_open != 0:
-            ha_change_pct = ((ha_close - ha_open) / ha_open) * 100
-        else:
-            ha_change_pct = 0
+        # Calcul du changement en % basé sur Heikin-Ashi (prix toujours > 0 : pas de garde sur ha_open)
+        ha_change_pct = (ha_close - ha_open) * (100.0 / ha_open)
             
-        return color, trend, ha_change_pct
+        return color, color_key, trend, ha_change_pct
     
-    def update_rsi_indicators(self):
+    def update_rsi_state(self, close_price):
         """
-        Met à jour les indicateurs RSI avec les prix actuels
+        Intègre une nouvelle clôture dans les RSI (lissage de Wilder incrémental)
         """
-        if len(self.prices) < 5:
-            return
-            
-        # Convertit en pandas Series pour la bibliothèque TA
-        price_series = pd.Series(self.prices)
-        
-        # Crée/met à jour les indicateurs RSI
-        if len(self.prices) >= 5:
-            self.rsi_5_indicator = RSIIndicator(close=price_series, window=5)
-        if len(self.prices) >= 14:
-            self.rsi_14_indicator = RSIIndicator(close=price_series, window=14)
-        if len(self.prices) >= 21:
-            self.rsi_21_indicator = RSIIndicator(close=price_series, window=21)
+        rsi_update(close_price, self._rsi_params, self._rsi_state, self._rsi_out)
     
     def get_current_rsi_values(self):
         """
-        Récupère les valeurs RSI actuelles
+        Récupère les valeurs RSI actuelles (None tant qu'une période n'est pas amorcée)
         """
-        rsi_5 = None
-        rsi_14 = None
-        rsi_21 = None
-        
-        try:
-            if self.rsi_5_indicator is not None:
-                rsi_5 = self.rsi_5_indicator.rsi().iloc[-1]
-                
-            if self.rsi_14_indicator is not None:
-                rsi_14 = self.rsi_14_indicator.rsi().iloc[-1]
-                
-            if self.rsi_21_indicator is not None:
-                rsi_21 = self.rsi_21_indicator.rsi().iloc[-1]
-                
-        except Exception as e:
-            print(f"⚠️  Erreur calcul RSI: {e}")
-            
         return {
-            'rsi_5': rsi_5,
-            'rsi_14': rsi_14,
-            'rsi_21': rsi_21
+            f'rsi_{period}': None if math.isnan(value) else value
+            for period, value in zip(self.rsi_periods, self._rsi_out.tolist())
         }
     
     def update_rsi_values(self, close_price):
@@ -147,47 +238,53 @@ class CandleColorDetectorREST:
         # Calcule RSI AVANT d'ajouter le nouveau prix (synchronisation TradingView)
         current_rsi = self.get_current_rsi_values()
         
-        # Ajoute le nouveau prix APRÈS avoir calculé le RSI
+        # Ajoute le nouveau prix APRÈS avoir calculé le RSI (deque bornée : plus ancien évincé)
         self.prices.append(close_price)
         
-        # Garde seulement les prix nécessaires
-        if len(self.prices) > self.max_history:
-            self.prices = self.prices[-self.max_history:]
-        
-        # Met à jour les indicateurs pour le prochain calcul
-        self.update_rsi_indicators()
+        # Met à jour les RSI pour le prochain calcul
+        self.update_rsi_state(close_price)
         
         # Retourne le RSI calculé AVANT l'ajout du nouveau prix
         return current_rsi
     
     def get_rsi_signal(self, rsi_value):
         """Détermine le signal RSI"""
-        if rsi_value is None or pd.isna(rsi_value):
+        if rsi_value is None:
             return "⏳ N/A"
         elif rsi_value >= 70:
-            return f"🔴 SURVENTE ({rsi_value:.1f})"
+            return _rsi_signal_str(round(rsi_value * 10), "🔴 SURVENTE")
         elif rsi_value <= 30:
-            return f"🟢 SURACHAT ({rsi_value:.1f})"
+            return _rsi_signal_str(round(rsi_value * 10), "🟢 SURACHAT")
         else:
-            return f"⚪ NEUTRE ({rsi_value:.1f})"
+            return _rsi_signal_str(round(rsi_value * 10), "⚪ NEUTRE")
     
     def get_latest_candles(self, limit=2):
         """
         Récupère les dernières bougies via API REST
+        
+        Returns:
+            np.ndarray: (limit, 7) en float64 - open_time, OHLC, volume, close_time ; None en cas d'erreur
         """
         try:
             url = f"{self.api_base_url}{self.klines_endpoint}"
             params = {
-                'symbol': self.symbol.upper(),
+                'symbol': self._symbol_upper,
                 'interval': self.interval,
                 'limit': limit
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=(3.05, 10))
             
             if response.status_code == 200:
-                return response.json()
+                # Conversion des champs numériques (chaînes) en une seule passe NumPy
+                return np.array([row[:7] for row in _json_loads(response.content)], dtype=np.float64)
             else:
+                retry_after = response.headers.get("Retry-After")
+                if retry_after:
+                    try:
+                        self.retry_after = float(retry_after)
+                    except ValueError:
+                        pass
                 print(f"⚠️  Erreur API: Status {response.status_code}")
                 return None
                 
@@ -203,76 +300,96 @@ class CandleColorDetectorREST:
         Traite une bougie fermée
         """
         try:
+            # Vérifie si c'est une nouvelle bougie avant toute autre conversion (doublon = cas courant)
+            close_time = int(candle_data[6])
+            if self.last_candle_time is not None and close_time <= self.last_candle_time:
+                return False  # Pas de nouvelle bougie
+            
             # Extraction des données de la bougie
-            open_time = int(candle_data[0])
             open_price = float(candle_data[1])
             high_price = float(candle_data[2])
             low_price = float(candle_data[3])
             close_price = float(candle_data[4])
             volume = float(candle_data[5])
-            close_time = int(candle_data[6])
+            # Bougie marquée comme vue seulement une fois ses champs convertis
+            self.last_candle_time = close_time
             
-            # Vérifie si c'est une nouvelle bougie
-            if self.last_candle_time is None or close_time > self.last_candle_time:
-                self.last_candle_time = close_time
-                
-                # Calcule les valeurs Heikin-Ashi
-                ha_data = self.calculate_heikin_ashi(open_price, high_price, low_price, close_price)
-                
-                # Détermine la couleur basée sur Heikin-Ashi
-                color, trend, ha_change_pct = self.get_heikin_ashi_color_and_trend(ha_data)
-                
-                # Calcul du changement en % normal (pour comparaison)
-                normal_change_pct = ((close_price - open_price) / open_price) * 100
-                
-                # Met à jour les RSI avec le nouveau prix de fermeture
-                rsi_data = self.update_rsi_values(close_price)
-                
-                # Timestamp lisible
-                close_datetime = datetime.fromtimestamp(close_time / 1000)
-                
-                # Affichage des résultats
-                print(f"\n⚡ BOUGIE FERMÉE - {close_datetime.strftime('%H:%M:%S')}")
-                print(f"📊 {self.symbol.upper()} | {self.interval} | {self.market_type.upper()}")
-                print(f"💰 Normal: O=${open_price:,.2f} | C=${close_price:,.2f} | Δ={normal_change_pct:+.3f}%")
-                print(f"🎯 Heikin-Ashi: O=${ha_data['ha_open']:,.2f} | C=${ha_data['ha_close']:,.2f} | Δ={ha_change_pct:+.3f}%")
-                print(f"🎨 Couleur: {color} | {trend}")
-                print(f"📊 RSI 5:  {self.get_rsi_signal(rsi_data['rsi_5'])}")
-                print(f"📊 RSI 14: {self.get_rsi_signal(rsi_data['rsi_14'])}")
-                print(f"📊 RSI 21: {self.get_rsi_signal(rsi_data['rsi_21'])}")
-                print(f"📈 Volume: {volume:,.0f}")
-                print("-" * 60)
-                
-                # Appel de callback personnalisé si défini
-                if self.callback:
-                    self.callback({
-                        'symbol': self.symbol.upper(),
-                        'interval': self.interval,
-                        'market_type': self.market_type,
-                        'open': open_price,
-                        'close': close_price,
-                        'high': high_price,
-                        'low': low_price,
-                        'volume': volume,
-                        'ha_open': ha_data['ha_open'],
-                        'ha_close': ha_data['ha_close'],
-                        'ha_high': ha_data['ha_high'],
-                        'ha_low': ha_data['ha_low'],
-                        'color': 'green' if ha_data['ha_close'] > ha_data['ha_open'] else 'red' if ha_data['ha_close'] < ha_data['ha_open'] else 'doji',
-                        'normal_change_pct': normal_change_pct,
-                        'ha_change_pct': ha_change_pct,
-                        'timestamp': close_datetime,
-                        'rsi_5': rsi_data['rsi_5'],
-                        'rsi_14': rsi_data['rsi_14'],
-                        'rsi_21': rsi_data['rsi_21']
-                    })
-                
-                return True  # Nouvelle bougie traitée
+            # RSI calculé AVANT d'ajouter le nouveau prix (synchronisation TradingView)
+            rsi_data = self.get_current_rsi_values()
+            
+            # Heikin-Ashi et RSI de la bougie en un seul appel du noyau numérique
+            ha_open, ha_high, ha_low, ha_close = _ha_rsi_step(
+                open_price, high_price, low_price, close_price,
+                np.nan if self.prev_ha_open is None else self.prev_ha_open,
+                np.nan if self.prev_ha_close is None else self.prev_ha_close,
+                self._rsi_params, self._rsi_state, self._rsi_out
+            )
+            self.prev_ha_open = ha_open
+            self.prev_ha_close = ha_close
+            self.prices.append(close_price)
+            
+            # Détermine la couleur basée sur Heikin-Ashi
+            color, color_key, trend, ha_change_pct = self.get_heikin_ashi_color_and_trend(ha_open, ha_close)
+            
+            # Calcul du changement en % normal (pour comparaison)
+            normal_change_pct = (close_price - open_price) * (100.0 / open_price)
+            
+            # Timestamp lisible
+            close_datetime = datetime.fromtimestamp(close_time / 1000)
+            
+            # Affichage des résultats (un seul enregistrement, formaté seulement si le niveau INFO est actif)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "\n⚡ BOUGIE FERMÉE - %s\n"
+                    "📊 %s | %s | %s\n"
+                    "💰 Normal: O=$%s | C=$%s | Δ=%+.3f%%\n"
+                    "🎯 Heikin-Ashi: O=$%s | C=$%s | Δ=%+.3f%%\n"
+                    "🎨 Couleur: %s | %s\n"
+                    "📊 RSI 5:  %s\n"
+                    "📊 RSI 14: %s\n"
+                    "📊 RSI 21: %s\n"
+                    "📈 Volume: %s\n"
+                    "%s",
+                    close_datetime.strftime('%H:%M:%S'),
+                    self._symbol_upper, self.interval, self._market_type_upper,
+                    format(open_price, ',.2f'), format(close_price, ',.2f'), normal_change_pct,
+                    format(ha_open, ',.2f'), format(ha_close, ',.2f'), ha_change_pct,
+                    color, trend,
+                    self.get_rsi_signal(rsi_data['rsi_5']),
+                    self.get_rsi_signal(rsi_data['rsi_14']),
+                    self.get_rsi_signal(rsi_data['rsi_21']),
+                    format(volume, ',.0f'),
+                    "-" * 60
+                )
             
-            return False  # Pas de nouvelle bougie
+            # Appel de callback personnalisé si défini
+            if self.callback:
+                self.callback({
+                    'symbol': self._symbol_upper,
+                    'interval': self.interval,
+                    'market_type': self.market_type,
+                    'open': open_price,
+                    'close': close_price,
+                    'high': high_price,
+                    'low': low_price,
+                    'volume': volume,
+                    'ha_open': ha_open,
+                    'ha_close': ha_close,
+                    'ha_high': ha_high,
+                    'ha_low': ha_low,
+                    'color': color_key,
+                    'normal_change_pct': normal_change_pct,
+                    'ha_change_pct': ha_change_pct,
+                    'timestamp': close_datetime,
+                    'rsi_5': rsi_data['rsi_5'],
+                    'rsi_14': rsi_data['rsi_14'],
+                    'rsi_21': rsi_data['rsi_21']
+                })
+            
+            return True  # Nouvelle bougie traitée
             
         except Exception as e:
-            print(f"❌ Erreur process_candle: {e}")
+            logger.error("❌ Erreur process_candle: %s", e)
             return False
     
     def load_initial_data(self):
@@ -280,38 +397,41 @@ class CandleColorDetectorREST:
         try:
             url = f"{self.api_base_url}{self.klines_endpoint}"
             params = {
-                'symbol': self.symbol.upper(),
+                'symbol': self._symbol_upper,
                 'interval': self.interval,
-                'limit': 50  # Assez pour calculer RSI 21
+                'limit': self.bootstrap_limit
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=(3.05, 10))
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
                 
-                # Extrait les données OHLC pour initialiser Heikin-Ashi et RSI
-                for candle in data[:-1]:  # Exclut la dernière bougie (en cours)
-                    open_price = float(candle[1])  # Index 1 = open price
-                    high_price = float(candle[2])  # Index 2 = high price
-                    low_price = float(candle[3])   # Index 3 = low price
-                    close_price = float(candle[4]) # Index 4 = close price
+                # Extrait les données OHLC (hors bougie en cours) en une seule conversion
+                candles = data[:-1]
+                if candles:
+                    ohlc = np.array([candle[1:5] for candle in candles], dtype=np.float64)
+                    close_prices = ohlc[:, 3]
                     
-                    # Ajoute aux prix pour RSI
-                    self.prices.append(close_price)
+                    # Heikin-Ashi de tout l'historique (boucle native sous numba), seul le dernier est conservé
+                    ha_open, _, _, ha_close = ha_loop(
+                        ohlc[:, 0], ohlc[:, 1], ohlc[:, 2], close_prices,
+                        np.nan if self.prev_ha_open is None else self.prev_ha_open,
+                        np.nan if self.prev_ha_close is None else self.prev_ha_close
+                    )
+                    self.prev_ha_open = float(ha_open[-1])
+                    self.prev_ha_close = float(ha_close[-1])
                     
-                    # Initialise Heikin-Ashi avec les données historiques
-                    ha_data = self.calculate_heikin_ashi(open_price, high_price, low_price, close_price)
-                
-                # Initialise les indicateurs RSI avec les données historiques
-                self.update_rsi_indicators()
+                    # Ajoute aux prix et amorce les RSI en un seul appel
+                    self.prices.extend(close_prices[-self.max_history:].tolist())
+                    rsi_seed(close_prices, self._rsi_params, self._rsi_state, self._rsi_out)
                 
-                print(f"✅ {len(self.prices)} prix historiques chargés pour calcul RSI ({self.market_type.upper()})")
+                print(f"✅ {len(candles)} bougies historiques chargées pour amorcer HA et RSI ({self._market_type_upper})")
                 
                 # Affiche les RSI initiaux
                 initial_rsi = self.get_current_rsi_values()
-                rsi_5_str = f"{initial_rsi['rsi_5']:.1f}" if initial_rsi['rsi_5'] is not None and not pd.isna(initial_rsi['rsi_5']) else 'N/A'
-                rsi_14_str = f"{initial_rsi['rsi_14']:.1f}" if initial_rsi['rsi_14'] is not None and not pd.isna(initial_rsi['rsi_14']) else 'N/A'
-                rsi_21_str = f"{initial_rsi['rsi_21']:.1f}" if initial_rsi['rsi_21'] is not None and not pd.isna(initial_rsi['rsi_21']) else 'N/A'
+                rsi_5_str = f"{initial_rsi['rsi_5']:.1f}" if initial_rsi['rsi_5'] is not None else 'N/A'
+                rsi_14_str = f"{initial_rsi['rsi_14']:.1f}" if initial_rsi['rsi_14'] is not None else 'N/A'
+                rsi_21_str = f"{initial_rsi['rsi_21']:.1f}" if initial_rsi['rsi_21'] is not None else 'N/A'
                 print(f"📊 RSI initial - 5: {rsi_5_str}, 14: {rsi_14_str}, 21: {rsi_21_str}")
                       
             else:
@@ -321,33 +441,131 @@ class CandleColorDetectorREST:
             print(f"⚠️  Erreur lors du chargement initial: {e}")
             print("RSI sera disponible après quelques bougies")
     
+    def on_message(self, ws, message):
+        """Traite une bougie poussée par le flux kline (seulement à sa fermeture)"""
+        try:
+            # Bougie encore ouverte (la quasi-totalité des trames) : ignorée sans décoder le JSON
+            if (_CLOSED_MARKER_BYTES if isinstance(message, bytes) else _CLOSED_MARKER) not in message:
+                return
+            
+            kline = _json_loads(message).get('k')
+            if kline and kline['x']:  # x = bougie fermée
+                # Même forme qu'une ligne /klines pour process_candle
+                self.process_candle([kline['t'], kline['o'], kline['h'], kline['l'], kline['c'], kline['v'], kline['T']])
+        except Exception as e:
+            print(f"❌ Erreur message WebSocket: {e}")
+    
+    def on_error(self, ws, error):
+        print(f"❌ Erreur WebSocket: {error}")
+        if isinstance(error, KeyboardInterrupt):
+            # websocket-client absorbe Ctrl+C : on l'interprète comme un arrêt
+            self.running = False
+    
+    def on_close(self, ws, close_status_code, close_msg):
+        print(f"🔌 Connexion fermée: {close_status_code} - {close_msg}")
+    
+    def on_open(self, ws):
+        print(f"✅ Flux kline connecté pour {self._symbol_upper} ({self._market_type_upper})")
+        self.reconnect_delay = 1
+        
+        # Reconnexion : rattrape la dernière bougie fermée pendant la coupure
+        if self.last_candle_time is None:
+            return
+        candles = self.get_latest_candles(limit=2)
+        if candles is not None and len(candles) >= 2:
+            self.process_candle(candles[-2])
+    
     def start_monitoring(self):
-        """Démarre le monitoring via polling REST API"""
+        """Démarre le monitoring via le flux WebSocket kline (REST seulement pour l'historique)"""
+        start_log_listener()
+        warm_up_kernels()
         print("🔄 Chargement des données historiques...")
         self.load_initial_data()
         
-        print(f"🚀 Démarrage du monitoring REST API")
-        print(f"📊 {self.symbol.upper()} | {self.interval} | {self.market_type.upper()}")
-        print(f"⏱️  Polling toutes les {self.poll_interval} secondes")
+        if websocket is None:
+            print("⚠️  websocket-client absent - repli sur le polling REST")
+            self.poll_monitoring()
+            return
+        
+        socket_url = f"{self.ws_base_url}/ws/{self.symbol}@kline_{self.interval}"
+        
+        print("🚀 Démarrage du monitoring WebSocket")
+        print(f"📊 {self._symbol_upper} | {self.interval} | {self._market_type_upper}")
+        print("🎯 En attente de nouvelles bougies fermées...")
+        print("-" * 60)
+        
+        self.running = True
+        
+        while self.running:
+            try:
+                self.ws = websocket.WebSocketApp(
+                    socket_url,
+                    on_message=self.on_message,
+                    on_error=self.on_error,
+                    on_close=self.on_close,
+                    on_open=self.on_open
+                )
+                
+                # Rotation de la connexion avant la déconnexion forcée des 24h
+                rotation = threading.Timer(self.session_max_age, self.ws.close)
+                rotation.daemon = True
+                rotation.start()
+                started = time.monotonic()
+                
+                self.ws.run_forever(ping_interval=20, ping_timeout=10, skip_utf8_validation=True)
+                rotation.cancel()
+                
+                if not self.running:
+                    break
+                
+                if time.monotonic() - started >= self.session_max_age:
+                    print("🔄 Rotation de la connexion WebSocket")
+                    continue
+                
+                print(f"🔄 Reconnexion dans {self.reconnect_delay}s...")
+                time.sleep(self.reconnect_delay)
+                self.reconnect_delay = min(self.reconnect_delay * 2, self.max_reconnect_delay)
+                
+            except KeyboardInterrupt:
+                print("\n🛑 Arrêt demandé par l'utilisateur...")
+                break
+        
+        self.running = False
+        print("🔌 Monitoring arrêté")
+    
+    def poll_monitoring(self):
+        """Monitoring via polling REST API (repli sans websocket-client)"""
+        print("🚀 Démarrage du monitoring REST API")
+        print(f"📊 {self._symbol_upper} | {self.interval} | {self._market_type_upper}")
+        if self.interval_ms:
+            print(f"⏱️  Polling aligné sur la fermeture des bougies {self.interval}")
+        else:
+            print(f"⏱️  Polling toutes les {self.poll_interval} secondes")
         print("🎯 En attente de nouvelles bougies fermées...")
         print("-" * 60)
         
         self.running = True
         consecutive_errors = 0
         max_consecutive_errors = 5
+        repolled = False
         
         while self.running:
             try:
                 # Récupère les dernières bougies
                 candles = self.get_latest_candles(limit=2)
                 
-                if candles and len(candles) >= 2:
+                if candles is not None and len(candles) >= 2:
                     # Traite la bougie fermée (avant-dernière)
                     closed_candle = candles[-2]  # Avant-dernière = fermée
                     processed = self.process_candle(closed_candle)
                     
                     if processed:
                         consecutive_errors = 0  # Reset le compteur d'erreurs
+                    elif self.interval_ms and not repolled:
+                        # Réveil trop tôt : l'API renvoie encore l'ancienne bougie, un seul nouvel essai
+                        repolled = True
+                        time.sleep(0.5)
+                        continue
                     
                 else:
                     print("⚠️  Aucune donnée reçue de l'API")
@@ -358,8 +576,12 @@ class CandleColorDetectorREST:
                     print(f"❌ Trop d'erreurs consécutives ({consecutive_errors}). Arrêt du monitoring.")
                     break
                 
-                # Attendre avant le prochain poll
-                time.sleep(self.poll_interval)
+                # Attendre avant le prochain poll (recul progressif tant que les erreurs s'enchaînent)
+                repolled = False
+                if consecutive_errors:
+                    time.sleep(self.error_backoff(consecutive_errors))
+                else:
+                    time.sleep(self.seconds_until_next_poll())
                 
             except KeyboardInterrupt:
                 print("\n🛑 Arrêt demandé par l'utilisateur...")
@@ -367,15 +589,37 @@ class CandleColorDetectorREST:
             except Exception as e:
                 print(f"❌ Erreur monitoring: {e}")
                 consecutive_errors += 1
-                time.sleep(self.poll_interval)
+                time.sleep(self.error_backoff(consecutive_errors))
         
         self.running = False
         print("🔌 Monitoring arrêté")
     
+    def seconds_until_next_poll(self):
+        """Délai jusqu'à la prochaine fermeture de bougie (+ marge), ou poll_interval si l'intervalle est inconnu"""
+        if not self.interval_ms:
+            return self.poll_interval
+        now_ms = time.time() * 1000
+        next_close_ms = (now_ms // self.interval_ms + 1) * self.interval_ms + self.close_delay_ms
+        return max(0.0, next_close_ms - now_ms) / 1000
+    
+    def error_backoff(self, consecutive_errors):
+        """Attente après erreur : exponentielle avec jitter, au moins le Retry-After imposé par l'API"""
+        delay = min(
+            self.max_error_backoff,
+            self.poll_interval * 2 ** consecutive_errors + random.uniform(0, self.poll_interval)
+        )
+        if self.retry_after:
+            delay = max(delay, self.retry_after)
+            self.retry_after = None
+        return delay
+    
     def stop_monitoring(self):
         """Arrête le monitoring"""
         self.running = False
-        print("🛑 Arrêt du monitoring REST API...")
+        if self.ws:
+            self.ws.close()
+        self.session.close()
+        print("🛑 Arrêt du monitoring...")
 
 
 # Fonctions utilitaires pour usage simple
@@ -399,10 +643,57 @@ def monitor_with_callback_rest(symbol="btcusdt", interval="1m", callback_func=No
         print("\n🛑 Arrêt du monitoring...")
         detector.stop_monitoring()
 
+def monitor_multiple_pairs_rest(symbols, interval="1m", callback_func=None, market_type="futures", poll_interval=5):
+    """
+    Monitor de plusieurs paires via REST API dans un seul processus
+    
+    Une session HTTP partagée (un pool de connexions vers Binance) ; à chaque fermeture de bougie
+    les paires sont interrogées en parallèle puis traitées dans l'ordre.
+    """
+    start_log_listener()
+    warm_up_kernels()
+    session = create_http_session(pool_size=max(4, len(symbols)))
+    detectors = [
+        CandleColorDetectorREST(symbol, interval, callback_func, market_type=market_type,
+                                poll_interval=poll_interval, session=session)
+        for symbol in symbols
+    ]
+    
+    def fetch_all(targets):
+        return list(executor.map(lambda detector: detector.get_latest_candles(limit=2), targets))
+    
+    executor = ThreadPoolExecutor(max_workers=len(detectors))
+    try:
+        print(f"🔄 Chargement des données historiques ({len(detectors)} paires)...")
+        list(executor.map(lambda detector: detector.load_initial_data(), detectors))
+        print(f"🚀 Monitoring REST multi-paires: {', '.join(symbol.upper() for symbol in symbols)} | {interval}")
+        print("-" * 60)
+        
+        while True:
+            time.sleep(detectors[0].seconds_until_next_poll())
+            
+            pending = []
+            for detector, candles in zip(detectors, fetch_all(detectors)):
+                if candles is None or len(candles) < 2 or not detector.process_candle(candles[-2]):
+                    pending.append(detector)
+            
+            # Réveil trop tôt pour certaines paires : un seul nouvel essai groupé
+            if pending and detectors[0].interval_ms:
+                time.sleep(0.5)
+                for detector, candles in zip(pending, fetch_all(pending)):
+                    if candles is not None and len(candles) >= 2:
+                        detector.process_candle(candles[-2])
+                
+    except KeyboardInterrupt:
+        print("\n🛑 Arrêt du monitoring...")
+    finally:
+        executor.shutdown(wait=False)
+        session.close()
+
 # Exemple de callback personnalisé avec RSI et Heikin-Ashi
 def my_candle_callback_rest(candle_data):
     """Exemple de fonction callback avec RSI et Heikin-Ashi pour REST API"""
-    print(f"\n🎯 CALLBACK REST DÉCLENCHÉ:")
+    print("\n🎯 CALLBACK REST DÉCLENCHÉ:")
     
     # Analyse basée sur Heikin-Ashi
     if candle_data['color'] == 'green':
@@ -414,7 +705,7 @@ def my_candle_callback_rest(candle_data):
     
     # Analyse RSI avec seuils plus conservateurs pour le REST
     rsi_14 = candle_data.get('rsi_14')
-    if rsi_14 is not None and not pd.isna(rsi_14):
+    if rsi_14 is not None:
         if rsi_14 >= 75:  # Seuil plus élevé pour le REST
             print(f"⚠️  RSI 14 TRÈS SURVENTE: {rsi_14:.1f}")
         elif rsi_14 <= 25:  # Seuil plus bas pour le REST
@@ -430,22 +721,23 @@ def my_candle_callback_rest(candle_data):
     
     # Signaux forts basés sur HA + RSI + Volume
     if (candle_data['color'] == 'green' and 
-        rsi_14 is not None and not pd.isna(rsi_14) and rsi_14 <= 30 and 
+        rsi_14 is not None and rsi_14 <= 30 and 
         abs(candle_data['ha_change_pct']) > 0.1):
         print(f"🚀 SIGNAL BULLISH FORT: HA verte + RSI bas ({rsi_14:.1f}) + Mouvement significatif")
     
     elif (candle_data['color'] == 'red' and 
-          rsi_14 is not None and not pd.isna(rsi_14) and rsi_14 >= 70 and 
+          rsi_14 is not None and rsi_14 >= 70 and 
           abs(candle_data['ha_change_pct']) > 0.1):
         print(f"🔥 SIGNAL BEARISH FORT: HA rouge + RSI haut ({rsi_14:.1f}) + Mouvement significatif")
 
 # Utilisation simple
 if __name__ == "__main__":
     print("🎯 Détecteur de couleur de bougie - REST API Version")
-    print("📡 Heikin-Ashi + TA Library RSI + Polling REST")
+    print("📡 Heikin-Ashi + RSI Wilder incrémental + Flux kline WebSocket")
     print("=" * 70)
     print("📋 Dépendances requises:")
-    print("   pip install ta pandas numpy requests")
+    print("   pip install numpy requests websocket-client")
+    print("   (optionnel) pip install orjson numba")
     print("=" * 70)
     
     # Option 1: Monitoring simple FUTURES avec polling rapide
@@ -458,4 +750,7 @@ if __name__ == "__main__":
     # monitor_with_callback_rest("btcusdt", "1m", my_candle_callback_rest, "futures", poll_interval=5)
     
     # Option 4: Monitoring lent pour éviter les limites de rate
-    # monitor_with_callback_rest("btcusdt", "5m", my_candle_callback_rest, "futures", poll_interval=10)
\ No newline at end of file
+    # monitor_with_callback_rest("btcusdt", "5m", my_candle_callback_rest, "futures", poll_interval=10)
+    
+    # Option 5: Plusieurs paires dans un seul processus (session HTTP partagée)
+    # monitor_multiple_pairs_rest(["btcusdt", "ethusdt", "solusdt"], "1m", my_candle_callback_rest, "futures")
\ No newline at end of file
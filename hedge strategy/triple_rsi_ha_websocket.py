@@ -1,20 +1,63 @@
 import json
+import math
+import sys
+import requests
 import websocket
 from datetime import datetime
-import pandas as pd
+from functools import lru_cache
 import numpy as np
-from ta.momentum import RSIIndicator
-import os
+from indicator.heikin_ashi import ha_loop
+from indicator.rsi_manager import create_rsi_state, rsi_seed, rsi_update
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson optionnel : json standard (accepte aussi les bytes)
+    _json_loads = json.loads
+
+# Champ "x" (bougie fermée) tel qu'il apparaît dans le JSON compact des trames kline Binance
+_CLOSED_MARKER = '"x":true'
+_CLOSED_MARKER_BYTES = _CLOSED_MARKER.encode()
+
+# Session HTTP partagée par tous les détecteurs : connexion TLS réutilisée d'une instance à l'autre
+_http_session = requests.Session()
+_http_session.headers.update({"Connection": "keep-alive", "Accept-Encoding": "gzip"})
+
+# Séparateur de fin du résumé de bougie
+_SEPARATOR_LINE = "-" * 50 + "\n"
+
+# True : RSI via ta.momentum.RSIIndicator (recalcul complet à chaque bougie) au lieu du RSI de Wilder incrémental
+USE_TA_LIB = False
+if USE_TA_LIB:
+    import pandas as pd
+    from ta.momentum import RSIIndicator
+_RSI_SOURCE = "TA" if USE_TA_LIB else "Wilder"  # suffixe affiché selon la source réelle du RSI
+
+@lru_cache(maxsize=4096)
+def _rsi_signal_str(rsi_tenths, label):
+    """Libellé RSI mis en cache par dixième de point (au plus ~1000 chaînes distinctes par libellé)"""
+    return f"{label} ({rsi_tenths / 10:.1f})"
 
 class CandleColorDetector:
-    def __init__(self, symbol="btcusdt", interval="1m", callback=None, market_type="futures"):
+    def __init__(self, symbol="btcusdt", interval="1m", callback=None, market_type="futures", verbose=True, session=None):
         self.symbol = symbol.lower()
         self.interval = interval
         self.ws = None
         self.last_close_time = None
         self.callback = callback
+        self.verbose = verbose  # False : pas d'affichage console par bougie (le callback reste appelé)
+        self.session = session if session is not None else _http_session
         self.market_type = market_type.lower()  # "spot" ou "futures"
         
+        # Chaînes constantes calculées une fois (réutilisées à chaque bougie)
+        self._symbol_upper = self.symbol.upper()
+        self._market_type_upper = self.market_type.upper()
+        self._header_line = f"📊 {self._symbol_upper} | {self.interval}\n"
+        
+        # Événement passé au callback, mis à jour en place à chaque bougie :
+        # le callback ne doit pas le conserver (en faire une copie avec dict(event) si besoin)
+        self._event = {'symbol': self._symbol_upper, 'interval': self.interval}
+        
         # URLs selon le type de marché
         if self.market_type == "futures":
             self.api_base_url = "https://fapi.binance.com"
@@ -23,9 +66,18 @@ class CandleColorDetector:
             self.api_base_url = "https://api.binance.com"
             self.ws_base_url = "wss://stream.binance.com:9443"
         
-        # Stockage des prix pour calculs RSI
-        self.prices = []
+        self.bootstrap_limit = 1000  # Bougies d'amorçage (maximum Binance) : RSI déjà stabilisé au démarrage
+        
+        # État du RSI de Wilder incrémental : quelques flottants par période, aucun historique de prix
+        self.rsi_periods = (5, 14, 21)
+        self._rsi_params, self._rsi_state, self._rsi_out = create_rsi_state(self.rsi_periods)
+        
+        # USE_TA_LIB seulement : tampon de prix préalloué et Series pandas construite une seule fois
         self.max_history = 50  # Garde les 50 derniers prix
+        self._price_count = 0
+        if USE_TA_LIB:
+            self._price_array = np.empty(self.max_history)
+            self._price_series = pd.Series(self._price_array, copy=False)  # vue sur le tampon, sans copie
         
         # Variables Heikin-Ashi précédentes
         self.prev_ha_open = None
@@ -47,7 +99,7 @@ class CandleColorDetector:
         try:
             with open(self.log_file, 'w', encoding='utf-8') as f:
                 f.write("="*80 + "\n")
-                f.write(f"LOG DES TRADES - {self.symbol.upper()} {self.interval}\n")
+                f.write(f"LOG DES TRADES - {self._symbol_upper} {self.interval}\n")
                 f.write(f"Démarrage: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
                 f.write("="*80 + "\n\n")
             print(f"📝 Fichier de log créé: {self.log_file}")
@@ -73,7 +125,8 @@ class CandleColorDetector:
         rsi_21 = rsi_data.get('rsi_21')
         
         # Vérifie que tous les RSI sont disponibles
-        if any(rsi is None or pd.isna(rsi) for rsi in [rsi_5, rsi_14, rsi_21]):
+        # (get_current_rsi_values renvoie None, jamais NaN, pour un RSI indisponible)
+        if rsi_5 is None or rsi_14 is None or rsi_21 is None:
             return None
         
         # Signal LONG: Tous les RSI < 30
@@ -166,6 +219,7 @@ class CandleColorDetector:
     def get_heikin_ashi_color_and_trend(self, ha_data):
         """
         Détermine la couleur et la tendance basée sur Heikin-Ashi
+        (color_key : 'green' | 'red' | 'doji' pour les callbacks)
         """
         ha_open = ha_data['ha_open']
         ha_close = ha_data['ha_close']
@@ -173,76 +227,94 @@ class CandleColorDetector:
         # Détermine la couleur selon Heikin-Ashi
         if ha_close > ha_open:
             color = "🟢 VERTE (HA)"
+            color_key = "green"
             trend = "BULLISH"
         elif ha_close < ha_open:
             color = "🔴 ROUGE (HA)"
+            color_key = "red"
             trend = "BEARISH"
         else:
             color = "⚪ DOJI (HA)"
+            color_key = "doji"
             trend = "NEUTRAL"
         
-        # Calcul du changement en % basé sur Heikin-Ashi
-        if ha_open != 0:
-            ha_change_pct = ((ha_close - ha_open) / ha_open) * 100
-        else:
-            ha_change_pct = 0
+        # Calcul du changement en % basé sur Heikin-Ashi (prix toujours > 0 : pas de garde sur ha_open)
+        ha_change_pct = (ha_close - ha_open) * (100.0 / ha_open)
             
-        return color, trend, ha_change_pct
+        return color, color_key, trend, ha_change_pct
     
-    def calculate_rsi_values(self, close_price):
+    def push_price(self, close_price):
         """
-        Met à jour et calcule les valeurs RSI avec la bibliothèque TA
+        Intègre un prix de clôture : RSI incrémental, ou tampon de prix si USE_TA_LIB
+        (le plus ancien est alors décalé dehors une fois plein)
         """
-        # Ajoute le nouveau prix
-        self.prices.append(close_price)
+        if not USE_TA_LIB:
+            rsi_update(close_price, self._rsi_params, self._rsi_state, self._rsi_out)
+            return
         
-        # Garde seulement les prix nécessaires
-        if len(self.prices) > self.max_history:
-            self.prices = self.prices[-self.max_history:]
+        if self._price_count < self.max_history:
+            self._price_array[self._price_count] = close_price
+            self._price_count += 1
+        else:
+            self._price_array[:-1] = self._price_array[1:]
+            self._price_array[-1] = close_price
+    
+    def seed_prices(self, close_prices):
+        """
+        Intègre un historique de clôtures (ndarray float64) en un seul appel
+        """
+        if not USE_TA_LIB:
+            rsi_seed(close_prices, self._rsi_params, self._rsi_state, self._rsi_out)
+            return
         
-        # Convertit en pandas Series pour la bibliothèque TA
-        price_series = pd.Series(self.prices)
+        for close_price in close_prices[-self.max_history:].tolist():
+            self.push_price(close_price)
+    
+    def get_current_rsi_values(self):
+        """
+        Valeurs RSI courantes (None tant qu'une période n'est pas amorcée)
+        """
+        if not USE_TA_LIB:
+            return {
+                f'rsi_{period}': None if math.isnan(value) else value
+                for period, value in zip(self.rsi_periods, self._rsi_out.tolist())
+            }
         
-        # Calcule RSI avec la bibliothèque TA pour différentes périodes
-        rsi_5 = None
-        rsi_14 = None
-        rsi_21 = None
+        # Bibliothèque TA : tranche de la Series existante : aucune reconstruction pandas
+        price_series = self._price_series.iloc[:self._price_count]
+        
+        rsi_values = {'rsi_5': None, 'rsi_14': None, 'rsi_21': None}
         
         try:
-            if len(self.prices) >= 5:
-                rsi_5_indicator = RSIIndicator(close=price_series, window=5)
-                rsi_5_series = rsi_5_indicator.rsi()
-                rsi_5 = rsi_5_series.iloc[-1] if not rsi_5_series.empty and not pd.isna(rsi_5_series.iloc[-1]) else None
-                
-            if len(self.prices) >= 14:
-                rsi_14_indicator = RSIIndicator(close=price_series, window=14)
-                rsi_14_series = rsi_14_indicator.rsi()
-                rsi_14 = rsi_14_series.iloc[-1] if not rsi_14_series.empty and not pd.isna(rsi_14_series.iloc[-1]) else None
-                
-            if len(self.prices) >= 21:
-                rsi_21_indicator = RSIIndicator(close=price_series, window=21)
-                rsi_21_series = rsi_21_indicator.rsi()
-                rsi_21 = rsi_21_series.iloc[-1] if not rsi_21_series.empty and not pd.isna(rsi_21_series.iloc[-1]) else None
+            for period in (5, 14, 21):
+                if self._price_count < period:
+                    break
+                rsi = RSIIndicator(close=price_series, window=period).rsi().iloc[-1]
+                if not math.isnan(rsi):
+                    rsi_values[f'rsi_{period}'] = rsi
                 
         except Exception as e:
             print(f"⚠️  Erreur calcul RSI TA: {e}")
         
-        return {
-            'rsi_5': rsi_5,
-            'rsi_14': rsi_14,
-            'rsi_21': rsi_21
-        }
+        return rsi_values
+    
+    def calculate_rsi_values(self, close_price):
+        """
+        Met à jour et calcule les valeurs RSI avec le nouveau prix
+        """
+        self.push_price(close_price)
+        return self.get_current_rsi_values()
     
     def get_rsi_signal(self, rsi_value):
         """Détermine le signal RSI"""
-        if rsi_value is None or pd.isna(rsi_value):
+        if rsi_value is None:
             return "⏳ N/A"
         elif rsi_value >= 70:
-            return f"🔴 SURVENTE ({rsi_value:.1f})"
+            return _rsi_signal_str(round(rsi_value * 10), "🔴 SURVENTE")
         elif rsi_value <= 30:
-            return f"🟢 SURACHAT ({rsi_value:.1f})"
+            return _rsi_signal_str(round(rsi_value * 10), "🟢 SURACHAT")
         else:
-            return f"⚪ NEUTRE ({rsi_value:.1f})"
+            return _rsi_signal_str(round(rsi_value * 10), "⚪ NEUTRE")
     
     def get_timeout_seconds(self):
         """Calcule le timeout selon l'intervalle (5 bougies max)"""
@@ -266,289 +338,301 @@ class CandleColorDetector:
     def on_message(self, ws, message):
         """Traite les messages WebSocket avec latence minimale"""
         try:
-            data = json.loads(message)
+            # Bougie encore ouverte (la quasi-totalité des trames) : ignorée sans décoder le JSON
+            if (_CLOSED_MARKER_BYTES if isinstance(message, bytes) else _CLOSED_MARKER) not in message:
+                return
+            
+            data = _json_loads(message)
             kline = data['k']
             
             # Vérifie si la bougie est fermée
             if kline['x']:  # kline is closed = True
-                open_price = float(kline['o'])
-                close_price = float(kline['c'])
-                high_price = float(kline['h'])
-                low_price = float(kline['l'])
-                close_time = kline['T']  # Close timestamp
-                
-                # Évite les doublons
-                if self.last_close_time != close_time:
-                    self.last_close_time = close_time
-                    
-                    # Timestamp lisible - DÉFINI ICI EN PREMIER
-                    close_datetime = datetime.fromtimestamp(close_time / 1000)
-                    
-                    # Calcule les valeurs Heikin-Ashi
-                    ha_data = self.calculate_heikin_ashi(open_price, high_price, low_price, close_price)
-                    
-                    # Détermine la couleur basée sur Heikin-Ashi
-                    color, trend, ha_change_pct = self.get_heikin_ashi_color_and_trend(ha_data)
-                    
-                    # Calcul du changement en % normal (pour comparaison)
-                    normal_change_pct = ((close_price - open_price) / open_price) * 100
-                    
-                    # Met à jour les RSI avec le nouveau prix de fermeture (TA Library)
-                    rsi_data = self.calculate_rsi_values(close_price)
-                    
-                    # ===============================
-                    # LOGIQUE DE TRADING
-                    # ===============================
-                    
-                    # 1. Vérifier si position ouverte doit être fermée
-                    if self.current_position:
-                        exit_reason = self.check_position_exit(close_price)
-                        if exit_reason:
-                            pnl = 0
-                            if self.current_position['direction'] == 'LONG':
-                                pnl = close_price - self.current_position['entry_price']
-                            else:  # SHORT
-                                pnl = self.current_position['entry_price'] - close_price
-                            
-                            pnl_pct = (pnl / self.current_position['entry_price']) * 100
-                            
-                            # Log fermeture position
-                            self.log_trade_event("FERMETURE POSITION", {
-                                "Direction": self.current_position['direction'],
-                                "Raison": exit_reason,
-                                "Prix d'entrée": f"${self.current_position['entry_price']:,.2f}",
-                                "Prix de sortie": f"${close_price:,.2f}",
-                                "PnL": f"${pnl:,.2f}",
-                                "PnL %": f"{pnl_pct:+.2f}%",
-                                "Stop Loss": f"${self.current_position['stop_loss']:,.2f}",
-                                "Take Profit": f"${self.current_position['take_profit']:,.2f}",
-                                "Durée": str(close_datetime - self.current_position['entry_time'])
-                            })
-                            
-                            print(f"\n🚪 FERMETURE POSITION {self.current_position['direction']} - {exit_reason}")
-                            print(f"💰 PnL: ${pnl:,.2f} ({pnl_pct:+.2f}%)")
-                            
-                            # Reset position
-                            self.current_position = None
-                    
-                    # 2. Si pas de position, vérifier nouveaux signaux RSI
-                    if not self.current_position:
-                        rsi_signal = self.check_rsi_signal(rsi_data)
-                        
-                        # Signal RSI LONG détecté
-                        if rsi_signal == "LONG" and not self.waiting_for_long_confirmation:
-                            self.waiting_for_long_confirmation = True
-                            self.pending_long_signal = {
-                                'timestamp': close_datetime,
-                                'rsi_5': rsi_data['rsi_5'],
-                                'rsi_14': rsi_data['rsi_14'],
-                                'rsi_21': rsi_data['rsi_21'],
-                                'trigger_price': close_price
-                            }
-                            
-                            self.log_trade_event("SIGNAL RSI LONG DÉTECTÉ", {
-                                "RSI 5": f"{rsi_data['rsi_5']:.1f}",
-                                "RSI 14": f"{rsi_data['rsi_14']:.1f}",
-                                "RSI 21": f"{rsi_data['rsi_21']:.1f}",
-                                "Prix": f"${close_price:,.2f}",
-                                "Statut": "En attente de bougie HA verte"
-                            })
-                            
-                            print(f"\n🟢 SIGNAL RSI LONG DÉTECTÉ !")
-                            print(f"   RSI(5)={rsi_data['rsi_5']:.1f}, RSI(14)={rsi_data['rsi_14']:.1f}, RSI(21)={rsi_data['rsi_21']:.1f}")
-                            print(f"   ⏳ En attente de bougie Heikin-Ashi VERTE...")
-                        
-                        # Signal RSI SHORT détecté
-                        elif rsi_signal == "SHORT" and not self.waiting_for_short_confirmation:
-                            self.waiting_for_short_confirmation = True
-                            self.pending_short_signal = {
-                                'timestamp': close_datetime,
-                                'rsi_5': rsi_data['rsi_5'],
-                                'rsi_14': rsi_data['rsi_14'],
-                                'rsi_21': rsi_data['rsi_21'],
-                                'trigger_price': close_price
-                            }
-                            
-                            self.log_trade_event("SIGNAL RSI SHORT DÉTECTÉ", {
-                                "RSI 5": f"{rsi_data['rsi_5']:.1f}",
-                                "RSI 14": f"{rsi_data['rsi_14']:.1f}",
-                                "RSI 21": f"{rsi_data['rsi_21']:.1f}",
-                                "Prix": f"${close_price:,.2f}",
-                                "Statut": "En attente de bougie HA rouge"
-                            })
-                            
-                            print(f"\n🔴 SIGNAL RSI SHORT DÉTECTÉ !")
-                            print(f"   RSI(5)={rsi_data['rsi_5']:.1f}, RSI(14)={rsi_data['rsi_14']:.1f}, RSI(21)={rsi_data['rsi_21']:.1f}")
-                            print(f"   ⏳ En attente de bougie Heikin-Ashi ROUGE...")
-                    
-                    # 3. Vérifier confirmations Heikin-Ashi
-                    if self.waiting_for_long_confirmation and ha_data['ha_close'] > ha_data['ha_open']:
-                        # Bougie HA verte confirmée pour LONG
-                        # Note: Dans la réalité, l'entrée se ferait à l'ouverture de la bougie SUIVANTE
-                        # Ici on simule avec le prix de clôture actuel comme proxy
-                        entry_price = close_price
-                        levels = self.calculate_long_levels(entry_price, ha_data['ha_low'])
-                        
-                        self.current_position = {
-                            'direction': 'LONG',
-                            'entry_price': entry_price,
-                            'entry_time': close_datetime,
-                            'stop_loss': levels['stop_loss'],
-                            'take_profit': levels['take_profit'],
-                            'ha_confirmation': {
-                                'ha_open': ha_data['ha_open'],
-                                'ha_close': ha_data['ha_close'],
-                                'ha_low': ha_data['ha_low']
-                            }
-                        }
-                        
-                        self.log_trade_event("ENTRÉE LONG CONFIRMÉE", {
-                            "Signal RSI": f"RSI(5)={self.pending_long_signal['rsi_5']:.1f}, RSI(14)={self.pending_long_signal['rsi_14']:.1f}, RSI(21)={self.pending_long_signal['rsi_21']:.1f}", # type: ignore
-                            "Confirmation HA": f"HA Close ({ha_data['ha_close']:.2f}) > HA Open ({ha_data['ha_open']:.2f})",
-                            "Prix d'entrée": f"${entry_price:,.2f}",
-                            "Stop Loss": f"${levels['stop_loss']:,.2f}",
-                            "Take Profit": f"${levels['take_profit']:,.2f}",
-                            "Risk": f"${levels['risk']:.2f}",
-                            "Reward": f"${levels['reward']:.2f}",
-                            "R/R Ratio": f"1:{levels['reward']/levels['risk']:.2f}"
-                        })
-                        
-                        print(f"\n🚀 ENTRÉE LONG CONFIRMÉE !")
-                        print(f"   💰 Entry: ${entry_price:,.2f}")
-                        print(f"   🛡️  SL: ${levels['stop_loss']:,.2f}")
-                        print(f"   🎯 TP: ${levels['take_profit']:,.2f}")
-                        print(f"   📊 R/R: 1:{levels['reward']/levels['risk']:.2f}")
-                        
-                        # Reset signals
-                        self.waiting_for_long_confirmation = False
-                        self.pending_long_signal = None
+                self._process_closed_kline(kline)
+        except Exception as e:
+            print(f"❌ Erreur: {e}")
+    
+    def _process_closed_kline(self, kline):
+        """Traite une bougie fermée : état HA/RSI, logique de trading, affichage et callback (aucune I/O réseau)"""
+        open_price = float(kline['o'])
+        close_price = float(kline['c'])
+        high_price = float(kline['h'])
+        low_price = float(kline['l'])
+        close_time = kline['T']  # Close timestamp
+        
+        # Évite les doublons
+        if self.last_close_time != close_time:
+            self.last_close_time = close_time
+            
+            # Timestamp lisible - DÉFINI ICI EN PREMIER
+            close_datetime = datetime.fromtimestamp(close_time / 1000)
+            
+            # Calcule les valeurs Heikin-Ashi
+            ha_data = self.calculate_heikin_ashi(open_price, high_price, low_price, close_price)
+            ha_open = ha_data['ha_open']
+            ha_close = ha_data['ha_close']
+            
+            # Détermine la couleur basée sur Heikin-Ashi
+            color, color_key, trend, ha_change_pct = self.get_heikin_ashi_color_and_trend(ha_data)
+            
+            # Calcul du changement en % normal (pour comparaison)
+            normal_change_pct = (close_price - open_price) * (100.0 / open_price)
+            
+            # Met à jour les RSI avec le nouveau prix de fermeture (TA Library)
+            rsi_data = self.calculate_rsi_values(close_price)
+            rsi_5 = rsi_data['rsi_5']
+            rsi_14 = rsi_data['rsi_14']
+            rsi_21 = rsi_data['rsi_21']
+            
+            # ===============================
+            # LOGIQUE DE TRADING
+            # ===============================
+            
+            # 1. Vérifier si position ouverte doit être fermée
+            if self.current_position:
+                exit_reason = self.check_position_exit(close_price)
+                if exit_reason:
+                    pnl = 0
+                    if self.current_position['direction'] == 'LONG':
+                        pnl = close_price - self.current_position['entry_price']
+                    else:  # SHORT
+                        pnl = self.current_position['entry_price'] - close_price
                     
-                    elif self.waiting_for_short_confirmation and ha_data['ha_close'] < ha_data['ha_open']:
-                        # Bougie HA rouge confirmée pour SHORT
-                        # Note: Dans la réalité, l'entrée se ferait à l'ouverture de la bougie SUIVANTE
-                        # Ici on simule avec le prix de clôture actuel comme proxy
-                        entry_price = close_price
-                        levels = self.calculate_short_levels(entry_price, ha_data['ha_high'])
-                        
-                        self.current_position = {
-                            'direction': 'SHORT',
-                            'entry_price': entry_price,
-                            'entry_time': close_datetime,
-                            'stop_loss': levels['stop_loss'],
-                            'take_profit': levels['take_profit'],
-                            'ha_confirmation': {
-                                'ha_open': ha_data['ha_open'],
-                                'ha_close': ha_data['ha_close'],
-                                'ha_high': ha_data['ha_high']
-                            }
-                        }
-                        
-                        self.log_trade_event("ENTRÉE SHORT CONFIRMÉE", {
-                            "Signal RSI": f"RSI(5)={self.pending_short_signal['rsi_5']:.1f}, RSI(14)={self.pending_short_signal['rsi_14']:.1f}, RSI(21)={self.pending_short_signal['rsi_21']:.1f}", # type: ignore
-                            "Confirmation HA": f"HA Close ({ha_data['ha_close']:.2f}) < HA Open ({ha_data['ha_open']:.2f})",
-                            "Prix d'entrée": f"${entry_price:,.2f}",
-                            "Stop Loss": f"${levels['stop_loss']:,.2f}",
-                            "Take Profit": f"${levels['take_profit']:,.2f}",
-                            "Risk": f"${levels['risk']:.2f}",
-                            "Reward": f"${levels['reward']:.2f}",
-                            "R/R Ratio": f"1:{levels['reward']/levels['risk']:.2f}"
-                        })
-                        
-                        print(f"\n🩸 ENTRÉE SHORT CONFIRMÉE !")
-                        print(f"   💰 Entry: ${entry_price:,.2f}")
-                        print(f"   🛡️  SL: ${levels['stop_loss']:,.2f}")
-                        print(f"   🎯 TP: ${levels['take_profit']:,.2f}")
-                        print(f"   📊 R/R: 1:{levels['reward']/levels['risk']:.2f}")
-                        
-                        # Reset signals
-                        self.waiting_for_short_confirmation = False
-                        self.pending_short_signal = None
+                    pnl_pct = (pnl / self.current_position['entry_price']) * 100
                     
-                    # 4. Gérer les timeouts de signaux (éviter signaux trop anciens)
-                    timeout_seconds = self.get_timeout_seconds()
+                    # Log fermeture position
+                    self.log_trade_event("FERMETURE POSITION", {
+                        "Direction": self.current_position['direction'],
+                        "Raison": exit_reason,
+                        "Prix d'entrée": f"${self.current_position['entry_price']:,.2f}",
+                        "Prix de sortie": f"${close_price:,.2f}",
+                        "PnL": f"${pnl:,.2f}",
+                        "PnL %": f"{pnl_pct:+.2f}%",
+                        "Stop Loss": f"${self.current_position['stop_loss']:,.2f}",
+                        "Take Profit": f"${self.current_position['take_profit']:,.2f}",
+                        "Durée": str(close_datetime - self.current_position['entry_time'])
+                    })
                     
-                    if self.waiting_for_long_confirmation and self.pending_long_signal:
-                        time_diff = close_datetime - self.pending_long_signal['timestamp']
-                        if time_diff.total_seconds() > timeout_seconds:
-                            print(f"⏰ TIMEOUT - Signal LONG annulé après {timeout_seconds//60:.0f} minutes")
-                            self.log_trade_event("TIMEOUT SIGNAL LONG", {
-                                "Raison": f"Signal en attente depuis plus de {timeout_seconds//60:.0f} minutes",
-                                "Signal original": f"RSI(5)={self.pending_long_signal['rsi_5']:.1f}",
-                                "Durée d'attente": f"{time_diff.total_seconds():.0f} secondes"
-                            })
-                            self.waiting_for_long_confirmation = False
-                            self.pending_long_signal = None
+                    print(f"\n🚪 FERMETURE POSITION {self.current_position['direction']} - {exit_reason}")
+                    print(f"💰 PnL: ${pnl:,.2f} ({pnl_pct:+.2f}%)")
                     
-                    if self.waiting_for_short_confirmation and self.pending_short_signal:
-                        time_diff = close_datetime - self.pending_short_signal['timestamp']
-                        if time_diff.total_seconds() > timeout_seconds:
-                            print(f"⏰ TIMEOUT - Signal SHORT annulé après {timeout_seconds//60:.0f} minutes")
-                            self.log_trade_event("TIMEOUT SIGNAL SHORT", {
-                                "Raison": f"Signal en attente depuis plus de {timeout_seconds//60:.0f} minutes",
-                                "Signal original": f"RSI(5)={self.pending_short_signal['rsi_5']:.1f}",
-                                "Durée d'attente": f"{time_diff.total_seconds():.0f} secondes"
-                            })
-                            self.waiting_for_short_confirmation = False
-                            self.pending_short_signal = None
+                    # Reset position
+                    self.current_position = None
+            
+            # 2. Si pas de position, vérifier nouveaux signaux RSI
+            if not self.current_position:
+                rsi_signal = self.check_rsi_signal(rsi_data)
+                
+                # Signal RSI LONG détecté
+                if rsi_signal == "LONG" and not self.waiting_for_long_confirmation:
+                    self.waiting_for_long_confirmation = True
+                    self.pending_long_signal = {
+                        'timestamp': close_datetime,
+                        'rsi_5': rsi_5,
+                        'rsi_14': rsi_14,
+                        'rsi_21': rsi_21,
+                        'trigger_price': close_price
+                    }
                     
-                    # ===============================
-                    # AFFICHAGE ET CALLBACK
-                    # ===============================
+                    self.log_trade_event("SIGNAL RSI LONG DÉTECTÉ", {
+                        "RSI 5": f"{rsi_5:.1f}",
+                        "RSI 14": f"{rsi_14:.1f}",
+                        "RSI 21": f"{rsi_21:.1f}",
+                        "Prix": f"${close_price:,.2f}",
+                        "Statut": "En attente de bougie HA verte"
+                    })
                     
-                    # Affichage avec statut position
-                    position_status = ""
-                    if self.current_position:
-                        pos = self.current_position
-                        pnl = 0
-                        if pos['direction'] == 'LONG':
-                            pnl = close_price - pos['entry_price']
-                        else:
-                            pnl = pos['entry_price'] - close_price
-                        pnl_pct = (pnl / pos['entry_price']) * 100
-                        position_status = f" | 📈 {pos['direction']} PnL: ${pnl:+,.2f} ({pnl_pct:+.2f}%)"
-                    elif self.waiting_for_long_confirmation:
-                        position_status = " | ⏳ En attente HA VERTE"
-                    elif self.waiting_for_short_confirmation:
-                        position_status = " | ⏳ En attente HA ROUGE"
+                    print(f"\n🟢 SIGNAL RSI LONG DÉTECTÉ !")
+                    print(f"   RSI(5)={rsi_5:.1f}, RSI(14)={rsi_14:.1f}, RSI(21)={rsi_21:.1f}")
+                    print(f"   ⏳ En attente de bougie Heikin-Ashi VERTE...")
+                
+                # Signal RSI SHORT détecté
+                elif rsi_signal == "SHORT" and not self.waiting_for_short_confirmation:
+                    self.waiting_for_short_confirmation = True
+                    self.pending_short_signal = {
+                        'timestamp': close_datetime,
+                        'rsi_5': rsi_5,
+                        'rsi_14': rsi_14,
+                        'rsi_21': rsi_21,
+                        'trigger_price': close_price
+                    }
                     
-                    # Affichage ultra-rapide avec RSI TA et Heikin-Ashi
-                    print(f"\n⚡ BOUGIE FERMÉE - {close_datetime.strftime('%H:%M:%S')}{position_status}")
-                    print(f"📊 {self.symbol.upper()} | {self.interval}")
-                    print(f"💰 Normal: O=${open_price:,.2f} | C=${close_price:,.2f} | Δ={normal_change_pct:+.3f}%")
-                    print(f"🎯 Heikin-Ashi: O=${ha_data['ha_open']:,.2f} | C=${ha_data['ha_close']:,.2f} | Δ={ha_change_pct:+.3f}%")
-                    print(f"🎨 Couleur: {color} | {trend}")
-                    print(f"📊 RSI 5 (TA):  {self.get_rsi_signal(rsi_data['rsi_5'])}")
-                    print(f"📊 RSI 14 (TA): {self.get_rsi_signal(rsi_data['rsi_14'])}")
-                    print(f"📊 RSI 21 (TA): {self.get_rsi_signal(rsi_data['rsi_21'])}")
-                    print("-" * 50)
+                    self.log_trade_event("SIGNAL RSI SHORT DÉTECTÉ", {
+                        "RSI 5": f"{rsi_5:.1f}",
+                        "RSI 14": f"{rsi_14:.1f}",
+                        "RSI 21": f"{rsi_21:.1f}",
+                        "Prix": f"${close_price:,.2f}",
+                        "Statut": "En attente de bougie HA rouge"
+                    })
                     
-                    # Appel de callback personnalisé si défini
-                    if self.callback:
-                        self.callback({
-                            'symbol': self.symbol.upper(),
-                            'interval': self.interval,
-                            'open': open_price,
-                            'close': close_price,
-                            'high': high_price,
-                            'low': low_price,
-                            'ha_open': ha_data['ha_open'],
-                            'ha_close': ha_data['ha_close'],
-                            'ha_high': ha_data['ha_high'],
-                            'ha_low': ha_data['ha_low'],
-                            'color': 'green' if ha_data['ha_close'] > ha_data['ha_open'] else 'red' if ha_data['ha_close'] < ha_data['ha_open'] else 'doji',
-                            'normal_change_pct': normal_change_pct,
-                            'ha_change_pct': ha_change_pct,
-                            'timestamp': close_datetime,
-                            'rsi_5': rsi_data['rsi_5'],
-                            'rsi_14': rsi_data['rsi_14'],
-                            'rsi_21': rsi_data['rsi_21'],
-                            'waiting_long': self.waiting_for_long_confirmation,
-                            'waiting_short': self.waiting_for_short_confirmation,
-                            'current_position': self.current_position
-                        })
-                        
-        except Exception as e:
-            print(f"❌ Erreur: {e}")
+                    print(f"\n🔴 SIGNAL RSI SHORT DÉTECTÉ !")
+                    print(f"   RSI(5)={rsi_5:.1f}, RSI(14)={rsi_14:.1f}, RSI(21)={rsi_21:.1f}")
+                    print(f"   ⏳ En attente de bougie Heikin-Ashi ROUGE...")
+            
+            # 3. Vérifier confirmations Heikin-Ashi
+            if self.waiting_for_long_confirmation and ha_close > ha_open:
+                # Bougie HA verte confirmée pour LONG
+                # Note: Dans la réalité, l'entrée se ferait à l'ouverture de la bougie SUIVANTE
+                # Ici on simule avec le prix de clôture actuel comme proxy
+                entry_price = close_price
+                levels = self.calculate_long_levels(entry_price, ha_data['ha_low'])
+                
+                self.current_position = {
+                    'direction': 'LONG',
+                    'entry_price': entry_price,
+                    'entry_time': close_datetime,
+                    'stop_loss': levels['stop_loss'],
+                    'take_profit': levels['take_profit'],
+                    'ha_confirmation': {
+                        'ha_open': ha_open,
+                        'ha_close': ha_close,
+                        'ha_low': ha_data['ha_low']
+                    }
+                }
+                
+                self.log_trade_event("ENTRÉE LONG CONFIRMÉE", {
+                    "Signal RSI": f"RSI(5)={self.pending_long_signal['rsi_5']:.1f}, RSI(14)={self.pending_long_signal['rsi_14']:.1f}, RSI(21)={self.pending_long_signal['rsi_21']:.1f}", # type: ignore
+                    "Confirmation HA": f"HA Close ({ha_close:.2f}) > HA Open ({ha_open:.2f})",
+                    "Prix d'entrée": f"${entry_price:,.2f}",
+                    "Stop Loss": f"${levels['stop_loss']:,.2f}",
+                    "Take Profit": f"${levels['take_profit']:,.2f}",
+                    "Risk": f"${levels['risk']:.2f}",
+                    "Reward": f"${levels['reward']:.2f}",
+                    "R/R Ratio": f"1:{levels['reward']/levels['risk']:.2f}"
+                })
+                
+                print(f"\n🚀 ENTRÉE LONG CONFIRMÉE !")
+                print(f"   💰 Entry: ${entry_price:,.2f}")
+                print(f"   🛡️  SL: ${levels['stop_loss']:,.2f}")
+                print(f"   🎯 TP: ${levels['take_profit']:,.2f}")
+                print(f"   📊 R/R: 1:{levels['reward']/levels['risk']:.2f}")
+                
+                # Reset signals
+                self.waiting_for_long_confirmation = False
+                self.pending_long_signal = None
+            
+            elif self.waiting_for_short_confirmation and ha_close < ha_open:
+                # Bougie HA rouge confirmée pour SHORT
+                # Note: Dans la réalité, l'entrée se ferait à l'ouverture de la bougie SUIVANTE
+                # Ici on simule avec le prix de clôture actuel comme proxy
+                entry_price = close_price
+                levels = self.calculate_short_levels(entry_price, ha_data['ha_high'])
+                
+                self.current_position = {
+                    'direction': 'SHORT',
+                    'entry_price': entry_price,
+                    'entry_time': close_datetime,
+                    'stop_loss': levels['stop_loss'],
+                    'take_profit': levels['take_profit'],
+                    'ha_confirmation': {
+                        'ha_open': ha_open,
+                        'ha_close': ha_close,
+                        'ha_high': ha_data['ha_high']
+                    }
+                }
+                
+                self.log_trade_event("ENTRÉE SHORT CONFIRMÉE", {
+                    "Signal RSI": f"RSI(5)={self.pending_short_signal['rsi_5']:.1f}, RSI(14)={self.pending_short_signal['rsi_14']:.1f}, RSI(21)={self.pending_short_signal['rsi_21']:.1f}", # type: ignore
+                    "Confirmation HA": f"HA Close ({ha_close:.2f}) < HA Open ({ha_open:.2f})",
+                    "Prix d'entrée": f"${entry_price:,.2f}",
+                    "Stop Loss": f"${levels['stop_loss']:,.2f}",
+                    "Take Profit": f"${levels['take_profit']:,.2f}",
+                    "Risk": f"${levels['risk']:.2f}",
+                    "Reward": f"${levels['reward']:.2f}",
+                    "R/R Ratio": f"1:{levels['reward']/levels['risk']:.2f}"
+                })
+                
+                print(f"\n🩸 ENTRÉE SHORT CONFIRMÉE !")
+                print(f"   💰 Entry: ${entry_price:,.2f}")
+                print(f"   🛡️  SL: ${levels['stop_loss']:,.2f}")
+                print(f"   🎯 TP: ${levels['take_profit']:,.2f}")
+                print(f"   📊 R/R: 1:{levels['reward']/levels['risk']:.2f}")
+                
+                # Reset signals
+                self.waiting_for_short_confirmation = False
+                self.pending_short_signal = None
+            
+            # 4. Gérer les timeouts de signaux (éviter signaux trop anciens)
+            timeout_seconds = self.get_timeout_seconds()
+            
+            if self.waiting_for_long_confirmation and self.pending_long_signal:
+                time_diff = close_datetime - self.pending_long_signal['timestamp']
+                if time_diff.total_seconds() > timeout_seconds:
+                    print(f"⏰ TIMEOUT - Signal LONG annulé après {timeout_seconds//60:.0f} minutes")
+                    self.log_trade_event("TIMEOUT SIGNAL LONG", {
+                        "Raison": f"Signal en attente depuis plus de {timeout_seconds//60:.0f} minutes",
+                        "Signal original": f"RSI(5)={self.pending_long_signal['rsi_5']:.1f}",
+                        "Durée d'attente": f"{time_diff.total_seconds():.0f} secondes"
+                    })
+                    self.waiting_for_long_confirmation = False
+                    self.pending_long_signal = None
+            
+            if self.waiting_for_short_confirmation and self.pending_short_signal:
+                time_diff = close_datetime - self.pending_short_signal['timestamp']
+                if time_diff.total_seconds() > timeout_seconds:
+                    print(f"⏰ TIMEOUT - Signal SHORT annulé après {timeout_seconds//60:.0f} minutes")
+                    self.log_trade_event("TIMEOUT SIGNAL SHORT", {
+                        "Raison": f"Signal en attente depuis plus de {timeout_seconds//60:.0f} minutes",
+                        "Signal original": f"RSI(5)={self.pending_short_signal['rsi_5']:.1f}",
+                        "Durée d'attente": f"{time_diff.total_seconds():.0f} secondes"
+                    })
+                    self.waiting_for_short_confirmation = False
+                    self.pending_short_signal = None
+            
+            # ===============================
+            # AFFICHAGE ET CALLBACK
+            # ===============================
+            
+            # Affichage avec statut position
+            position_status = ""
+            if self.current_position:
+                pos = self.current_position
+                pnl = 0
+                if pos['direction'] == 'LONG':
+                    pnl = close_price - pos['entry_price']
+                else:
+                    pnl = pos['entry_price'] - close_price
+                pnl_pct = (pnl / pos['entry_price']) * 100
+                position_status = f" | 📈 {pos['direction']} PnL: ${pnl:+,.2f} ({pnl_pct:+.2f}%)"
+            elif self.waiting_for_long_confirmation:
+                position_status = " | ⏳ En attente HA VERTE"
+            elif self.waiting_for_short_confirmation:
+                position_status = " | ⏳ En attente HA ROUGE"
+            
+            # Affichage ultra-rapide avec RSI et Heikin-Ashi : un seul write (un seul verrou stdout)
+            if self.verbose:
+                get_rsi_signal = self.get_rsi_signal
+                sys.stdout.write(
+                    f"\n⚡ BOUGIE FERMÉE - {close_datetime.strftime('%H:%M:%S')}{position_status}\n"
+                    f"{self._header_line}"
+                    f"💰 Normal: O=${open_price:,.2f} | C=${close_price:,.2f} | Δ={normal_change_pct:+.3f}%\n"
+                    f"🎯 Heikin-Ashi: O=${ha_open:,.2f} | C=${ha_close:,.2f} | Δ={ha_change_pct:+.3f}%\n"
+                    f"🎨 Couleur: {color} | {trend}\n"
+                    f"📊 RSI 5 ({_RSI_SOURCE}):  {get_rsi_signal(rsi_5)}\n"
+                    f"📊 RSI 14 ({_RSI_SOURCE}): {get_rsi_signal(rsi_14)}\n"
+                    f"📊 RSI 21 ({_RSI_SOURCE}): {get_rsi_signal(rsi_21)}\n"
+                    f"{_SEPARATOR_LINE}"
+                )
+                sys.stdout.flush()
+            
+            # Appel de callback personnalisé si défini
+            callback = self.callback
+            if callback:
+                # Dictionnaire d'événement réutilisé : seuls les champs variables sont réécrits
+                event = self._event
+                event['open'] = open_price
+                event['close'] = close_price
+                event['high'] = high_price
+                event['low'] = low_price
+                event.update(ha_data)
+                event['color'] = color_key
+                event['normal_change_pct'] = normal_change_pct
+                event['ha_change_pct'] = ha_change_pct
+                event['timestamp'] = close_datetime
+                event.update(rsi_data)
+                event['waiting_long'] = self.waiting_for_long_confirmation
+                event['waiting_short'] = self.waiting_for_short_confirmation
+                event['current_position'] = self.current_position
+                callback(event)
     
     def on_error(self, ws, error):
         print(f"❌ Erreur WebSocket: {error}")
@@ -557,7 +641,7 @@ class CandleColorDetector:
         print("🔌 Connexion fermée")
     
     def on_open(self, ws):
-        print(f"🚀 Connexion ouverte pour {self.symbol.upper()} ({self.market_type.upper()})")
+        print(f"🚀 Connexion ouverte pour {self._symbol_upper} ({self._market_type_upper})")
         print(f"⏱️  Intervalle: {self.interval}")
         print("🎯 En attente de fermeture de bougie...")
         print("-" * 50)
@@ -565,8 +649,6 @@ class CandleColorDetector:
     def load_initial_data(self):
         """Charge les données initiales pour calculer les RSI dès le début"""
         try:
-            import requests
-            
             # URL selon le type de marché
             if self.market_type == "futures":
                 url = f"{self.api_base_url}/fapi/v1/klines"
@@ -574,61 +656,41 @@ class CandleColorDetector:
                 url = f"{self.api_base_url}/api/v3/klines"
                 
             params = {
-                'symbol': self.symbol.upper(),
+                'symbol': self._symbol_upper,
                 'interval': self.interval,
-                'limit': 50  # Assez pour calculer RSI 21
+                'limit': self.bootstrap_limit
             }
             
-            response = requests.get(url, params=params)
+            response = self.session.get(url, params=params, timeout=10)
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
                 
-                # Extrait les données OHLC pour initialiser Heikin-Ashi
-                for kline in data:
-                    open_price = float(kline[1])  # Index 1 = open price
-                    high_price = float(kline[2])  # Index 2 = high price
-                    low_price = float(kline[3])   # Index 3 = low price
-                    close_price = float(kline[4]) # Index 4 = close price
+                # Extrait les données OHLC (index 1 à 4) en une seule conversion
+                if data:
+                    ohlc = np.array([kline[1:5] for kline in data], dtype=np.float64)
+                    close_prices = ohlc[:, 3]
                     
-                    # Ajoute aux prix pour RSI
-                    self.prices.append(close_price)
+                    # Heikin-Ashi de tout l'historique (boucle native sous numba), seul le dernier est conservé
+                    ha_open, _, _, ha_close = ha_loop(
+                        ohlc[:, 0], ohlc[:, 1], ohlc[:, 2], close_prices,
+                        np.nan if self.prev_ha_open is None else self.prev_ha_open,
+                        np.nan if self.prev_ha_close is None else self.prev_ha_close
+                    )
+                    self.prev_ha_open = float(ha_open[-1])
+                    self.prev_ha_close = float(ha_close[-1])
                     
-                    # Initialise Heikin-Ashi avec les données historiques
-                    ha_data = self.calculate_heikin_ashi(open_price, high_price, low_price, close_price)
+                    # Amorce les RSI avec tout l'historique
+                    self.seed_prices(close_prices)
                 
-                print(f"✅ {len(self.prices)} prix historiques chargés pour calcul RSI TA ({self.market_type.upper()})")
+                print(f"✅ {len(data)} bougies historiques chargées pour amorcer HA et RSI ({self._market_type_upper})")
                 
-                # Affiche les RSI initiaux avec la bibliothèque TA
-                if len(self.prices) >= 5:
-                    price_series = pd.Series(self.prices)
-                    
-                    try:
-                        rsi_5_str = 'N/A'
-                        rsi_14_str = 'N/A'
-                        rsi_21_str = 'N/A'
-                        
-                        if len(self.prices) >= 5:
-                            rsi_5_indicator = RSIIndicator(close=price_series, window=5)
-                            rsi_5_series = rsi_5_indicator.rsi()
-                            if not rsi_5_series.empty and not pd.isna(rsi_5_series.iloc[-1]):
-                                rsi_5_str = f"{rsi_5_series.iloc[-1]:.1f}"
-                        
-                        if len(self.prices) >= 14:
-                            rsi_14_indicator = RSIIndicator(close=price_series, window=14)
-                            rsi_14_series = rsi_14_indicator.rsi()
-                            if not rsi_14_series.empty and not pd.isna(rsi_14_series.iloc[-1]):
-                                rsi_14_str = f"{rsi_14_series.iloc[-1]:.1f}"
-                        
-                        if len(self.prices) >= 21:
-                            rsi_21_indicator = RSIIndicator(close=price_series, window=21)
-                            rsi_21_series = rsi_21_indicator.rsi()
-                            if not rsi_21_series.empty and not pd.isna(rsi_21_series.iloc[-1]):
-                                rsi_21_str = f"{rsi_21_series.iloc[-1]:.1f}"
-                        
-                        print(f"📊 RSI TA initial - 5: {rsi_5_str}, 14: {rsi_14_str}, 21: {rsi_21_str}")
-                        
-                    except Exception as e:
-                        print(f"⚠️  Erreur calcul RSI TA initial: {e}")
+                # Affiche les RSI initiaux
+                initial_rsi = self.get_current_rsi_values()
+                rsi_5_str, rsi_14_str, rsi_21_str = (
+                    f"{initial_rsi[key]:.1f}" if initial_rsi[key] is not None else 'N/A'
+                    for key in ('rsi_5', 'rsi_14', 'rsi_21')
+                )
+                print(f"📊 RSI initial - 5: {rsi_5_str}, 14: {rsi_14_str}, 21: {rsi_21_str}")
                       
             else:
                 print("⚠️  Impossible de charger les données historiques, RSI disponible après quelques bougies")
@@ -649,7 +711,7 @@ class CandleColorDetector:
         else:
             socket_url = f"{self.ws_base_url}/ws/{self.symbol}@kline_{self.interval}"
         
-        print(f"🔗 Connexion WebSocket: {self.market_type.upper()}")
+        print(f"🔗 Connexion WebSocket: {self._market_type_upper}")
         
         self.ws = websocket.WebSocketApp(
             socket_url,
@@ -662,7 +724,84 @@ class CandleColorDetector:
         # Run forever avec reconnexion automatique
         self.ws.run_forever(
             ping_interval=20,  # Ping toutes les 20s
-            ping_timeout=10    # Timeout après 10s
+            ping_timeout=10,   # Timeout après 10s
+            skip_utf8_validation=True  # trames Binance toujours en UTF-8 valide
+        )
+    
+    def stop_monitoring(self):
+        """Arrête le monitoring"""
+        if self.ws:
+            self.ws.close()
+
+
+class MultiSymbolMonitor:
+    """
+    Plusieurs détecteurs sur UNE seule connexion WebSocket (flux combinés Binance)
+    
+    Chaque détecteur garde son propre état HA/RSI ; seules la socket, la poignée TLS
+    et le thread de réception sont partagés.
+    """
+    def __init__(self, detectors):
+        if not detectors:
+            raise ValueError("Au moins un détecteur est requis")
+        market_types = {detector.market_type for detector in detectors}
+        if len(market_types) > 1:
+            raise ValueError("Tous les détecteurs doivent être sur le même marché (spot ou futures)")
+        
+        self.detectors = list(detectors)
+        self.ws_base_url = self.detectors[0].ws_base_url
+        self.ws = None
+        
+        # Nom du flux combiné -> détecteur (ex. "btcusdt@kline_1m")
+        self._routes = {f"{detector.symbol}@kline_{detector.interval}": detector for detector in self.detectors}
+    
+    def on_message(self, ws, message):
+        """Route chaque bougie fermée vers le détecteur de son flux"""
+        try:
+            # Bougie encore ouverte : ignorée sans décoder le JSON
+            if (_CLOSED_MARKER_BYTES if isinstance(message, bytes) else _CLOSED_MARKER) not in message:
+                return
+            
+            payload = _json_loads(message)
+            detector = self._routes.get(payload['stream'])
+            kline = payload['data']['k']
+            if detector is not None and kline['x']:
+                detector._process_closed_kline(kline)
+        except Exception as e:
+            print(f"❌ Erreur: {e}")
+    
+    def on_error(self, ws, error):
+        print(f"❌ Erreur WebSocket: {error}")
+    
+    def on_close(self, ws, close_status_code, close_msg):
+        print("🔌 Connexion fermée")
+    
+    def on_open(self, ws):
+        print(f"🚀 Connexion ouverte pour {len(self.detectors)} flux: {', '.join(self._routes)}")
+        print("🎯 En attente de fermeture de bougie...")
+        print("-" * 50)
+    
+    def start_monitoring(self):
+        """Amorce chaque détecteur puis écoute tous les flux sur une seule connexion"""
+        print("🔄 Chargement des données historiques...")
+        for detector in self.detectors:
+            detector.load_initial_data()
+        
+        socket_url = f"{self.ws_base_url}/stream?streams={'/'.join(self._routes)}"
+        print(f"🔗 Connexion WebSocket combinée: {self.detectors[0]._market_type_upper}")
+        
+        self.ws = websocket.WebSocketApp(
+            socket_url,
+            on_message=self.on_message,
+            on_error=self.on_error,
+            on_close=self.on_close,
+            on_open=self.on_open
+        )
+        
+        self.ws.run_forever(
+            ping_interval=20,
+            ping_timeout=10,
+            skip_utf8_validation=True
         )
     
     def stop_monitoring(self):
@@ -692,22 +831,47 @@ def monitor_with_callback(symbol="btcusdt", interval="1m", callback_func=None, m
         print("\n🛑 Arrêt du monitoring...")
         detector.stop_monitoring()
 
+def monitor_multiple_pairs(symbols, interval="1m", callback_func=None, market_type="futures"):
+    """Monitor de plusieurs paires sur une seule connexion WebSocket"""
+    monitor = MultiSymbolMonitor([
+        CandleColorDetector(symbol, interval, callback_func, market_type=market_type)
+        for symbol in symbols
+    ])
+    
+    try:
+        monitor.start_monitoring()
+    except KeyboardInterrupt:
+        print("\n🛑 Arrêt du monitoring...")
+        monitor.stop_monitoring()
+
+# Messages du callback d'exemple par couleur HA : (icône, libellé, flèche) ; doji : rien à afficher
+_CALLBACK_COLOR_MSG = {
+    'green': ("✅", "VERTE", "📈"),
+    'red': ("🚨", "ROUGE", "📉"),
+}
+
+# Signal fort HA + RSI indexé par (couleur, RSI <= 35, RSI >= 65)
+_CALLBACK_STRONG_SIGNAL = {
+    ('green', True, False): "🚀 SIGNAL FORT: Bougie HA verte + RSI TA bas ({:.1f}) = Potentiel BULLISH",
+    ('red', False, True): "🔥 SIGNAL FORT: Bougie HA rouge + RSI TA haut ({:.1f}) = Potentiel BEARISH",
+}
+
 # Exemple de callback personnalisé avec RSI TA et Heikin-Ashi
 def my_candle_callback(candle_data):
     """Exemple de fonction callback avec RSI TA et Heikin-Ashi"""
     print(f"\n🎯 CALLBACK DÉCLENCHÉ:")
+    color = candle_data['color']
     
     # Analyse basée sur Heikin-Ashi
-    if candle_data['color'] == 'green':
-        print(f"✅ Bougie Heikin-Ashi VERTE sur {candle_data['symbol']}")
-        print(f"   📈 HA: {candle_data['ha_change_pct']:+.3f}% | Normal: {candle_data['normal_change_pct']:+.3f}%")
-    elif candle_data['color'] == 'red':
-        print(f"🚨 Bougie Heikin-Ashi ROUGE sur {candle_data['symbol']}")
-        print(f"   📉 HA: {candle_data['ha_change_pct']:+.3f}% | Normal: {candle_data['normal_change_pct']:+.3f}%")
+    color_msg = _CALLBACK_COLOR_MSG.get(color)
+    if color_msg:
+        icon, label, arrow = color_msg
+        print(f"{icon} Bougie Heikin-Ashi {label} sur {candle_data['symbol']}")
+        print(f"   {arrow} HA: {candle_data['ha_change_pct']:+.3f}% | Normal: {candle_data['normal_change_pct']:+.3f}%")
     
     # Analyse RSI TA
     rsi_14 = candle_data.get('rsi_14')
-    if rsi_14 is not None and not pd.isna(rsi_14):
+    if rsi_14 is not None:
         if rsi_14 >= 70:
             print(f"⚠️  RSI 14 TA en SURVENTE: {rsi_14:.1f}")
         elif rsi_14 <= 30:
@@ -751,10 +915,10 @@ def my_candle_callback(candle_data):
             print(f"   Distance SL: +{dist_sl:.2f}% | Distance TP: -{dist_tp:.2f}%")
     
     # Analyse combinée HA + RSI TA
-    if candle_data['color'] == 'green' and rsi_14 is not None and not pd.isna(rsi_14) and rsi_14 <= 35:
-        print(f"🚀 SIGNAL FORT: Bougie HA verte + RSI TA bas ({rsi_14:.1f}) = Potentiel BULLISH")
-    elif candle_data['color'] == 'red' and rsi_14 is not None and not pd.isna(rsi_14) and rsi_14 >= 65:
-        print(f"🔥 SIGNAL FORT: Bougie HA rouge + RSI TA haut ({rsi_14:.1f}) = Potentiel BEARISH")
+    if rsi_14 is not None:
+        strong_signal = _CALLBACK_STRONG_SIGNAL.get((color, rsi_14 <= 35, rsi_14 >= 65))
+        if strong_signal:
+            print(strong_signal.format(rsi_14))
     
     # Analyse de la force du mouvement HA vs Normal
     ha_change = abs(candle_data['ha_change_pct'])
@@ -770,7 +934,7 @@ if __name__ == "__main__":
     print("🎯 Détecteur de couleur de bougie - Heikin-Ashi + RSI TA Library + Trading Logic")
     print("=" * 80)
     print("📋 Dépendances requises:")
-    print("   pip install ta pandas numpy websocket-client requests")
+    print("   pip install pandas numpy websocket-client requests  (ta si USE_TA_LIB)")
     print("=" * 80)
     print("🎮 Fonctionnalités:")
     print("   ✅ Détection RSI (5, 14, 21)")
@@ -793,4 +957,7 @@ if __name__ == "__main__":
     # monitor_with_callback("btcusdt", "1m", my_candle_callback, "futures")
     
     # Option 4: Avec callback personnalisé SPOT
-    monitor_with_callback("btcusdt", "5m", my_candle_callback, "spot")
\ No newline at end of file
+    monitor_with_callback("btcusdt", "5m", my_candle_callback, "spot")
+    
+    # Option 5: Plusieurs paires FUTURES sur une seule connexion
+    # monitor_multiple_pairs(["btcusdt", "ethusdt"], "1m", my_candle_callback, "futures")
\ No newline at end of file
@@ -6,11 +6,20 @@ AMÉLIORATIONS : Cache des précisions, validation automatique, formatage correc
 import logging
 import time
 import math
+import threading
+import json
 from typing import Dict, List, Optional, Tuple
 from binance.client import Client
 from binance.enums import *
 from binance.exceptions import BinanceAPIException, BinanceOrderException
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # orjson optionnel : python-binance garde son décodage json standard
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +37,23 @@ class BinanceFuturesClient:
         # 🆕 Cache pour les informations de précision
         self.symbol_info_cache = {}
         self.cache_loaded = False
+        self.last_cache_attempt = 0.0
+        self.cache_retry_interval = 60  # secondes entre deux rechargements après échec
+        self.cache_refresh_interval = 24 * 3600  # rafraîchissement quotidien des filtres
+        self._cache_refresh_thread = None
+        self._refresh_stop = threading.Event()
+        
+        # Ping périodique optionnel : garde la connexion TLS du pool ouverte pendant les temps morts
+        self._keepalive_thread = None
+        self._keepalive_stop = threading.Event()
+        
+        # Cache de prix WebSocket optionnel (BookTickerStream), consulté avant le REST
+        self.price_stream = None
+        
+        # Cache TTL des prix REST : les appels rapprochés (résumé, monitoring, risque) partagent une requête
+        self.price_ttl = 0.25  # secondes, à garder ≤ monitor_interval / 4
+        self._price_cache: Dict[str, Tuple[float, float]] = {}  # symbole -> (prix, horodatage monotone)
+        self._price_cache_lock = threading.Lock()
         
         self.connect()
     
@@ -39,6 +65,7 @@ class BinanceFuturesClient:
                 api_secret=self.api_secret,
                 testnet=self.testnet
             )
+            self._configure_session()
             
             # Test de connexion
             account_info = self.client.futures_account()
@@ -46,6 +73,7 @@ class BinanceFuturesClient:
             
             # 🆕 Chargement automatique des informations d'échange
             self._load_exchange_info()
+            self._start_cache_refresh()
             
             return True
             
@@ -53,8 +81,87 @@ class BinanceFuturesClient:
             logger.error(f"❌ Erreur connexion Binance: {e}")
             return False
     
+    def _configure_session(self):
+        """Pool de connexions keep-alive sur la session HTTP de python-binance (évite un handshake TLS par appel)"""
+        # Retry limité aux méthodes idempotentes par défaut : jamais de POST rejoué (pas d'ordre dupliqué)
+        retry = Retry(total=2, backoff_factor=0.1, status_forcelist=[500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, pool_block=False, max_retries=retry)
+        self.client.session.mount('https://', adapter)
+        
+        # Décodage orjson des réponses (exchangeInfo fait plusieurs centaines de Ko)
+        if orjson is not None:
+            self._install_fast_json()
+    
+    def _install_fast_json(self):
+        """Remplace le décodage des réponses 2xx de python-binance par orjson (erreurs : chemin d'origine)"""
+        original_handler = self.client._handle_response
+        
+        def handle_response(response):
+            if 200 <= response.status_code < 300:
+                try:
+                    return orjson.loads(response.content)
+                except orjson.JSONDecodeError:
+                    pass  # Corps vide ou invalide : l'erreur d'origine est levée plus bas
+            return original_handler(response)
+        
+        self.client._handle_response = handle_response
+    
+    @staticmethod
+    def _count_decimals(step: Optional[float]) -> Optional[int]:
+        """Nombre de décimales d'un stepSize/tickSize (0.001 -> 3)"""
+        if step is None:
+            return None
+        step_str = f"{step:.10f}".rstrip('0')
+        if '.' in step_str:
+            return len(step_str.split('.')[1])
+        return 0
+    
+    def _start_cache_refresh(self):
+        """Démarre le rafraîchissement périodique des filtres de symboles en arrière-plan"""
+        if self._cache_refresh_thread and self._cache_refresh_thread.is_alive():
+            return
+        
+        def refresh_loop():
+            while not self._refresh_stop.wait(self.cache_refresh_interval):
+                try:
+                    self._load_exchange_info()
+                except Exception as e:
+                    logger.warning(f"⚠️ Rafraîchissement des filtres échoué: {e}")
+        
+        self._refresh_stop.clear()
+        self._cache_refresh_thread = threading.Thread(target=refresh_loop)
+        self._cache_refresh_thread.daemon = True
+        self._cache_refresh_thread.start()
+    
+    def start_keepalive(self, interval: float = 30.0):
+        """Ping futures toutes les `interval` secondes pour que la prochaine requête réutilise la connexion"""
+        if self._keepalive_thread and self._keepalive_thread.is_alive():
+            return
+        
+        def keepalive_loop():
+            while not self._keepalive_stop.wait(interval):
+                try:
+                    self.client.futures_ping()
+                except Exception as e:
+                    logger.warning(f"⚠️ Ping keep-alive échoué: {e}")
+        
+        self._keepalive_stop.clear()
+        self._keepalive_thread = threading.Thread(target=keepalive_loop)
+        self._keepalive_thread.daemon = True
+        self._keepalive_thread.start()
+    
+    def stop_keepalive(self):
+        """Arrête le ping keep-alive"""
+        self._keepalive_stop.set()
+    
+    def shutdown(self):
+        """Arrête les threads d'arrière-plan du client (keep-alive, rafraîchissement des filtres)"""
+        self.stop_keepalive()
+        self._refresh_stop.set()
+    
     def _load_exchange_info(self):
         """🆕 Charge les informations d'échange dans le cache"""
+        self.last_cache_attempt = time.time()
         try:
             logger.info("📊 Chargement des informations d'échange...")
             exchange_info = self.client.futures_exchange_info()
@@ -89,6 +196,10 @@ class BinanceFuturesClient:
                     elif filter_info['filterType'] == 'MIN_NOTIONAL':
                         precision_data['minNotional'] = float(filter_info['notional'])
                 
+                # Décimales pré-calculées pour format_quantity/format_price
+                precision_data['stepDecimals'] = self._count_decimals(precision_data['stepSize'])
+                precision_data['tickDecimals'] = self._count_decimals(precision_data['tickSize'])
+                
                 self.symbol_info_cache[symbol] = precision_data
             
             self.cache_loaded = True
@@ -100,7 +211,8 @@ class BinanceFuturesClient:
     
     def get_symbol_info(self, symbol: str) -> Optional[Dict]:
         """🆕 Récupère les informations de précision pour un symbole"""
-        if not self.cache_loaded:
+        # Après un échec, pas de nouvel exchangeInfo complet à chaque appel
+        if not self.cache_loaded and time.time() - self.last_cache_attempt >= self.cache_retry_interval:
             self._load_exchange_info()
         return self.symbol_info_cache.get(symbol)
     
@@ -121,18 +233,12 @@ class BinanceFuturesClient:
         if step_size == 0:
             return quantity
         
-        # Calcul précis du nombre de décimales
-        step_str = f"{step_size:.10f}".rstrip('0')
-        if '.' in step_str:
-            decimals = len(step_str.split('.')[1])
-        else:
-            decimals = 0
+        decimals = symbol_info['stepDecimals']
         
         # ⚠️ CRITIQUE: Arrondi vers le bas pour éviter "insufficient balance"
+        # Entier / 10**decimals : déjà le float le plus proche de la valeur décimale, pas de round() final
         precision_factor = 10 ** decimals
-        formatted_qty = math.floor(quantity * precision_factor) / precision_factor
-        
-        return round(formatted_qty, decimals)
+        return math.floor(quantity * precision_factor) / precision_factor
     
     def format_price(self, price: float, symbol: str) -> float:
         """🔧 AMÉLIORÉ: Formate le prix selon les règles exactes du symbole"""
@@ -149,12 +255,7 @@ class BinanceFuturesClient:
         if tick_size == 0:
             return price
         
-        # Calcul précis du nombre de décimales
-        tick_str = f"{tick_size:.10f}".rstrip('0')
-        if '.' in tick_str:
-            decimals = len(tick_str.split('.')[1])
-        else:
-            decimals = 0
+        decimals = symbol_info['tickDecimals']
         
         # Arrondi au tick size le plus proche
         formatted_price = round(price / tick_size) * tick_size
@@ -254,8 +355,28 @@ class BinanceFuturesClient:
         except (KeyError, ValueError) as e:
             return None, f"Erreur parsing balance: {e}"
     
-    def get_current_price(self, symbol: str) -> Tuple[Optional[float], Optional[str]]:
-        """Récupère le prix actuel d'une paire"""
+    def set_price_stream(self, price_stream):
+        """Branche (ou retire avec None) le cache de prix WebSocket consulté avant le REST"""
+        self.price_stream = price_stream
+    
+    def get_current_price(self, symbol: str, force: bool = False) -> Tuple[Optional[float], Optional[str]]:
+        """
+        Récupère le prix actuel d'une paire.
+        Si un flux bookTicker est branché, renvoie le prix moyen (bid+ask)/2 du flux ;
+        sinon le dernier prix échangé (REST, cache TTL).
+        force=True : ignore le flux et le cache TTL et interroge le REST
+        """
+        if not force:
+            if self.price_stream is not None:
+                price = self.price_stream.get_mid_price(symbol)
+                if price is not None:
+                    return price, None
+            
+            with self._price_cache_lock:
+                cached = self._price_cache.get(symbol)
+            if cached is not None and time.monotonic() - cached[1] < self.price_ttl:
+                return cached[0], None
+        
         result, error = self._execute_request(
             self.client.futures_symbol_ticker,
             symbol=symbol
@@ -265,10 +386,24 @@ class BinanceFuturesClient:
         
         try:
             price = float(result['price'])
+            with self._price_cache_lock:
+                self._price_cache[symbol] = (price, time.monotonic())
             return price, None
         except (KeyError, ValueError) as e:
             return None, f"Erreur parsing price: {e}"
-    
+
+    def get_mark_prices(self) -> Tuple[Optional[List], Optional[str]]:
+        """Récupère les mark prices de tous les symboles en un seul appel (/fapi/v1/premiumIndex)"""
+        result, error = self._execute_request(self.client.futures_mark_price)
+        if error:
+            return None, str(error)
+
+        # Sans paramètre symbol, l'API renvoie une liste ; avec un seul symbole, un dict
+        if isinstance(result, dict):
+            result = [result]
+
+        return result, None
+
     def get_klines(self, symbol: str, interval: str, limit: int = 100) -> Tuple[Optional[List], Optional[str]]:
         """Récupère les données de chandelles"""
         result, error = self._execute_request(
@@ -297,7 +432,8 @@ class BinanceFuturesClient:
                 symbol=symbol,
                 side=side,
                 type=FUTURE_ORDER_TYPE_MARKET,
-                quantity=formatted_qty
+                quantity=formatted_qty,
+                newOrderRespType='RESULT'  # avgPrice/executedQty renvoyés directement
             )
             
             if error:
@@ -371,6 +507,81 @@ class BinanceFuturesClient:
             logger.error(f"❌ Erreur take profit: {e}")
             return None, str(e)
     
+    def place_batch_orders(self, orders: List[Dict]) -> Tuple[Optional[List], Optional[str]]:
+        """Place jusqu'à 5 ordres en une seule requête (POST /fapi/v1/batchOrders)"""
+        result, error = self._execute_request(
+            self.client.futures_place_batch_order,
+            batchOrders=orders
+        )
+        
+        if error:
+            return None, str(error)
+        
+        return result, None
+    
+    def place_sl_tp_orders(self, symbol: str, side: str, quantity: float, stop_price: float,
+                           tp_price: float) -> List[Tuple[Optional[Dict], Optional[str]]]:
+        """
+        Place le Stop Loss (STOP_MARKET) et le Take Profit (LIMIT) en un seul aller-retour
+        
+        Returns:
+            [(sl_result, sl_error), (tp_result, tp_error)]
+        """
+        valid_sl, _, sl_params = self.validate_order_params(symbol, quantity, stop_price)
+        valid_tp, _, tp_params = self.validate_order_params(symbol, quantity, tp_price)
+        if not (valid_sl and valid_tp):
+            # Ordres indépendants : un TP rejeté n'empêche pas de poser le SL (et inversement)
+            return [
+                self.place_stop_order(symbol, side, quantity, stop_price),
+                self.place_limit_order(symbol, side, quantity, tp_price)
+            ]
+        
+        # L'endpoint batch attend des valeurs sous forme de chaînes
+        orders = [
+            {
+                'symbol': symbol,
+                'side': side,
+                'type': FUTURE_ORDER_TYPE_STOP_MARKET,
+                'quantity': str(sl_params['quantity']),
+                'stopPrice': str(sl_params['price']),
+                'reduceOnly': 'true',
+                'newOrderRespType': 'RESULT'
+            },
+            {
+                'symbol': symbol,
+                'side': side,
+                'type': FUTURE_ORDER_TYPE_LIMIT,
+                'quantity': str(tp_params['quantity']),
+                'price': str(tp_params['price']),
+                'timeInForce': TIME_IN_FORCE_GTC,
+                'reduceOnly': 'true',
+                'newOrderRespType': 'RESULT'
+            }
+        ]
+        
+        results, error = self.place_batch_orders(orders)
+        if error:
+            logger.warning(f"⚠️ Batch SL/TP échoué ({error}) - placement ordre par ordre")
+            results = [{}, {}]
+        
+        # Chaque élément est soit l'ordre créé, soit {'code': ..., 'msg': ...} : les rejets sont retentés seuls
+        placed = []
+        for item, place_single, price in (
+            (results[0], self.place_stop_order, stop_price),
+            (results[1], self.place_limit_order, tp_price)
+        ):
+            if 'orderId' in item:
+                placed.append((item, None))
+            else:
+                if item:
+                    logger.warning(f"⚠️ Ordre rejeté dans le batch: {item.get('code')}: {item.get('msg')}")
+                placed.append(place_single(symbol, side, quantity, price))
+        
+        if not placed[0][1] and not placed[1][1]:
+            logger.info(f"✅ SL/TP placés: {side} {sl_params['quantity']} {symbol} "
+                        f"SL@{sl_params['price']} TP@{tp_params['price']}")
+        return placed
+    
     def cancel_order(self, symbol: str, order_id: int) -> Tuple[Optional[Dict], Optional[str]]:
         """Annule un ordre"""
         result, error = self._execute_request(
@@ -385,6 +596,46 @@ class BinanceFuturesClient:
         logger.info(f"✅ Ordre annulé: {order_id}")
         return result, None
     
+    def cancel_all_open_orders(self, symbol: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """Annule tous les ordres ouverts d'un symbole en une requête (DELETE /fapi/v1/allOpenOrders)"""
+        result, error = self._execute_request(
+            self.client.futures_cancel_all_open_orders,
+            symbol=symbol
+        )
+        
+        if error:
+            return None, str(error)
+        
+        logger.info(f"✅ Tous les ordres {symbol} annulés")
+        return result, None
+    
+    def cancel_batch_orders(self, symbol: str, order_ids: List[int]) -> List[Tuple[Optional[Dict], Optional[str]]]:
+        """
+        Annule jusqu'à 10 ordres en une seule requête (DELETE /fapi/v1/batchOrders)
+        
+        Returns:
+            [(result, error)] dans l'ordre de order_ids
+        """
+        results, error = self._execute_request(
+            self.client.futures_cancel_orders,
+            symbol=symbol,
+            orderIdList=json.dumps(order_ids)
+        )
+        
+        if error:
+            return [(None, str(error))] * len(order_ids)
+        
+        # Chaque élément est soit l'ordre annulé, soit {'code': ..., 'msg': ...}
+        cancelled = []
+        for item in results:
+            if 'orderId' in item:
+                cancelled.append((item, None))
+            else:
+                cancelled.append((None, f"{item.get('code')}: {item.get('msg')}"))
+        
+        logger.info(f"✅ Annulation batch {symbol}: {order_ids}")
+        return cancelled
+    
     def get_open_orders(self, symbol: str) -> Tuple[Optional[List], Optional[str]]:
         """Récupère les ordres ouverts"""
         result, error = self._execute_request(
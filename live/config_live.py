@@ -3,24 +3,34 @@
 Configuration pour le trading live sur Binance Futures
 """
 import os
+import functools
 from datetime import datetime
 
 
 
-def load_api_credentials_from_env(key_name, filename=".env"):
-    env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
-    if not os.path.exists(env_path):
-        raise FileNotFoundError(f"Fichier .env non trouvé à l'emplacement : {env_path}")
-    
+@functools.lru_cache(maxsize=None)
+def _read_env_file(env_path):
+    """Lit et parse le fichier .env une seule fois (clé -> valeur)"""
+    values = {}
     with open(env_path, "r") as file:
         for line in file:
             line = line.strip()
             if not line or line.startswith("#"):
                 continue
-            if f"{key_name}=" in line:
-                return line.split("=", 1)[1].strip()
+            key, sep, value = line.partition("=")
+            if sep:
+                values[key.strip()] = value.strip()
+    return values
+
+def load_api_credentials_from_env(key_name, filename=".env"):
+    env_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+    if not os.path.exists(env_path):
+        raise FileNotFoundError(f"Fichier .env non trouvé à l'emplacement : {env_path}")
     
-    raise ValueError(f"Clé '{key_name}' manquante dans le fichier .env")
+    value = _read_env_file(env_path).get(key_name)
+    if value is None:
+        raise ValueError(f"Clé '{key_name}' manquante dans le fichier .env")
+    return value
 
 # Configuration de l'environnement
 ENVIRONMENT = {
@@ -71,6 +81,9 @@ TRADING_CONFIG = {
     # Frais et slippage
     "trading_fees": 0.0004,  # 0.04% (maker/taker Binance Futures)
     "slippage": 0.0002,      # 0.02% slippage estimé
+    
+    # Nombre max de trades terminés conservés en mémoire
+    "history_size": 10000,
 }
 
 # Filtres activés
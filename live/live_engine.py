@@ -13,13 +13,14 @@ import sys
 
 from config_live import (
     API_CONFIG, TRADING_CONFIG, FILTERS_CONFIG, 
-    MONITORING_CONFIG, SAFETY_LIMITS, ENVIRONMENT
+    MONITORING_CONFIG, SAFETY_LIMITS, ENVIRONMENT, DATABASE_CONFIG
 )
 from binance_client import BinanceFuturesClient
 from data_manager import RealTimeDataManager
 from signal_detector import LiveSignalDetector
 from risk_manager import LiveRiskManager
 from order_manager import LiveOrderManager
+from trade_archive import TradeArchive
 from monitoring import LiveMonitoring, PerformanceTracker
 
 logger = logging.getLogger(__name__)
@@ -96,6 +97,11 @@ class LiveTradingEngine:
                 safety_limits=SAFETY_LIMITS
             )
             
+            # Quantités arrondies au stepSize réel du symbole (évite les rejets LOT_SIZE)
+            symbol_info = self.binance_client.get_symbol_info(TRADING_CONFIG["symbol"])
+            if symbol_info and symbol_info.get('stepSize'):
+                self.risk_manager.set_symbol_filters(TRADING_CONFIG["symbol"], symbol_info['stepSize'])
+            
             # Mise à jour du solde initial pour USDC
             balance, error = self.binance_client.get_account_balance("USDC")
             if not error:
@@ -113,9 +119,13 @@ class LiveTradingEngine:
             
             # 5. Gestionnaire d'ordres
             logger.info("📋 Initialisation gestionnaire d'ordres...")
+            trade_archive = None
+            if DATABASE_CONFIG["enabled"] and DATABASE_CONFIG["type"] == "sqlite":
+                trade_archive = TradeArchive(DATABASE_CONFIG["filename"], DATABASE_CONFIG["table_trades"])
             self.order_manager = LiveOrderManager(
                 binance_client=self.binance_client,
-                config=TRADING_CONFIG
+                config=TRADING_CONFIG,
+                trade_archive=trade_archive
             )
             
             # 6. Système de surveillance
@@ -176,6 +186,7 @@ class LiveTradingEngine:
             self.running = True
             
             # Démarrage des composants
+            self.order_manager.start()
             self.data_manager.start_websocket()
             self.monitoring.start_monitoring()
             
@@ -220,12 +231,18 @@ class LiveTradingEngine:
                     logger.info(f"🔄 {active_count} trades fermés")
             
             # Arrêt des composants
+            if self.order_manager:
+                self.order_manager.shutdown()
+            
             if self.data_manager:
                 self.data_manager.stop_websocket()
             
             if self.monitoring:
                 self.monitoring.stop_monitoring()
             
+            if self.binance_client:
+                self.binance_client.shutdown()
+            
             # Attendre les threads
             if self.main_thread and self.main_thread.is_alive():
                 self.main_thread.join(timeout=10)
@@ -431,7 +448,8 @@ class LiveTradingEngine:
             position_size = self.risk_manager.calculate_position_size(
                 entry_price=current_price,
                 stop_loss=stop_loss,
-                direction=signal.direction
+                direction=signal.direction,
+                symbol=TRADING_CONFIG["symbol"]
             )
             
             if not position_size:
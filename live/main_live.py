@@ -5,6 +5,9 @@ Point d'entrée principal pour le trading bot live
 import os
 import sys
 import logging
+import logging.handlers
+import queue
+import atexit
 import time
 import argparse
 from datetime import datetime
@@ -35,6 +38,8 @@ def setup_logging():
         handlers=[]
     )
     
+    handlers = []
+    
     # Handler pour fichier
     if LOGGING_CONFIG["log_to_file"]:
         file_handler = logging.FileHandler(
@@ -42,13 +47,22 @@ def setup_logging():
             encoding='utf-8'
         )
         file_handler.setFormatter(logging.Formatter(log_format))
-        logging.getLogger().addHandler(file_handler)
+        handlers.append(file_handler)
     
     # Handler pour console
     if LOGGING_CONFIG["log_to_console"]:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setFormatter(logging.Formatter(log_format))
-        logging.getLogger().addHandler(console_handler)
+        handlers.append(console_handler)
+    
+    # Écritures fichier/console déportées dans le thread du QueueListener :
+    # le thread de trading ne fait qu'empiler l'enregistrement
+    if handlers:
+        log_queue = queue.SimpleQueue()
+        logging.getLogger().addHandler(logging.handlers.QueueHandler(log_queue))
+        listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
     
     # Réduction des logs externes
     logging.getLogger('websocket').setLevel(logging.WARNING)
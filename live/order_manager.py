@@ -5,32 +5,55 @@ Gère l'exécution, le suivi et la fermeture des trades
 VERSION FINALE COMPLÈTE - Fix de tous les bugs + attente d'exécution
 """
 import logging
+import math
+import random
 import time
 import json
 import threading
+import queue
+from collections import OrderedDict, deque
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
-from enum import Enum
+from dataclasses import dataclass, field
+from enum import IntEnum
 from binance_client import BinanceFuturesClient
 from risk_manager import PositionSize
+from user_data_stream import UserDataStream
+from price_stream import BookTickerStream
+from trade_archive import TradeArchive
 
 logger = logging.getLogger(__name__)
 
-class OrderStatus(Enum):
-    PENDING = "pending"
-    FILLED = "filled"
-    CANCELLED = "cancelled"
-    FAILED = "failed"
+# IntEnum : comparaisons entières (et `is` sur les membres singletons) dans les boucles de monitoring
+class OrderStatus(IntEnum):
+    PENDING = 0
+    FILLED = 1
+    CANCELLED = 2
+    FAILED = 3
 
-class TradeStatus(Enum):
-    OPENING = "opening"
-    OPEN = "open"
-    CLOSING = "closing"
-    CLOSED = "closed"
-    FAILED = "failed"
+class TradeStatus(IntEnum):
+    OPENING = 0
+    OPEN = 1
+    CLOSING = 2
+    CLOSED = 3
+    FAILED = 4
 
-@dataclass
+# Statuts après lesquels un ordre n'évoluera plus
+_TERMINAL_STATES = frozenset({'FILLED', 'CANCELED', 'REJECTED', 'EXPIRED'})
+
+# Délai de polling selon la distance au SL/TP la plus proche, en écarts-types de prix sur 1s
+# (distance_ratio max, délai en secondes) ; au-delà du dernier seuil : max_poll_interval
+_POLL_DELAYS = ((0.5, 0.5), (1.0, 1.0), (2.0, 2.0), (5.0, 5.0))
+
+# Côté d'entrée, côté de fermeture et signe du PnL selon la direction
+DIRECTION_SIDES = {
+    "LONG": ("BUY", "SELL", 1),
+    "SHORT": ("SELL", "BUY", -1),
+}
+
+@dataclass(slots=True, kw_only=True)
 class Order:
     """Représente un ordre sur Binance"""
     order_id: int
@@ -44,7 +67,7 @@ class Order:
     filled_qty: float = 0.0
     avg_price: float = 0.0
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class Trade:
     """Représente un trade complet (entry + SL + TP)"""
     trade_id: str
@@ -69,34 +92,97 @@ class Trade:
     exit_reason: Optional[str] = None
     
     # Timestamps
-    created_at: datetime = None
+    created_at: int = 0  # ns depuis epoch (time.time_ns), voir created_at_dt
     opened_at: Optional[datetime] = None
     closed_at: Optional[datetime] = None
+    
+    # Dérivés de la direction (calculés une seule fois)
+    entry_side: str = field(init=False)
+    close_side: str = field(init=False)
+    sign: int = field(init=False)
+    
+    def __post_init__(self):
+        self.entry_side, self.close_side, self.sign = DIRECTION_SIDES[self.direction]
+    
+    @property
+    def created_at_dt(self) -> Optional[datetime]:
+        """Date de création convertie à la demande (affichage/logs)"""
+        return datetime.fromtimestamp(self.created_at / 1e9) if self.created_at else None
 
 class LiveOrderManager:
     """Gestionnaire d'ordres pour trading live - VERSION FINALE"""
     
-    def __init__(self, binance_client: BinanceFuturesClient, config: Dict):
+    def __init__(self, binance_client: BinanceFuturesClient, config: Dict,
+                 trade_archive: Optional[TradeArchive] = None):
         self.client = binance_client
         self.config = config
+        # Archive SQLite : les trades sortis de l'historique borné restent consultables sur disque
+        self.trade_archive = trade_archive
         
         # Stockage des trades et ordres
         self.active_trades: Dict[str, Trade] = {}
-        self.completed_trades: List[Trade] = []
+        # Historique borné : les agrégats de performance conservent tout l'historique
+        self.completed_trades: deque = deque(maxlen=self.config.get('history_size', 10000))
         self.orders_history: List[Order] = []
+
+        # Agrégats de performance maintenus à la clôture de chaque trade
+        self._stats = {
+            'wins': 0,
+            'losses': 0,
+            'sum_win_pnl': 0.0,
+            'sum_loss_pnl': 0.0,
+            'total_pnl': 0.0
+        }
+        # Historique complet des PnL (tableau à capacité doublée) pour un recalcul vectorisé
+        self._pnl_array = np.zeros(256, dtype=np.float64)
+        self._pnl_n = 0
+        # Dernier résultat de get_performance_stats, invalidé à chaque mise à jour des agrégats
+        self._perf_cache: Optional[Dict] = None
+
+        # Totaux courants des trades actifs (évite de re-parcourir active_trades)
+        self._long_count = 0
+        self._short_count = 0
+        self._exposure = 0.0
+
+        # Protège la mise à jour des trades actifs/terminés (fermetures concurrentes)
+        self._trades_lock = threading.RLock()
+        # Snapshot des trades actifs reconstruit seulement quand le dict change (version incrémentée)
+        self._active_version = 0
+        self._snapshot: Tuple[Trade, ...] = ()
+        self._snapshot_version = 0
         
         # Monitoring
         self.monitoring_active = False
         self.monitor_thread = None
         self.monitor_interval = 5  # secondes
+        # Avec le User Data Stream, les exécutions SL/TP sont poussées : la boucle ne sert que de filet
+        self.heartbeat_interval = 60  # secondes
+        # Polling REST adaptatif : fréquent près des niveaux SL/TP, espacé loin d'eux
+        self.min_poll_interval = 0.5  # secondes
+        self.max_poll_interval = 30  # secondes
+        self._vol_ema_alpha = 0.1
+        self._vol_ema: Dict[str, float] = {}  # EMA des |rendements| normalisés à 1s, par symbole
+        self._last_poll_prices: Dict[str, Tuple[float, float]] = {}  # symbole -> (prix, horodatage monotone)
+        self._stop_event = threading.Event()  # réveille immédiatement la boucle à l'arrêt
+        self._monitor_lock = threading.Lock()  # empêche le démarrage de deux threads
+        # Attente max d'une requête REST en cours à l'arrêt (thread daemon : il s'arrête de lui-même ensuite)
+        self.monitor_join_timeout = 2  # secondes
         
         # Callbacks
         self.on_trade_opened_callbacks = []
         self.on_trade_closed_callbacks = []
         self.on_order_filled_callbacks = []
         
+        # Les callbacks (DB, notifications...) s'exécutent hors du thread d'exécution des ordres
+        self._callback_queue = queue.SimpleQueue()
+        self._callback_thread = threading.Thread(target=self._callback_loop)
+        self._callback_thread.daemon = True
+        self._callback_thread.start()
+        
         # Compteurs
         self.trade_counter = 0
+        # Identifiant de session calculé une fois : garde des trade_id uniques entre redémarrages
+        self._session_id = int(time.time())
         
         # Debug mode
         self.debug_mode = True
@@ -105,6 +191,37 @@ class LiveOrderManager:
         self.execution_timeout = 10  # secondes pour attendre l'exécution
         self.execution_check_interval = 0.5  # vérification toutes les 500ms
         
+        # Exécutions poussées par le User Data Stream (ORDER_TRADE_UPDATE)
+        self._fill_lock = threading.Lock()
+        self._fill_events: Dict[int, Tuple[threading.Event, Dict]] = {}
+        self._recent_order_updates: OrderedDict = OrderedDict()  # événements arrivés avant l'attente
+        self._recent_order_updates_max = 100
+        # order_id SL/TP -> (trade, "SL"/"TP") : aiguillage des événements d'ordres vers leur trade
+        self._orders_index: Dict[int, Tuple[Trade, str]] = {}
+        # Flux WebSocket ouverts par start() (aucune I/O réseau dans le constructeur)
+        self.user_stream = None
+        self.price_stream = None
+        
+    def start(self):
+        """
+        Démarre le User Data Stream et le flux bookTicker selon la configuration
+        
+        À appairer avec shutdown() ; sans effet pour un flux déjà démarré.
+        """
+        if self.user_stream is None and self.config.get('use_user_stream', True):
+            self.user_stream = UserDataStream(self.client)
+            self.user_stream.add_order_update_callback(self._on_order_update)
+            if not self.user_stream.start():
+                logger.warning("⚠️ User Data Stream indisponible - suivi des ordres en REST")
+        
+        # Prix courants servis par le flux bookTicker (repli REST si cotation périmée)
+        if self.price_stream is None and self.config.get('use_price_stream', True):
+            self.price_stream = BookTickerStream(testnet=self.client.testnet)
+            if 'symbol' in self.config:
+                self.price_stream.subscribe(self.config['symbol'])
+            if self.price_stream.start():
+                self.client.set_price_stream(self.price_stream)
+    
     def add_trade_opened_callback(self, callback):
         """Ajoute un callback appelé quand un trade s'ouvre"""
         self.on_trade_opened_callbacks.append(callback)
@@ -117,6 +234,16 @@ class LiveOrderManager:
         """Ajoute un callback appelé quand un ordre est exécuté"""
         self.on_order_filled_callbacks.append(callback)
     
+    def _callback_loop(self):
+        """Exécute en arrière-plan les callbacks mis en file par le gestionnaire d'ordres"""
+        while True:
+            callbacks, trade, label = self._callback_queue.get()
+            for callback in callbacks:
+                try:
+                    callback(trade)
+                except Exception as e:
+                    logger.error(f"❌ Erreur callback {label}: {e}")
+    
     def can_create_new_trade(self) -> Tuple[bool, str]:
         """
         Vérifie si un nouveau trade peut être créé
@@ -127,8 +254,7 @@ class LiveOrderManager:
         active_count = len(self.active_trades)
         
         if active_count >= 1:  # Limite à 1 trade simultané
-            active_ids = list(self.active_trades.keys())
-            return False, f"Trade déjà actif: {active_ids[0]}"
+            return False, f"Trade déjà actif: {next(iter(self.active_trades))}"
         
         return True, "Nouveau trade autorisé"
 
@@ -146,9 +272,12 @@ class LiveOrderManager:
                 logger.warning(f"❌ Création trade refusée: {reason}")
                 return None
             
+            if self.price_stream:
+                self.price_stream.subscribe(symbol)
+            
             # Génération de l'ID du trade
             self.trade_counter += 1
-            trade_id = f"{symbol}_{direction}_{self.trade_counter}_{int(time.time())}"
+            trade_id = f"{symbol}_{direction}_{self.trade_counter}_{self._session_id}"
             
             # Création de l'objet Trade
             trade = Trade(
@@ -160,13 +289,14 @@ class LiveOrderManager:
                 entry_price=position_size.entry_price,
                 stop_loss=position_size.stop_loss,
                 take_profit=position_size.take_profit,
-                created_at=datetime.now()
+                created_at=time.time_ns()
             )
             
-            logger.info(f"🚀 Création trade {direction}: {trade_id}")
-            logger.info(f"   📊 {position_size.quantity} @ {position_size.entry_price}")
-            logger.info(f"   🛑 SL: {position_size.stop_loss}")
-            logger.info(f"   🎯 TP: {position_size.take_profit}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("🚀 Création trade %s: %s", direction, trade_id)
+                logger.info("   📊 %s @ %s", position_size.quantity, position_size.entry_price)
+                logger.info("   🛑 SL: %s", position_size.stop_loss)
+                logger.info("   🎯 TP: %s", position_size.take_profit)
             
             # Exécution de l'ordre d'entrée
             if not self._execute_entry_order(trade):
@@ -174,7 +304,10 @@ class LiveOrderManager:
                 return None
             
             # Ajout aux trades actifs
-            self.active_trades[trade_id] = trade
+            with self._trades_lock:
+                self.active_trades[trade_id] = trade
+                self._active_version += 1
+                self._update_active_totals(trade, 1)
             
             # Démarrage du monitoring si pas déjà actif
             if not self.monitoring_active:
@@ -189,9 +322,9 @@ class LiveOrderManager:
     def _execute_entry_order(self, trade: Trade) -> bool:
         """🔧 FINAL FIX: Exécute l'ordre d'entrée et ATTEND l'exécution complète"""
         try:
-            side = "BUY" if trade.direction == "LONG" else "SELL"
+            side = trade.entry_side
             
-            logger.info(f"📡 Placement ordre market {side} {trade.quantity} {trade.symbol}")
+            logger.info("📡 Placement ordre market %s %s %s", side, trade.quantity, trade.symbol)
             
             # Placement de l'ordre market
             result, error = self.client.place_market_order(
@@ -207,15 +340,21 @@ class LiveOrderManager:
             
             # 🔍 DEBUG: Log de la réponse initiale
             if self.debug_mode:
-                logger.debug(f"🔍 Réponse Binance initiale:")
-                logger.debug(f"🔍 Status: {result.get('status')}")
-                logger.debug(f"🔍 avgPrice initial: {result.get('avgPrice')}")
-                logger.debug(f"🔍 executedQty initial: {result.get('executedQty')}")
+                logger.debug("🔍 Réponse Binance initiale:")
+                logger.debug("🔍 Status: %s", result.get('status'))
+                logger.debug("🔍 avgPrice initial: %s", result.get('avgPrice'))
+                logger.debug("🔍 executedQty initial: %s", result.get('executedQty'))
             
             order_id = result['orderId']
             
-            # 🆕 NOUVEAU: Attendre que l'ordre soit complètement exécuté
-            executed_price = self._wait_for_order_execution(trade.symbol, order_id, self.execution_timeout)
+            # Réponse RESULT : un ordre market rempli contient déjà son prix moyen
+            executed_price = 0.0
+            if result.get('status') == 'FILLED' and float(result.get('avgPrice') or 0) > 0:
+                executed_price = float(result['avgPrice'])
+                logger.info("✅ Ordre exécuté (réponse directe): %.1f", executed_price)
+            else:
+                # 🆕 NOUVEAU: Attendre que l'ordre soit complètement exécuté (exécution partielle)
+                executed_price = self._wait_for_order_execution(trade.symbol, order_id, self.execution_timeout)
             
             if executed_price <= 0:
                 logger.warning(f"⚠️ Impossible de récupérer le prix d'exécution après {self.execution_timeout}s")
@@ -246,34 +385,125 @@ class LiveOrderManager:
             trade.entry_price = executed_price
             
             # Logs détaillés
-            logger.info(f"✅ Ordre d'entrée exécuté:")
-            logger.info(f"   📊 Prix calculé: {old_entry:.1f}")
-            logger.info(f"   📊 Prix RÉEL: {executed_price:.1f}")
-            logger.info(f"   📊 Différence: {executed_price - old_entry:+.1f}")
+            logger.info("✅ Ordre d'entrée exécuté:")
+            logger.info("   📊 Prix calculé: %.1f", old_entry)
+            logger.info("   📊 Prix RÉEL: %.1f", executed_price)
+            logger.info("   📊 Différence: %+.1f", executed_price - old_entry)
             
             # Recalcul des niveaux SL/TP
             self._recalculate_sl_tp_levels(trade, old_entry)
             
-            # Placement des ordres SL et TP
-            self._place_sl_tp_orders(trade)
-            
-            return True
+            # Placement des ordres SL et TP : sans eux la position n'est pas protégée, l'entrée échoue
+            return self._place_sl_tp_orders(trade)
             
         except Exception as e:
-            logger.error(f"❌ Erreur exécution ordre d'entrée: {e}")
-            import traceback
-            logger.debug(traceback.format_exc())
+            logger.exception("❌ Erreur exécution ordre d'entrée: %s", e)
             trade.status = TradeStatus.FAILED
             return False
     
+    def _on_order_update(self, order: Dict):
+        """Callback User Data Stream : réveille l'attente de l'ordre s'il est terminé"""
+        if order.get('X') not in _TERMINAL_STATES:
+            return
+        
+        order_id = order.get('i')
+        
+        # Ordre SL/TP : fermeture immédiate (hors du thread WebSocket) ou perte de protection
+        sl_tp = self._orders_index.pop(order_id, None)
+        if sl_tp is not None:
+            if order.get('X') == 'FILLED':
+                threading.Thread(target=self._on_sl_tp_filled, args=(*sl_tp, order), daemon=True).start()
+            else:
+                self._on_sl_tp_cancelled(*sl_tp, order.get('X'))
+            return
+        
+        with self._fill_lock:
+            waiter = self._fill_events.pop(order_id, None)
+            if waiter is None:
+                # L'événement peut arriver avant que l'attente soit enregistrée
+                self._recent_order_updates[order_id] = order
+                if len(self._recent_order_updates) > self._recent_order_updates_max:
+                    self._recent_order_updates.popitem(last=False)
+                return
+        
+        event, result = waiter
+        result.update(order)
+        event.set()
+    
+    def _on_sl_tp_filled(self, trade: Trade, label: str, order: Dict):
+        """Ferme le trade dont le SL ou le TP vient d'être exécuté (événement User Data Stream)"""
+        trade_id = trade.trade_id
+        if trade_id not in self.active_trades:
+            return
+        
+        sl_tp_order = trade.sl_order if label == "SL" else trade.tp_order
+        if sl_tp_order is None or sl_tp_order.status is not OrderStatus.PENDING:
+            return
+        
+        sl_tp_order.status = OrderStatus.FILLED
+        sl_tp_order.filled_qty = float(order.get('z', 0))
+        sl_tp_order.avg_price = float(order.get('ap', 0))
+        
+        if label == "SL":
+            logger.info("🛑 Stop Loss exécuté pour %s (User Data Stream)", trade_id)
+            self._close_trade(trade, "Stop Loss")
+        else:
+            logger.info("🎯 Take Profit exécuté pour %s (User Data Stream)", trade_id)
+            self._close_trade(trade, "Take Profit")
+    
+    def _on_sl_tp_cancelled(self, trade: Trade, label: str, status: str):
+        """SL/TP annulé ou expiré côté Binance sans que le bot l'ait demandé"""
+        # Annulations émises par _close_trade : attendues
+        if trade.status is TradeStatus.CLOSING or trade.status is TradeStatus.CLOSED:
+            return
+        
+        sl_tp_order = trade.sl_order if label == "SL" else trade.tp_order
+        if sl_tp_order is not None and sl_tp_order.status is OrderStatus.PENDING:
+            sl_tp_order.status = OrderStatus.CANCELLED
+            logger.warning(f"⚠️ {label} {status} hors du bot pour {trade.trade_id} - position sans {label}")
+    
+    def _wait_for_order_event(self, order_id: int, timeout: float) -> float:
+        """Attend l'événement ORDER_TRADE_UPDATE terminal de l'ordre (0.0 si absent ou non exécuté)"""
+        with self._fill_lock:
+            order = self._recent_order_updates.pop(order_id, None)
+            if order is None:
+                event, order = threading.Event(), {}
+                self._fill_events[order_id] = (event, order)
+            else:
+                event = None
+        
+        if event is not None and not event.wait(timeout):
+            with self._fill_lock:
+                self._fill_events.pop(order_id, None)
+            return 0.0
+        
+        status = order.get('X')
+        if status == 'FILLED' and float(order.get('ap', 0)) > 0 and float(order.get('z', 0)) > 0:
+            executed_price = float(order['ap'])
+            logger.info("✅ Ordre exécuté (User Data Stream): %.1f", executed_price)
+            return executed_price
+        
+        logger.error(f"❌ Ordre {status}: {order}")
+        return 0.0
+    
     def _wait_for_order_execution(self, symbol: str, order_id: int, timeout: int = 10) -> float:
         """🆕 NOUVEAU: Attend que l'ordre soit complètement exécuté"""
         try:
-            logger.info(f"⏳ Attente exécution ordre {order_id}...")
+            logger.info("⏳ Attente exécution ordre %s...", order_id)
+            
+            # Exécution poussée par WebSocket ; le polling REST ne sert que de repli
+            if self.user_stream and self.user_stream.is_connected():
+                executed_price = self._wait_for_order_event(order_id, timeout)
+                if executed_price > 0:
+                    return executed_price
+                logger.warning("⚠️ Pas d'exécution reçue via User Data Stream - vérification REST")
             
-            start_time = time.time()
+            # Horloge monotone : insensible aux ajustements de l'heure système
+            deadline = time.monotonic() + timeout
+            _sleep = time.sleep
+            _interval = self.execution_check_interval
             
-            while (time.time() - start_time) < timeout:
+            while time.monotonic() < deadline:
                 try:
                     # Récupération du statut de l'ordre
                     order_info, error = self.client._execute_request(
@@ -284,33 +514,36 @@ class LiveOrderManager:
                     
                     if error:
                         logger.warning(f"⚠️ Erreur récupération ordre: {error}")
-                        time.sleep(self.execution_check_interval)
+                        _sleep(_interval)
                         continue
                     
                     status = order_info.get('status')
-                    avg_price = order_info.get('avgPrice', '0')
-                    executed_qty = order_info.get('executedQty', '0')
                     
                     if self.debug_mode:
-                        logger.debug(f"🔍 Ordre {order_id}: Status={status}, AvgPrice={avg_price}, ExecQty={executed_qty}")
+                        logger.debug("🔍 Ordre %s: Status=%s", order_id, status)
                     
-                    # Vérifier si l'ordre est complètement exécuté
-                    if status == 'FILLED' and float(avg_price) > 0 and float(executed_qty) > 0:
-                        executed_price = float(avg_price)
-                        elapsed = time.time() - start_time
-                        logger.info(f"✅ Ordre exécuté après {elapsed:.2f}s: {executed_price:.1f}")
-                        return executed_price
+                    # NEW / PARTIALLY_FILLED : rien à convertir, on attend
+                    if status not in _TERMINAL_STATES:
+                        _sleep(_interval)
+                        continue
                     
-                    elif status in ['CANCELED', 'REJECTED', 'EXPIRED']:
+                    if status != 'FILLED':
                         logger.error(f"❌ Ordre {status}: {order_info}")
                         return 0.0
                     
+                    # Vérifier si l'ordre est complètement exécuté
+                    executed_price = float(order_info.get('avgPrice', 0))
+                    if executed_price > 0 and float(order_info.get('executedQty', 0)) > 0:
+                        elapsed = timeout - (deadline - time.monotonic())
+                        logger.info("✅ Ordre exécuté après %.2fs: %.1f", elapsed, executed_price)
+                        return executed_price
+                    
                     # Attendre avant la prochaine vérification
-                    time.sleep(self.execution_check_interval)
+                    _sleep(_interval)
                     
                 except Exception as e:
                     logger.warning(f"⚠️ Erreur vérification ordre: {e}")
-                    time.sleep(self.execution_check_interval)
+                    _sleep(_interval)
             
             # Timeout atteint
             logger.warning(f"⚠️ Timeout atteint ({timeout}s) - Tentative finale de récupération")
@@ -325,7 +558,7 @@ class LiveOrderManager:
                 
                 if not error and float(order_info.get('avgPrice', 0)) > 0:
                     final_price = float(order_info['avgPrice'])
-                    logger.info(f"🔧 Prix récupéré en dernière tentative: {final_price:.1f}")
+                    logger.info("🔧 Prix récupéré en dernière tentative: %.1f", final_price)
                     return final_price
             except Exception as e:
                 logger.warning(f"⚠️ Erreur dernière tentative: {e}")
@@ -339,7 +572,7 @@ class LiveOrderManager:
     def _get_order_execution_from_fills(self, symbol: str, order_id: int) -> float:
         """🆕 NOUVEAU: Récupère le prix depuis l'historique des fills"""
         try:
-            logger.debug(f"🔍 Recherche fills pour ordre {order_id}...")
+            logger.debug("🔍 Recherche fills pour ordre %s...", order_id)
             
             # Récupération des fills récents
             fills, error = self.client._execute_request(
@@ -358,7 +591,7 @@ class LiveOrderManager:
                     fill_price = float(fill['price'])
                     fill_qty = float(fill['qty'])
                     fill_time = fill.get('time', 'unknown')
-                    logger.info(f"🔍 Fill trouvé: {fill_qty} @ {fill_price} (time: {fill_time})")
+                    logger.info("🔍 Fill trouvé: %s @ %s (time: %s)", fill_qty, fill_price, fill_time)
                     return fill_price
             
             logger.warning(f"⚠️ Aucun fill trouvé pour ordre {order_id}")
@@ -375,7 +608,7 @@ class LiveOrderManager:
             avg_price = result.get('avgPrice')
             if avg_price and float(avg_price) > 0:
                 price = float(avg_price)
-                logger.info(f"🔍 Prix depuis avgPrice: {price:.1f}")
+                logger.info("🔍 Prix depuis avgPrice: %.1f", price)
                 return price
             
             # Méthode 2: Calcul depuis fills dans la réponse
@@ -388,18 +621,18 @@ class LiveOrderManager:
                     price = float(fill['price'])
                     total_qty += qty
                     total_value += qty * price
-                    logger.debug(f"🔍 Fill réponse: {qty} @ {price}")
+                    logger.debug("🔍 Fill réponse: %s @ %s", qty, price)
                 
                 if total_qty > 0:
                     avg_price = total_value / total_qty
-                    logger.info(f"🔍 Prix calculé depuis fills réponse: {avg_price:.1f}")
+                    logger.info("🔍 Prix calculé depuis fills réponse: %.1f", avg_price)
                     return avg_price
             
             # Méthode 3: Récupération depuis l'historique des fills
             if order_id:
                 fill_price = self._get_order_execution_from_fills(trade.symbol, order_id)
                 if fill_price > 0:
-                    logger.info(f"🔍 Prix depuis fills historique: {fill_price:.1f}")
+                    logger.info("🔍 Prix depuis fills historique: %.1f", fill_price)
                     return fill_price
             
             # Méthode 4: Prix market actuel (avec retry)
@@ -407,7 +640,7 @@ class LiveOrderManager:
             for attempt in range(3):
                 current_price, error = self.client.get_current_price(trade.symbol)
                 if not error and current_price and current_price > 0:
-                    logger.info(f"🔧 Prix depuis market (tentative {attempt+1}): {current_price:.1f}")
+                    logger.info("🔧 Prix depuis market (tentative %s): %.1f", attempt + 1, current_price)
                     return current_price
                 time.sleep(0.5)
             
@@ -422,45 +655,35 @@ class LiveOrderManager:
     def _recalculate_sl_tp_levels(self, trade: Trade, old_entry: float):
         """🆕 NOUVEAU: Recalcule SL/TP basé sur le prix réel d'exécution"""
         try:
-            # Calcul des distances originales
-            if trade.direction == "LONG":
-                sl_distance = old_entry - trade.stop_loss
-                tp_distance = trade.take_profit - old_entry
-            else:  # SHORT
-                sl_distance = trade.stop_loss - old_entry  
-                tp_distance = old_entry - trade.take_profit
+            sign = trade.sign
+            
+            # Calcul des distances originales (positives dans le sens du trade)
+            sl_distance = sign * (old_entry - trade.stop_loss)
+            tp_distance = sign * (trade.take_profit - old_entry)
             
-            logger.debug(f"🔍 Distances originales: SL={sl_distance:.2f}, TP={tp_distance:.2f}")
+            logger.debug("🔍 Distances originales: SL=%.2f, TP=%.2f", sl_distance, tp_distance)
             
             # Application des mêmes distances au prix réel
-            if trade.direction == "LONG":
-                new_sl = trade.entry_price - sl_distance
-                new_tp = trade.entry_price + tp_distance
-            else:  # SHORT
-                new_sl = trade.entry_price + sl_distance
-                new_tp = trade.entry_price - tp_distance
+            new_sl = trade.entry_price - sign * sl_distance
+            new_tp = trade.entry_price + sign * tp_distance
             
             # Formatage selon Binance
             trade.stop_loss = self.client.format_price(new_sl, trade.symbol)
             trade.take_profit = self.client.format_price(new_tp, trade.symbol)
             
-            logger.info(f"🔧 Niveaux recalculés:")
-            logger.info(f"   🛑 Nouveau SL: {trade.stop_loss:.1f}")
-            logger.info(f"   🎯 Nouveau TP: {trade.take_profit:.1f}")
+            logger.info("🔧 Niveaux recalculés:")
+            logger.info("   🛑 Nouveau SL: %.1f", trade.stop_loss)
+            logger.info("   🎯 Nouveau TP: %.1f", trade.take_profit)
             
             # Validation de cohérence
             self._validate_sl_tp_levels(trade)
             
             # Calcul du nouveau ratio R/R
-            if trade.direction == "LONG":
-                new_sl_distance = trade.entry_price - trade.stop_loss
-                new_tp_distance = trade.take_profit - trade.entry_price
-            else:  # SHORT
-                new_sl_distance = trade.stop_loss - trade.entry_price
-                new_tp_distance = trade.entry_price - trade.take_profit
+            new_sl_distance = sign * (trade.entry_price - trade.stop_loss)
+            new_tp_distance = sign * (trade.take_profit - trade.entry_price)
             
             new_ratio = new_tp_distance / new_sl_distance if new_sl_distance > 0 else 0
-            logger.info(f"📊 Nouveau ratio R/R: {new_ratio:.3f}")
+            logger.info("📊 Nouveau ratio R/R: %.3f", new_ratio)
             
         except Exception as e:
             logger.error(f"❌ Erreur recalcul SL/TP: {e}")
@@ -468,109 +691,131 @@ class LiveOrderManager:
     def _validate_sl_tp_levels(self, trade: Trade):
         """🆕 NOUVEAU: Valide la cohérence des niveaux SL/TP"""
         try:
-            if trade.direction == "LONG":
-                if trade.stop_loss >= trade.entry_price:
-                    logger.error(f"❌ SL LONG >= Entry: {trade.stop_loss} >= {trade.entry_price}")
-                if trade.take_profit <= trade.entry_price:
-                    logger.error(f"❌ TP LONG <= Entry: {trade.take_profit} <= {trade.entry_price}")
-            else:  # SHORT
-                if trade.stop_loss <= trade.entry_price:
-                    logger.error(f"❌ SL SHORT <= Entry: {trade.stop_loss} <= {trade.entry_price}")
-                if trade.take_profit >= trade.entry_price:
-                    logger.error(f"❌ TP SHORT >= Entry: {trade.take_profit} >= {trade.entry_price}")
+            # SL doit être du côté perdant de l'entrée, TP du côté gagnant
+            if trade.sign * (trade.entry_price - trade.stop_loss) <= 0:
+                logger.error(f"❌ SL {trade.direction} du mauvais côté de l'entrée: {trade.stop_loss} vs {trade.entry_price}")
+            if trade.sign * (trade.take_profit - trade.entry_price) <= 0:
+                logger.error(f"❌ TP {trade.direction} du mauvais côté de l'entrée: {trade.take_profit} vs {trade.entry_price}")
         except Exception as e:
             logger.error(f"❌ Erreur validation SL/TP: {e}")
     
-    def _place_sl_tp_orders(self, trade: Trade):
-        """Place les ordres Stop Loss et Take Profit avec niveaux corrigés"""
+    def _place_sl_tp_orders(self, trade: Trade) -> bool:
+        """
+        Place les ordres Stop Loss et Take Profit avec niveaux corrigés
+        
+        Returns:
+            True si les deux ordres sont posés ; sinon la position est refermée et False est retourné
+        """
+        placed_ids = []
         try:
             # Côté opposé pour fermeture
-            close_side = "SELL" if trade.direction == "LONG" else "BUY"
-            
-            # Placement Stop Loss
-            logger.info(f"📡 Placement Stop Loss: {close_side} {trade.quantity} @ {trade.stop_loss}")
-            sl_result, sl_error = self.client.place_stop_order(
+            close_side = trade.close_side
+            # Horodatage unique pour les ordres SL/TP et l'ouverture du trade
+            now = datetime.now()
+            
+            # Placement Stop Loss + Take Profit en une seule requête batch
+            logger.info("📡 Placement Stop Loss: %s %s @ %s", close_side, trade.quantity, trade.stop_loss)
+            logger.info("📡 Placement Take Profit: %s %s @ %s", close_side, trade.quantity, trade.take_profit)
+            (sl_result, sl_error), (tp_result, tp_error) = self.client.place_sl_tp_orders(
                 symbol=trade.symbol,
                 side=close_side,
                 quantity=trade.quantity,
-                stop_price=trade.stop_loss
+                stop_price=trade.stop_loss,
+                tp_price=trade.take_profit
             )
+            placed_ids = [result['orderId'] for result, error in ((sl_result, sl_error), (tp_result, tp_error))
+                          if not error]
+            
+            if sl_error or tp_error:
+                if sl_error:
+                    logger.error(f"❌ Erreur placement SL: {sl_error}")
+                if tp_error:
+                    logger.error(f"❌ Erreur placement TP: {tp_error}")
+                self._abort_unprotected_entry(trade, placed_ids)
+                return False
             
-            if sl_error:
-                logger.error(f"❌ Erreur placement SL: {sl_error}")
-            else:
-                trade.sl_order = Order(
-                    order_id=sl_result['orderId'],
-                    symbol=trade.symbol,
-                    side=close_side,
-                    type="STOP_MARKET",
-                    quantity=trade.quantity,
-                    price=trade.stop_loss,
-                    status=OrderStatus.PENDING,
-                    timestamp=datetime.now()
-                )
-                logger.info(f"✅ Stop Loss placé: {trade.stop_loss}")
-            
-            # Placement Take Profit
-            logger.info(f"📡 Placement Take Profit: {close_side} {trade.quantity} @ {trade.take_profit}")
-            tp_result, tp_error = self.client.place_limit_order(
+            trade.sl_order = Order(
+                order_id=sl_result['orderId'],
                 symbol=trade.symbol,
                 side=close_side,
+                type="STOP_MARKET",
                 quantity=trade.quantity,
-                price=trade.take_profit
+                price=trade.stop_loss,
+                status=OrderStatus.PENDING,
+                timestamp=now
             )
+            self._orders_index[trade.sl_order.order_id] = (trade, "SL")
+            logger.info("✅ Stop Loss placé: %s", trade.stop_loss)
             
-            if tp_error:
-                logger.error(f"❌ Erreur placement TP: {tp_error}")
-            else:
-                trade.tp_order = Order(
-                    order_id=tp_result['orderId'],
-                    symbol=trade.symbol,
-                    side=close_side,
-                    type="LIMIT",
-                    quantity=trade.quantity,
-                    price=trade.take_profit,
-                    status=OrderStatus.PENDING,
-                    timestamp=datetime.now()
-                )
-                logger.info(f"✅ Take Profit placé: {trade.take_profit}")
+            trade.tp_order = Order(
+                order_id=tp_result['orderId'],
+                symbol=trade.symbol,
+                side=close_side,
+                type="LIMIT",
+                quantity=trade.quantity,
+                price=trade.take_profit,
+                status=OrderStatus.PENDING,
+                timestamp=now
+            )
+            self._orders_index[trade.tp_order.order_id] = (trade, "TP")
+            logger.info("✅ Take Profit placé: %s", trade.take_profit)
             
             # Trade maintenant ouvert
             trade.status = TradeStatus.OPEN
-            trade.opened_at = datetime.now()
+            trade.opened_at = now
             
             # Calcul du risque réel avec prix corrigé
-            if trade.direction == "LONG":
-                real_risk = (trade.entry_price - trade.stop_loss) * trade.quantity
-            else:  # SHORT
-                real_risk = (trade.stop_loss - trade.entry_price) * trade.quantity
+            real_risk = trade.sign * (trade.entry_price - trade.stop_loss) * trade.quantity
             
-            logger.info(f"📊 Risque réel avec prix corrigé: {real_risk:.2f} USDT")
+            logger.info("📊 Risque réel avec prix corrigé: %.2f USDT", real_risk)
             
             # Callback trade ouvert
-            for callback in self.on_trade_opened_callbacks:
-                try:
-                    callback(trade)
-                except Exception as e:
-                    logger.error(f"❌ Erreur callback trade ouvert: {e}")
+            self._callback_queue.put((self.on_trade_opened_callbacks, trade, "trade ouvert"))
+            return True
             
         except Exception as e:
             logger.error(f"❌ Erreur placement SL/TP: {e}")
+            self._abort_unprotected_entry(trade, placed_ids)
+            return False
+    
+    def _abort_unprotected_entry(self, trade: Trade, placed_order_ids: List[int]):
+        """Annule le SL/TP éventuellement posé et referme au marché une position d'entrée non protégée"""
+        for order_id in placed_order_ids:
+            self._orders_index.pop(order_id, None)
+        trade.sl_order = None
+        trade.tp_order = None
+        
+        if placed_order_ids:
+            for order_id, (_, error) in zip(placed_order_ids,
+                                            self.client.cancel_batch_orders(trade.symbol, placed_order_ids)):
+                if error:
+                    logger.error(f"❌ Annulation ordre {order_id} échouée: {error}")
+        
+        logger.critical(f"🚨 Position {trade.trade_id} sans SL/TP - fermeture au marché")
+        _, error = self.client.place_market_order(trade.symbol, trade.close_side, trade.quantity)
+        if error:
+            logger.critical(f"🚨 Fermeture de la position non protégée échouée ({error}) - intervention manuelle requise")
+        trade.status = TradeStatus.FAILED
     
     def close_trade_manually(self, trade_id: str, reason: str = "Manual close") -> bool:
         """Ferme manuellement un trade"""
-        if trade_id not in self.active_trades:
+        trade = self.active_trades.get(trade_id)
+        if trade is None:
             logger.error(f"❌ Trade non trouvé: {trade_id}")
             return False
         
-        trade = self.active_trades[trade_id]
         return self._close_trade(trade, reason)
     
     def _close_trade(self, trade: Trade, reason: str) -> bool:
         """🔧 CORRIGÉ: Fermeture avec calcul PnL correct"""
         try:
-            logger.info(f"🔄 Fermeture trade {trade.trade_id}: {reason}")
-            trade.status = TradeStatus.CLOSING
+            # Réservation atomique : l'événement WebSocket et le monitoring peuvent fermer le même trade
+            with self._trades_lock:
+                if trade.status is TradeStatus.CLOSING or trade.status is TradeStatus.CLOSED:
+                    return False
+                trade.status = TradeStatus.CLOSING
+            
+            logger.info("🔄 Fermeture trade %s: %s", trade.trade_id, reason)
             
             # Annulation des ordres en cours
             self._cancel_pending_orders(trade)
@@ -578,15 +823,15 @@ class LiveOrderManager:
             # Fermeture de la position au marché si nécessaire
             if reason not in ["Stop Loss", "Take Profit"]:
                 # Fermeture manuelle - placer un ordre market
-                close_side = "SELL" if trade.direction == "LONG" else "BUY"
                 result, error = self.client.place_market_order(
                     symbol=trade.symbol,
-                    side=close_side,
+                    side=trade.close_side,
                     quantity=trade.quantity
                 )
                 
                 if error:
                     logger.error(f"❌ Erreur fermeture position: {error}")
+                    trade.status = TradeStatus.OPEN
                     return False
             
             # 🔧 RÉCUPÉRATION DU PRIX DE SORTIE SELON LE CONTEXTE
@@ -608,54 +853,63 @@ class LiveOrderManager:
             trade.status = TradeStatus.CLOSED
             
             # Logs détaillés
-            logger.info(f"✅ Trade fermé:")
-            logger.info(f"   📊 Entry RÉEL: {trade.entry_price:.1f}")
-            logger.info(f"   📊 Exit RÉEL: {exit_price:.1f}")
-            logger.info(f"   💰 PnL CORRECT: {trade.pnl:+.2f} USDT")
-            logger.info(f"   📋 Raison: {reason}")
+            logger.info("✅ Trade fermé:")
+            logger.info("   📊 Entry RÉEL: %.1f", trade.entry_price)
+            logger.info("   📊 Exit RÉEL: %.1f", exit_price)
+            logger.info("   💰 PnL CORRECT: %+.2f USDT", trade.pnl)
+            logger.info("   📋 Raison: %s", reason)
             
             # Validation du PnL
             expected_sign = "GAIN" if trade.pnl > 0 else "PERTE"
-            logger.info(f"   📈 Type résultat: {expected_sign}")
+            logger.info("   📈 Type résultat: %s", expected_sign)
+            
+            # Les ordres SL/TP du trade ne doivent plus déclencher de fermeture
+            for sl_tp_order in (trade.sl_order, trade.tp_order):
+                if sl_tp_order is not None:
+                    self._orders_index.pop(sl_tp_order.order_id, None)
             
             # Déplacement vers trades terminés
-            self.completed_trades.append(trade)
-            del self.active_trades[trade.trade_id]
+            with self._trades_lock:
+                # pop unique : un trade déjà retiré (fermeture concurrente) n'est pas compté deux fois
+                if self.active_trades.pop(trade.trade_id, None) is not None:
+                    self._active_version += 1
+                    self._update_stats(trade.pnl)
+                    self._append_pnl(trade.pnl)
+                    self.completed_trades.append(trade)
+                    if self.trade_archive:
+                        self.trade_archive.add(trade)
+                    self._update_active_totals(trade, -1)
             
             # Callbacks
-            for callback in self.on_trade_closed_callbacks:
-                try:
-                    callback(trade)
-                except Exception as e:
-                    logger.error(f"❌ Erreur callback: {e}")
+            self._callback_queue.put((self.on_trade_closed_callbacks, trade, "trade fermé"))
             
             return True
             
         except Exception as e:
-            logger.error(f"❌ Erreur fermeture trade: {e}")
-            import traceback
-            logger.debug(traceback.format_exc())
+            logger.exception("❌ Erreur fermeture trade: %s", e)
+            if trade.status is TradeStatus.CLOSING:
+                trade.status = TradeStatus.OPEN
             return False
     
     def _determine_exit_price(self, trade: Trade, reason: str) -> float:
         """🆕 Détermine le prix de sortie selon le contexte"""
         try:
             if reason == "Stop Loss":
-                # Prix basé sur le niveau SL (approximation)
-                exit_price = trade.stop_loss
-                logger.info(f"🔍 Prix sortie (SL): {exit_price:.1f}")
+                # Prix moyen réel si l'exécution a été poussée, sinon niveau SL (approximation)
+                exit_price = trade.sl_order.avg_price if trade.sl_order and trade.sl_order.avg_price > 0 else trade.stop_loss
+                logger.info("🔍 Prix sortie (SL): %.1f", exit_price)
                 
             elif reason == "Take Profit":
-                # Prix basé sur le niveau TP (approximation)
-                exit_price = trade.take_profit
-                logger.info(f"🔍 Prix sortie (TP): {exit_price:.1f}")
+                # Prix moyen réel si l'exécution a été poussée, sinon niveau TP (approximation)
+                exit_price = trade.tp_order.avg_price if trade.tp_order and trade.tp_order.avg_price > 0 else trade.take_profit
+                logger.info("🔍 Prix sortie (TP): %.1f", exit_price)
                 
             else:
                 # Fermeture manuelle - prix market actuel
                 current_price, error = self.client.get_current_price(trade.symbol)
                 if not error and current_price > 0:
                     exit_price = current_price
-                    logger.info(f"🔍 Prix sortie (Market): {exit_price:.1f}")
+                    logger.info("🔍 Prix sortie (Market): %.1f", exit_price)
                 else:
                     # Fallback sur prix d'entrée (neutre)
                     exit_price = trade.entry_price
@@ -670,12 +924,8 @@ class LiveOrderManager:
     def _calculate_correct_pnl(self, trade: Trade) -> float:
         """🆕 Calcul PnL correct selon la direction"""
         try:
-            if trade.direction == "LONG":
-                # LONG: Gain si prix monte
-                pnl = (trade.exit_price - trade.entry_price) * trade.quantity
-            else:  # SHORT
-                # SHORT: Gain si prix baisse
-                pnl = (trade.entry_price - trade.exit_price) * trade.quantity
+            # LONG (sign=+1): gain si prix monte / SHORT (sign=-1): gain si prix baisse
+            pnl = trade.sign * (trade.exit_price - trade.entry_price) * trade.quantity
             
             # Validation logique
             if trade.exit_reason == "Stop Loss":
@@ -699,93 +949,165 @@ class LiveOrderManager:
         try:
             cancelled_orders = []
             
-            # Annulation SL
-            if trade.sl_order and trade.sl_order.status == OrderStatus.PENDING:
-                cancel_result, error = self.client.cancel_order(trade.symbol, trade.sl_order.order_id)
-                if not error:
-                    trade.sl_order.status = OrderStatus.CANCELLED
-                    cancelled_orders.append("SL")
-                    logger.info(f"✅ SL annulé: {trade.sl_order.order_id}")
-                else:
-                    logger.warning(f"⚠️ Erreur annulation SL: {error}")
-            
-            # Annulation TP
-            if trade.tp_order and trade.tp_order.status == OrderStatus.PENDING:
-                cancel_result, error = self.client.cancel_order(trade.symbol, trade.tp_order.order_id)
-                if not error:
-                    trade.tp_order.status = OrderStatus.CANCELLED
-                    cancelled_orders.append("TP")
-                    logger.info(f"✅ TP annulé: {trade.tp_order.order_id}")
-                else:
-                    logger.warning(f"⚠️ Erreur annulation TP: {error}")
+            # SL et TP en attente annulés en une seule requête batch
+            pending = [(label, order) for label, order in (("SL", trade.sl_order), ("TP", trade.tp_order))
+                       if order and order.status is OrderStatus.PENDING]
+            
+            if pending:
+                results = self.client.cancel_batch_orders(trade.symbol, [order.order_id for _, order in pending])
+                for (label, order), (cancel_result, error) in zip(pending, results):
+                    if not error:
+                        order.status = OrderStatus.CANCELLED
+                        cancelled_orders.append(label)
+                        logger.info("✅ %s annulé: %s", label, order.order_id)
+                    else:
+                        logger.warning(f"⚠️ Erreur annulation {label}: {error}")
             
-            logger.info(f"📋 Ordres annulés: {', '.join(cancelled_orders) if cancelled_orders else 'Aucun'}")
+            logger.info("📋 Ordres annulés: %s", ', '.join(cancelled_orders) if cancelled_orders else 'Aucun')
             
         except Exception as e:
             logger.error(f"❌ Erreur annulation ordres: {e}")
     
     def start_monitoring(self):
-        """Démarre le monitoring des trades actifs"""
+        """Démarre le monitoring des trades actifs (et les flux WebSocket s'ils ne tournent pas encore)"""
         if self.monitoring_active:
             return
         
-        self.monitoring_active = True
-        self.monitor_thread = threading.Thread(target=self._monitor_trades)
-        self.monitor_thread.daemon = True
-        self.monitor_thread.start()
+        self.start()
+        
+        # Double vérification sous verrou : deux create_trade concurrents ne lancent qu'un thread
+        with self._monitor_lock:
+            if self.monitoring_active:
+                return
+            
+            self.monitoring_active = True
+            self._stop_event.clear()
+            self.monitor_thread = threading.Thread(target=self._monitor_trades)
+            self.monitor_thread.daemon = True
+            self.monitor_thread.start()
         logger.info("🔍 Monitoring des trades démarré")
     
     def stop_monitoring(self):
         """Arrête le monitoring"""
         self.monitoring_active = False
-        if self.monitor_thread:
-            self.monitor_thread.join(timeout=10)
+        self._stop_event.set()
+        if self.monitor_thread and self.monitor_thread is not threading.current_thread():
+            self.monitor_thread.join(timeout=self.monitor_join_timeout)
         logger.info("🔍 Monitoring des trades arrêté")
     
     def _monitor_trades(self):
         """Boucle de monitoring des trades actifs"""
-        while self.monitoring_active:
+        while not self._stop_event.is_set():
             try:
-                # Vérification de chaque trade actif
-                trades_to_check = list(self.active_trades.values())
+                # Vérification de chaque trade actif (snapshot : _close_trade modifie le dict)
+                # Pas de requête REST si aucun SL/TP n'est encore en attente
+                trades_to_check = [t for t in self._active_snapshot() if self._has_pending_sl_tp(t)]
                 
-                for trade in trades_to_check:
-                    self._check_trade_status(trade)
+                # Un seul appel get_open_orders par symbole, partagé par ses trades
+                # Ordre aléatoire : plusieurs instances n'interrogent pas les symboles en phase
+                symbols = list({t.symbol for t in trades_to_check})
+                random.shuffle(symbols)
+                results = [self.client.get_open_orders(symbol) for symbol in symbols]
                 
-                time.sleep(self.monitor_interval)
+                open_ids_by_symbol = {}
+                for symbol, (orders, error) in zip(symbols, results):
+                    if error:
+                        logger.warning(f"⚠️ Erreur récupération ordres: {error}")
+                        continue
+                    open_ids_by_symbol[symbol] = {o['orderId'] for o in orders}
+                
+                for trade in trades_to_check:
+                    open_order_ids = open_ids_by_symbol.get(trade.symbol)
+                    if open_order_ids is not None:
+                        self._check_trade_status(trade, open_order_ids)
                 
             except Exception as e:
                 logger.error(f"❌ Erreur monitoring: {e}")
-                time.sleep(self.monitor_interval)
+            
+            # Attente interruptible : stop_monitoring() réveille le thread immédiatement
+            if self.user_stream and self.user_stream.is_connected():
+                delay = self.heartbeat_interval
+            else:
+                delay = self._next_poll_delay()
+            # Gigue ±10% : évite les rafales synchronisées de requêtes (limites 429)
+            self._stop_event.wait(delay * random.uniform(0.9, 1.1))
     
-    def _check_trade_status(self, trade: Trade):
-        """🔧 CORRIGÉ: Vérifie le statut et gère les exécutions d'ordres"""
+    def _next_poll_delay(self) -> float:
+        """Délai avant le prochain polling selon la distance des prix aux SL/TP et la volatilité récente"""
         try:
-            # Récupération des ordres ouverts
-            orders, error = self.client.get_open_orders(trade.symbol)
-            if error:
-                logger.warning(f"⚠️ Erreur récupération ordres: {error}")
-                return
-            
-            open_order_ids = [o['orderId'] for o in orders]
+            trades = [t for t in self._active_snapshot() if self._has_pending_sl_tp(t)]
+            if not trades:
+                return self.monitor_interval
+            
+            now = time.monotonic()
+            prices = {}
+            for symbol in {t.symbol for t in trades}:
+                price, error = self.client.get_current_price(symbol)
+                if error or price <= 0:
+                    return self.monitor_interval
+                prices[symbol] = price
+                
+                # Volatilité : |log-rendement| depuis le dernier polling, ramené à 1 seconde
+                last = self._last_poll_prices.get(symbol)
+                self._last_poll_prices[symbol] = (price, now)
+                if last is not None and now > last[1]:
+                    abs_return = abs(math.log(price / last[0])) / math.sqrt(now - last[1])
+                    ema = self._vol_ema.get(symbol)
+                    self._vol_ema[symbol] = abs_return if ema is None else ema + self._vol_ema_alpha * (abs_return - ema)
+            
+            min_ratio = math.inf
+            for trade in trades:
+                sigma = self._vol_ema.get(trade.symbol)
+                if not sigma:
+                    # Pas encore d'estimation de volatilité
+                    return self.monitor_interval
+                price = prices[trade.symbol]
+                distance = min(abs(price - trade.stop_loss), abs(price - trade.take_profit))
+                min_ratio = min(min_ratio, distance / (price * sigma))
+            
+            for max_ratio, delay in _POLL_DELAYS:
+                if min_ratio < max_ratio:
+                    return max(delay, self.min_poll_interval)
+            return self.max_poll_interval
             
+        except Exception as e:
+            logger.error(f"❌ Erreur calcul délai de polling: {e}")
+            return self.monitor_interval
+    
+    def _active_snapshot(self) -> Tuple[Trade, ...]:
+        """Tuple des trades actifs, réutilisé tant qu'aucun trade n'a été ajouté ou retiré"""
+        with self._trades_lock:
+            if self._snapshot_version != self._active_version:
+                self._snapshot = tuple(self.active_trades.values())
+                self._snapshot_version = self._active_version
+            return self._snapshot
+    
+    @staticmethod
+    def _has_pending_sl_tp(trade: Trade) -> bool:
+        """Indique si le trade a encore un ordre SL ou TP en attente"""
+        return ((trade.sl_order is not None and trade.sl_order.status is OrderStatus.PENDING) or
+                (trade.tp_order is not None and trade.tp_order.status is OrderStatus.PENDING))
+    
+    def _check_trade_status(self, trade: Trade, open_order_ids: set):
+        """🔧 CORRIGÉ: Vérifie le statut et gère les exécutions d'ordres (open_order_ids : ordres ouverts du symbole)"""
+        try:
             # Vérification de l'ordre SL
             sl_executed = False
-            if trade.sl_order and trade.sl_order.status == OrderStatus.PENDING:
+            if trade.sl_order and trade.sl_order.status is OrderStatus.PENDING:
                 if trade.sl_order.order_id not in open_order_ids:
                     # SL exécuté
                     trade.sl_order.status = OrderStatus.FILLED
                     sl_executed = True
-                    logger.info(f"🛑 Stop Loss exécuté pour {trade.trade_id}")
+                    logger.info("🛑 Stop Loss exécuté pour %s", trade.trade_id)
             
             # Vérification de l'ordre TP
             tp_executed = False
-            if trade.tp_order and trade.tp_order.status == OrderStatus.PENDING:
+            if trade.tp_order and trade.tp_order.status is OrderStatus.PENDING:
                 if trade.tp_order.order_id not in open_order_ids:
                     # TP exécuté
                     trade.tp_order.status = OrderStatus.FILLED
                     tp_executed = True
-                    logger.info(f"🎯 Take Profit exécuté pour {trade.trade_id}")
+                    logger.info("🎯 Take Profit exécuté pour %s", trade.trade_id)
             
             # 🔧 CORRECTION: Gestion exclusive des exécutions
             if sl_executed and tp_executed:
@@ -807,105 +1129,202 @@ class LiveOrderManager:
     
     def close_all_trades(self, reason: str = "Emergency close") -> int:
         """Ferme tous les trades actifs"""
-        closed_count = 0
-        trades_to_close = list(self.active_trades.values())
-        
-        for trade in trades_to_close:
-            if self._close_trade(trade, reason):
-                closed_count += 1
+        closed_count = sum(1 for trade in self._active_snapshot() if self._close_trade(trade, reason))
         
-        logger.info(f"🔄 {closed_count} trades fermés: {reason}")
+        logger.info("🔄 %s trades fermés: %s", closed_count, reason)
         return closed_count
     
     def get_active_trades_summary(self) -> Dict:
         """Retourne un résumé des trades actifs"""
-        if not self.active_trades:
+        active = self._active_snapshot()
+        if not active:
             return {"message": "Aucun trade actif"}
         
+        trades = []
         summary = {
-            "total_active": len(self.active_trades),
-            "long_trades": len([t for t in self.active_trades.values() if t.direction == "LONG"]),
-            "short_trades": len([t for t in self.active_trades.values() if t.direction == "SHORT"]),
-            "total_exposure": sum(t.quantity * t.entry_price for t in self.active_trades.values()),
-            "trades": []
+            "total_active": len(active),
+            "long_trades": self._long_count,
+            "short_trades": self._short_count,
+            "total_exposure": self._exposure,
+            "trades": trades
         }
-        
-        for trade in self.active_trades.values():
-            # Calcul PnL flottant CORRECT
-            current_price, _ = self.client.get_current_price(trade.symbol)
+
+        # Un seul appel pour tous les prix au lieu d'une requête par trade
+        prices = self._get_current_prices({t.symbol for t in active})
+
+        # Calcul PnL flottant CORRECT
+        for trade in active:
+            current_price = prices.get(trade.symbol)
             if current_price:
-                if trade.direction == "LONG":
-                    floating_pnl = (current_price - trade.entry_price) * trade.quantity
-                else:  # SHORT
-                    floating_pnl = (trade.entry_price - current_price) * trade.quantity
+                floating_pnl = round(trade.sign * (current_price - trade.entry_price) * trade.quantity, 2)
             else:
                 floating_pnl = 0
-            
-            summary["trades"].append({
+            trades.append({
                 "id": trade.trade_id,
                 "direction": trade.direction,
                 "entry": trade.entry_price,
                 "quantity": trade.quantity,
                 "sl": trade.stop_loss,
                 "tp": trade.take_profit,
-                "floating_pnl": round(floating_pnl, 2),
+                "floating_pnl": floating_pnl,
                 "opened_at": trade.opened_at
             })
         
         return summary
-    
-    def get_performance_stats(self) -> Dict:
-        """Retourne les statistiques de performance"""
-        if not self.completed_trades:
-            return {"message": "Aucun trade terminé"}
+
+    def _update_active_totals(self, trade: Trade, sign: int):
+        """Ajoute (sign=1) ou retire (sign=-1) un trade des totaux courants"""
+        if trade.sign > 0:
+            self._long_count += sign
+        else:
+            self._short_count += sign
+        self._exposure += sign * trade.quantity * trade.entry_price
+
+    def _get_current_prices(self, symbols: set) -> Dict[str, float]:
+        """Récupère les prix courants de plusieurs symboles (flux bookTicker, sinon un seul appel REST)"""
+        prices = {}
+        if self.price_stream:
+            for symbol in symbols:
+                price = self.price_stream.get_mid_price(symbol)
+                if price:
+                    prices[symbol] = price
+            if len(prices) == len(symbols):
+                return prices
+
+        mark_prices, error = self.client.get_mark_prices()
+        if error:
+            logger.warning(f"⚠️ Erreur récupération mark prices: {error}")
+            return prices
+
+        for item in mark_prices:
+            symbol = item.get('symbol')
+            if symbol in symbols and symbol not in prices:
+                try:
+                    prices[symbol] = float(item['markPrice'])
+                except (KeyError, ValueError):
+                    continue
+        return prices
+
+    def _update_stats(self, pnl: float, sign: int = 1):
+        """Ajoute (sign=1) ou retire (sign=-1) un PnL des agrégats de performance"""
+        self._perf_cache = None
+        stats = self._stats
+        if pnl > 0:
+            stats['wins'] += sign
+            stats['sum_win_pnl'] += sign * pnl
+        else:
+            stats['losses'] += sign
+            stats['sum_loss_pnl'] += sign * pnl
+        stats['total_pnl'] += sign * pnl
+
+    def _append_pnl(self, pnl: float):
+        """Ajoute un PnL au tableau d'historique (capacité doublée si plein)"""
+        if self._pnl_n == len(self._pnl_array):
+            self._pnl_array = np.resize(self._pnl_array, 2 * len(self._pnl_array))
+        self._pnl_array[self._pnl_n] = pnl
+        self._pnl_n += 1
+
+    def _replace_pnl(self, old_pnl: float, new_pnl: float):
+        """Remplace un PnL corrigé (les stats ne dépendent que des valeurs, pas de l'ordre)"""
+        matches = np.flatnonzero(self._pnl_array[:self._pnl_n] == old_pnl)
+        if matches.size:
+            self._pnl_array[matches[0]] = new_pnl
+
+    def _recompute_stats(self):
+        """Recalcule les agrégats de performance en une passe NumPy sur l'historique des PnL"""
+        pnls = self._pnl_array[:self._pnl_n]
+        wins = pnls > 0
+        self._perf_cache = None
+        self._stats = {
+            'wins': int(np.count_nonzero(wins)),
+            'losses': int(pnls.size - np.count_nonzero(wins)),
+            'sum_win_pnl': float(pnls[wins].sum()),
+            'sum_loss_pnl': float(pnls[~wins].sum()),
+            'total_pnl': float(pnls.sum())
+        }
+
+    def get_performance_stats(self, recompute: bool = False) -> Dict:
+        """
+        Retourne les statistiques de performance (O(1) via les agrégats)
         
-        total_trades = len(self.completed_trades)
-        winning_trades = [t for t in self.completed_trades if t.pnl > 0]
-        losing_trades = [t for t in self.completed_trades if t.pnl <= 0]
+        Args:
+            recompute: Recalcule d'abord les agrégats depuis l'historique complet des PnL
+        """
+        if recompute:
+            with self._trades_lock:
+                self._recompute_stats()
         
-        total_pnl = sum(t.pnl for t in self.completed_trades)
-        avg_win = sum(t.pnl for t in winning_trades) / len(winning_trades) if winning_trades else 0
-        avg_loss = sum(t.pnl for t in losing_trades) / len(losing_trades) if losing_trades else 0
+        if self._perf_cache is not None:
+            return dict(self._perf_cache)
         
-        return {
+        stats = self._stats
+        wins = stats['wins']
+        losses = stats['losses']
+        total_trades = wins + losses
+        if total_trades == 0:
+            return {"message": "Aucun trade terminé"}
+        
+        total_pnl = stats['total_pnl']
+        avg_win = stats['sum_win_pnl'] / wins if wins else 0
+        avg_loss = stats['sum_loss_pnl'] / losses if losses else 0
+        
+        self._perf_cache = {
             "total_trades": total_trades,
-            "wins": len(winning_trades),
-            "losses": len(losing_trades),
-            "win_rate": round((len(winning_trades) / total_trades) * 100, 1),
+            "wins": wins,
+            "losses": losses,
+            "win_rate": round((wins / total_trades) * 100, 1),
             "total_pnl": round(total_pnl, 2),
             "avg_win": round(avg_win, 2),
             "avg_loss": round(avg_loss, 2),
             "profit_factor": round(abs(avg_win / avg_loss), 2) if avg_loss != 0 else float('inf')
         }
+        return dict(self._perf_cache)
     
     def emergency_cancel_all_orders(self, symbol: str):
         """🆕 NOUVEAU: Annule TOUS les ordres en cours pour un symbole"""
         try:
             logger.warning(f"🚨 ANNULATION D'URGENCE - Tous ordres {symbol}")
             
+            # Une seule requête, annulation atomique côté serveur
+            result, error = self.client.cancel_all_open_orders(symbol)
+            if not error:
+                logger.info("🔄 Tous les ordres annulés pour %s", symbol)
+                return True
+            logger.warning(f"⚠️ Échec annulation globale ({error}) - annulation ordre par ordre")
+            
             # Récupération de tous les ordres ouverts
             orders, error = self.client.get_open_orders(symbol)
             if error:
                 logger.error(f"❌ Erreur récupération ordres: {error}")
                 return False
             
-            cancelled_count = 0
-            for order in orders:
-                order_id = order['orderId']
-                cancel_result, cancel_error = self.client.cancel_order(symbol, order_id)
-                if not cancel_error:
-                    cancelled_count += 1
-                    logger.info(f"✅ Ordre annulé: {order_id}")
-                else:
-                    logger.error(f"❌ Erreur annulation {order_id}: {cancel_error}")
+            cancelled_count = self._cancel_orders(symbol, orders, "Ordre annulé")
             
-            logger.info(f"🔄 {cancelled_count} ordres annulés pour {symbol}")
+            logger.info("🔄 %s ordres annulés pour %s", cancelled_count, symbol)
             return True
             
         except Exception as e:
             logger.error(f"❌ Erreur annulation d'urgence: {e}")
             return False
     
+    def _cancel_orders(self, symbol: str, orders: List[Dict], label: str) -> int:
+        """Annule des ordres en parallèle (latence ≈ un RTT au lieu de N) et retourne le nombre annulé"""
+        if not orders:
+            return 0
+        
+        def cancel(order):
+            return self.client.cancel_order(symbol, order['orderId'])
+        
+        cancelled_count = 0
+        with ThreadPoolExecutor(max_workers=min(16, len(orders))) as executor:
+            for order, (cancel_result, cancel_error) in zip(orders, executor.map(cancel, orders)):
+                if not cancel_error:
+                    cancelled_count += 1
+                    logger.info("✅ %s: %s", label, order['orderId'])
+                else:
+                    logger.error(f"❌ Erreur annulation {order['orderId']}: {cancel_error}")
+        return cancelled_count
+    
     def check_and_fix_orphan_orders(self):
         """🆕 NOUVEAU: Détecte et corrige les ordres orphelins"""
         try:
@@ -922,19 +1341,9 @@ class LiveOrderManager:
                 logger.info("✅ Aucun ordre ouvert")
                 return
             
-            # Ordres associés aux trades actifs
-            active_order_ids = set()
-            for trade in self.active_trades.values():
-                if trade.sl_order:
-                    active_order_ids.add(trade.sl_order.order_id)
-                if trade.tp_order:
-                    active_order_ids.add(trade.tp_order.order_id)
-            
-            # Détection des ordres orphelins
-            orphan_orders = []
-            for order in orders:
-                if order['orderId'] not in active_order_ids:
-                    orphan_orders.append(order)
+            # Détection des ordres orphelins : absents de l'index SL/TP des trades actifs
+            orders_index = self._orders_index
+            orphan_orders = [order for order in orders if order['orderId'] not in orders_index]
             
             if orphan_orders:
                 logger.warning(f"⚠️ {len(orphan_orders)} ordre(s) orphelin(s) détecté(s):")
@@ -945,12 +1354,7 @@ class LiveOrderManager:
                 
                 # Auto-annulation des ordres orphelins (sécurité)
                 logger.warning("🔧 Auto-annulation des ordres orphelins pour sécurité...")
-                for order in orphan_orders:
-                    cancel_result, cancel_error = self.client.cancel_order(order['symbol'], order['orderId'])
-                    if not cancel_error:
-                        logger.info(f"✅ Ordre orphelin annulé: {order['orderId']}")
-                    else:
-                        logger.error(f"❌ Erreur annulation orphelin: {cancel_error}")
+                self._cancel_orders(symbol, orphan_orders, "Ordre orphelin annulé")
             else:
                 logger.info("✅ Aucun ordre orphelin détecté")
                 
@@ -959,54 +1363,55 @@ class LiveOrderManager:
     
     def debug_trade_state(self, trade_id: str):
         """🔧 Debug complet d'un trade pour investigation"""
-        if trade_id not in self.active_trades:
+        trade = self.active_trades.get(trade_id)
+        if trade is None:
             logger.error(f"❌ Trade non trouvé: {trade_id}")
             return
         
-        trade = self.active_trades[trade_id]
-        
-        logger.info(f"🔍 DEBUG TRADE {trade_id}:")
-        logger.info(f"   Status: {trade.status}")
-        logger.info(f"   Direction: {trade.direction}")
-        logger.info(f"   Entry Price: {trade.entry_price}")
-        logger.info(f"   SL: {trade.stop_loss}")
-        logger.info(f"   TP: {trade.take_profit}")
+        logger.info("🔍 DEBUG TRADE %s:", trade_id)
+        logger.info("   Status: %s", trade.status.name)
+        logger.info("   Direction: %s", trade.direction)
+        logger.info("   Entry Price: %s", trade.entry_price)
+        logger.info("   SL: %s", trade.stop_loss)
+        logger.info("   TP: %s", trade.take_profit)
         
         if trade.entry_order:
-            logger.info(f"   Entry Order: {trade.entry_order.order_id} - Prix: {trade.entry_order.avg_price}")
+            logger.info("   Entry Order: %s - Prix: %s", trade.entry_order.order_id, trade.entry_order.avg_price)
         
         if trade.sl_order:
-            logger.info(f"   SL Order: {trade.sl_order.order_id} - Status: {trade.sl_order.status}")
+            logger.info("   SL Order: %s - Status: %s", trade.sl_order.order_id, trade.sl_order.status.name)
         
         if trade.tp_order:
-            logger.info(f"   TP Order: {trade.tp_order.order_id} - Status: {trade.tp_order.status}")
+            logger.info("   TP Order: %s - Status: %s", trade.tp_order.order_id, trade.tp_order.status.name)
         
         # Vérification prix market actuel
         current_price, _ = self.client.get_current_price(trade.symbol)
         if current_price:
-            logger.info(f"   Prix Market: {current_price:.1f}")
+            logger.info("   Prix Market: %.1f", current_price)
             
             # Calcul PnL flottant correct
-            if trade.direction == "LONG":
-                floating_pnl = (current_price - trade.entry_price) * trade.quantity
-            else:  # SHORT
-                floating_pnl = (trade.entry_price - current_price) * trade.quantity
+            floating_pnl = trade.sign * (current_price - trade.entry_price) * trade.quantity
             
-            logger.info(f"   PnL Flottant: {floating_pnl:+.2f} USDT")
+            logger.info("   PnL Flottant: %+.2f USDT", floating_pnl)
     
     def fix_existing_trade_prices(self):
         """🆕 NOUVEAU: Corrige les prix des trades actifs si nécessaire"""
-        for trade_id, trade in self.active_trades.items():
+        prices = {}  # un seul appel de prix par symbole
+        for trade in self._active_snapshot():
             if trade.entry_order and trade.entry_order.avg_price <= 0:
-                logger.warning(f"🔧 Correction trade {trade_id} avec prix = 0")
+                logger.warning(f"🔧 Correction trade {trade.trade_id} avec prix = 0")
                 
                 # Récupération du prix actuel comme approximation
-                current_price, error = self.client.get_current_price(trade.symbol)
+                if trade.symbol not in prices:
+                    prices[trade.symbol] = self.client.get_current_price(trade.symbol)
+                current_price, error = prices[trade.symbol]
                 if not error and current_price:
-                    old_price = trade.entry_price
-                    trade.entry_price = current_price
-                    trade.entry_order.avg_price = current_price
-                    logger.info(f"✅ Prix corrigé: {old_price:.1f} → {current_price:.1f}")
+                    with self._trades_lock:
+                        old_price = trade.entry_price
+                        trade.entry_price = current_price
+                        self._exposure += (current_price - old_price) * trade.quantity
+                        trade.entry_order.avg_price = current_price
+                    logger.info("✅ Prix corrigé: %.1f → %.1f", old_price, current_price)
                     
                     # Recalcul des niveaux SL/TP
                     self._recalculate_sl_tp_levels(trade, old_price)
@@ -1018,10 +1423,13 @@ class LiveOrderManager:
             for trade in self.completed_trades:
                 if trade.trade_id == trade_id:
                     old_pnl = trade.pnl
+                    self._update_stats(old_pnl, sign=-1)
+                    self._update_stats(real_pnl)
+                    self._replace_pnl(old_pnl, real_pnl)
                     trade.pnl = real_pnl
-                    logger.info(f"🔧 Correction PnL trade {trade_id}:")
-                    logger.info(f"   Ancien PnL: {old_pnl:+.2f}")
-                    logger.info(f"   Nouveau PnL: {real_pnl:+.2f}")
+                    logger.info("🔧 Correction PnL trade %s:", trade_id)
+                    logger.info("   Ancien PnL: %+.2f", old_pnl)
+                    logger.info("   Nouveau PnL: %+.2f", real_pnl)
                     return True
             
             logger.warning(f"⚠️ Trade {trade_id} non trouvé pour correction")
@@ -1034,7 +1442,20 @@ class LiveOrderManager:
     def set_debug_mode(self, enabled: bool):
         """Active/désactive le mode debug"""
         self.debug_mode = enabled
-        logger.info(f"🔧 Mode debug: {'activé' if enabled else 'désactivé'}")
+        logger.info("🔧 Mode debug: %s", 'activé' if enabled else 'désactivé')
+    
+    def shutdown(self):
+        """Arrête le monitoring, les flux WebSocket ouverts par start() et l'archive des trades"""
+        self.stop_monitoring()
+        if self.user_stream:
+            self.user_stream.stop()
+            self.user_stream = None
+        if self.price_stream:
+            self.client.set_price_stream(None)
+            self.price_stream.stop()
+            self.price_stream = None
+        if self.trade_archive:
+            self.trade_archive.close()
     
     def get_system_health(self) -> Dict:
         """Retourne l'état de santé du système d'ordres"""
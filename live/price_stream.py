@@ -0,0 +1,137 @@
+# price_stream.py
+"""
+Cache de prix temps réel alimenté par le flux WebSocket bookTicker
+Évite un appel REST get_current_price à chaque besoin de prix
+"""
+import logging
+import json
+import time
+import threading
+from typing import Dict, Optional, Tuple
+import websocket
+
+logger = logging.getLogger(__name__)
+
+class BookTickerStream:
+    """Meilleur bid/ask par symbole, mis à jour par le flux @bookTicker"""
+
+    def __init__(self, testnet: bool = False):
+        self.testnet = testnet
+
+        # WebSocket
+        self.ws = None
+        self.ws_thread = None
+        self.ws_running = False
+        self.should_run = False
+        self.reconnect_attempts = 0
+        self.max_reconnects = 5
+        self._request_id = 0
+
+        # Cache {symbol: (bid, ask, timestamp monotone)}
+        self.symbols = set()
+        self._prices: Dict[str, Tuple[float, float, float]] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> bool:
+        """Démarre le WebSocket (les symboles sont abonnés à l'ouverture)"""
+        if self.ws_running:
+            return True
+
+        try:
+            base_url = "wss://fstream.binance.com" if not self.testnet else "wss://stream.binancefuture.com"
+            self.should_run = True
+
+            self.ws = websocket.WebSocketApp(
+                f"{base_url}/ws",
+                on_open=self._on_ws_open,
+                on_message=self._on_ws_message,
+                on_error=self._on_ws_error,
+                on_close=self._on_ws_close
+            )
+
+            self.ws_thread = threading.Thread(target=self.ws.run_forever, kwargs={"skip_utf8_validation": True})
+            self.ws_thread.daemon = True
+            self.ws_thread.start()
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Erreur démarrage flux bookTicker: {e}")
+            return False
+
+    def stop(self):
+        """Arrête le WebSocket"""
+        self.should_run = False
+        if self.ws:
+            self.ws_running = False
+            self.ws.close()
+
+    def subscribe(self, symbol: str):
+        """Ajoute un symbole au flux (sans effet s'il est déjà suivi)"""
+        if symbol in self.symbols:
+            return
+        self.symbols.add(symbol)
+        if self.ws_running:
+            self._send_subscribe([symbol])
+
+    def get_mid_price(self, symbol: str, max_age: float = 2.0) -> Optional[float]:
+        """Prix médian (bid+ask)/2 si la cotation a moins de max_age secondes, sinon None"""
+        with self._lock:
+            quote = self._prices.get(symbol)
+        if quote is None:
+            return None
+
+        bid, ask, ts = quote
+        if time.monotonic() - ts > max_age:
+            return None
+        return (bid + ask) / 2
+
+    def _send_subscribe(self, symbols):
+        """Envoie une requête SUBSCRIBE pour les symboles donnés"""
+        self._request_id += 1
+        self.ws.send(json.dumps({
+            "method": "SUBSCRIBE",
+            "params": [f"{symbol.lower()}@bookTicker" for symbol in symbols],
+            "id": self._request_id
+        }))
+
+    def _on_ws_open(self, ws):
+        """Callback ouverture WebSocket"""
+        logger.info("✅ Flux bookTicker connecté")
+        self.ws_running = True
+        self.reconnect_attempts = 0
+        if self.symbols:
+            self._send_subscribe(sorted(self.symbols))
+
+    def _on_ws_message(self, ws, message):
+        """Callback réception message WebSocket"""
+        try:
+            data = json.loads(message)
+            if data.get('e') != 'bookTicker':
+                return
+
+            quote = (float(data['b']), float(data['a']), time.monotonic())
+            with self._lock:
+                self._prices[data['s']] = quote
+
+        except Exception as e:
+            logger.error(f"❌ Erreur traitement bookTicker: {e}")
+
+    def _on_ws_error(self, ws, error):
+        """Callback erreur WebSocket"""
+        logger.error(f"❌ Erreur flux bookTicker: {error}")
+
+    def _on_ws_close(self, ws, close_status_code, close_msg):
+        """Callback fermeture WebSocket"""
+        logger.warning(f"⚠️ Flux bookTicker fermé: {close_status_code} - {close_msg}")
+        self.ws_running = False
+
+        if not self.should_run:
+            return
+
+        if self.reconnect_attempts < self.max_reconnects:
+            self.reconnect_attempts += 1
+            logger.info(f"🔄 Reconnexion flux bookTicker {self.reconnect_attempts}/{self.max_reconnects}")
+            time.sleep(5)
+            self.start()
+        else:
+            logger.error("❌ Max tentatives de reconnexion bookTicker atteint")
@@ -3,13 +3,27 @@
 Gestionnaire de risque pour le trading live
 """
 import logging
+import time
+from collections import deque
 from datetime import datetime, timedelta
+from decimal import Decimal
 from typing import Dict, Optional, Tuple
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Gabarit du rapport de statut (formatage % unique, pas de f-string reconstruite à chaque appel)
+_REPORT_FMT = (
+    "📊 RAPPORT RISQUE - %s\n"
+    "💰 Solde: %.2f USDT\n"
+    "📈 PnL Jour: %+.2f USDT\n"
+    "📋 Trades Jour: %s/%s\n"
+    "💥 Pertes Consécutives: %s/%s\n"
+    "📉 Drawdown Max: %.2f USDT\n"
+    "⚠️ Limite Utilisée: %.1f%%"
+)
+
+@dataclass(slots=True)
 class PositionSize:
     """Résultat du calcul de taille de position"""
     quantity: float
@@ -20,7 +34,7 @@ class PositionSize:
     stop_loss: float
     take_profit: float
 
-@dataclass
+@dataclass(slots=True)
 class RiskMetrics:
     """Métriques de risque actuelles"""
     daily_pnl: float
@@ -34,8 +48,8 @@ class LiveRiskManager:
     """Gestionnaire de risque en temps réel"""
     
     def __init__(self, config: Dict, safety_limits: Dict):
-        self.config = config
         self.limits = safety_limits
+        self.reload_config(config)
         
         # État du compte
         self.account_balance = 0.0
@@ -47,15 +61,48 @@ class LiveRiskManager:
         self.consecutive_losses = 0
         self.max_drawdown = 0.0
         self.peak_balance = 0.0
+        self._daily_limit_hit = False  # recalculé à chaque changement des métriques journalières
         
         # Historique des trades
         self.trades_today = []
-        self.all_trades = []
+        self.all_trades = deque(maxlen=config.get('history_size', 10000))
+        # Bornes (epoch) du jour couvert par les métriques journalières
+        self._day_start, self._day_end = self._day_bounds(time.time())
         
         # État d'urgence
         self.emergency_stop = False
         self.stop_reason = None
         
+        # Filtres Binance par symbole {symbol: {'step': Decimal}}
+        self._symbol_filters: Dict[str, Dict[str, Decimal]] = {}
+        
+        # Dernier rapport de statut : (valeurs affichées, texte)
+        self._report_cache: Optional[Tuple[tuple, str]] = None
+        
+    @staticmethod
+    def _day_bounds(timestamp: float) -> Tuple[float, float]:
+        """Minuit local du jour de timestamp et minuit du lendemain, en secondes epoch"""
+        midnight = datetime.fromtimestamp(timestamp).replace(hour=0, minute=0, second=0, microsecond=0)
+        return midnight.timestamp(), (midnight + timedelta(days=1)).timestamp()
+    
+    def reload_config(self, config: Dict):
+        """Charge (ou recharge à chaud) les paramètres de sizing lus à chaque calcul de position"""
+        missing = [key for key in ('max_balance_risk', 'min_position_size', 'max_position_size') if key not in config]
+        if missing:
+            raise ValueError(f"Paramètre(s) de risque manquant(s) dans la configuration: {', '.join(missing)}")
+        
+        self.config = config
+        self.max_balance_risk = config['max_balance_risk']
+        self.min_position_size = config['min_position_size']
+        self.max_position_size = config['max_position_size']
+        self.tp_mode = config.get('tp_mode', 'ratio')
+        self.tp_ratio = config.get('tp_ratio', 1.0)
+        self.tp_fixed_percent = config.get('tp_fixed_percent', 1.0)
+    
+    def set_symbol_filters(self, symbol: str, step_size: float):
+        """Enregistre le stepSize d'un symbole (exchangeInfo) pour quantifier les quantités"""
+        self._symbol_filters[symbol] = {'step': Decimal(str(step_size))}
+        
     def update_balance(self, new_balance: float):
         """Met à jour le solde du compte"""
         if self.initial_balance == 0:
@@ -71,9 +118,10 @@ class LiveRiskManager:
         
         # Vérification des limites d'urgence
         self._check_emergency_limits()
+        self._refresh_daily_limit()
     
     def calculate_position_size(self, entry_price: float, stop_loss: float, 
-                          direction: str) -> Optional[PositionSize]:
+                          direction: str, symbol: Optional[str] = None) -> Optional[PositionSize]:
         """
         Calcule la taille de position optimale avec TP fixe ou ratio
         
@@ -81,6 +129,7 @@ class LiveRiskManager:
             entry_price: Prix d'entrée prévu
             stop_loss: Prix de stop loss
             direction: 'LONG' ou 'SHORT'
+            symbol: Symbole tradé (défaut: config['symbol'])
         
         Returns:
             PositionSize ou None si trop risqué
@@ -96,13 +145,10 @@ class LiveRiskManager:
                 return None
             
             # Calcul du risque par trade
-            max_risk_usdt = self.account_balance * self.config['max_balance_risk']
+            max_risk_usdt = self.account_balance * self.max_balance_risk
             
             # Distance prix/stop loss
-            if direction == 'LONG':
-                price_distance = entry_price - stop_loss
-            else:  # SHORT
-                price_distance = stop_loss - entry_price
+            price_distance = (entry_price - stop_loss) if direction == 'LONG' else (stop_loss - entry_price)
             
             if price_distance <= 0:
                 logger.error("❌ Stop loss invalide")
@@ -115,13 +161,13 @@ class LiveRiskManager:
             # Application des limites min/max
             usdt_value = max_quantity * entry_price
             
-            if usdt_value < self.config['min_position_size']:
+            if usdt_value < self.min_position_size:
                 logger.warning(f"❌ Position trop petite: {usdt_value:.2f} USDT")
                 return None
             
-            if usdt_value > self.config['max_position_size']:
+            if usdt_value > self.max_position_size:
                 # Réduction à la taille max
-                usdt_value = self.config['max_position_size']
+                usdt_value = self.max_position_size
                 max_quantity = usdt_value / entry_price
                 max_risk_usdt = max_quantity * risk_per_unit
             
@@ -129,7 +175,7 @@ class LiveRiskManager:
             take_profit = self._calculate_take_profit(entry_price, stop_loss, direction)
             
             # Formatage selon les règles Binance
-            quantity = self._format_quantity(max_quantity)
+            quantity = self._format_quantity(symbol or self.config.get('symbol'), max_quantity)
             
             position = PositionSize(
                 quantity=quantity,
@@ -142,18 +188,17 @@ class LiveRiskManager:
             )
             
             # 🔍 LOGS DÉTAILLÉS SELON LE MODE
-            tp_mode = self.config.get('tp_mode', 'ratio')
-            logger.info(f"📊 Position calculée: {quantity} @ {entry_price:.1f} USDT")
-            logger.info(f"   💰 Valeur: {position.usdt_value} USDT")
-            logger.info(f"   ⚠️ Risque: {position.risk_amount} USDT ({position.risk_percentage:.1f}%)")
-            logger.info(f"   🎯 Mode TP: {tp_mode}")
-            
-            if tp_mode == "fixed_percent":
-                tp_percent = self.config.get('tp_fixed_percent', 1.0)
-                logger.info(f"   📈 TP Fixe: {tp_percent}% du prix d'entrée")
-            else:
-                tp_ratio = self.config.get('tp_ratio', 1.0)
-                logger.info(f"   📈 TP Ratio: {tp_ratio}x le risque SL")
+            if logger.isEnabledFor(logging.INFO):
+                tp_mode = self.tp_mode
+                logger.info("📊 Position calculée: %s @ %.1f USDT", quantity, entry_price)
+                logger.info("   💰 Valeur: %s USDT", position.usdt_value)
+                logger.info("   ⚠️ Risque: %s USDT (%.1f%%)", position.risk_amount, position.risk_percentage)
+                logger.info("   🎯 Mode TP: %s", tp_mode)
+                
+                if tp_mode == "fixed_percent":
+                    logger.info("   📈 TP Fixe: %s%% du prix d'entrée", self.tp_fixed_percent)
+                else:
+                    logger.info("   📈 TP Ratio: %sx le risque SL", self.tp_ratio)
             
             return position
             
@@ -173,58 +218,41 @@ class LiveRiskManager:
         Returns:
             float: Prix de Take Profit
         """
+        # LONG: TP au-dessus du prix d'entrée (+1), SHORT: en-dessous (-1)
+        sign = 1 if direction == 'LONG' else -1
+        
         try:
-            tp_mode = self.config.get('tp_mode', 'ratio')
-            
-            if tp_mode == "fixed_percent":
+            if self.tp_mode == "fixed_percent":
                 # 🎯 MODE NOUVEAU: Pourcentage fixe du prix d'entrée
-                tp_percent = self.config.get('tp_fixed_percent', 1.0)  # 1% par défaut
+                tp_percent = self.tp_fixed_percent  # 1% par défaut
                 
-                if direction == 'LONG':
-                    # LONG: TP au-dessus du prix d'entrée
-                    take_profit = entry_price * (1 + tp_percent / 100)
-                    logger.debug(f"🔍 TP LONG fixe: {entry_price:.1f} + {tp_percent}% = {take_profit:.1f}")
-                else:  # SHORT
-                    # SHORT: TP en-dessous du prix d'entrée
-                    take_profit = entry_price * (1 - tp_percent / 100)
-                    logger.debug(f"🔍 TP SHORT fixe: {entry_price:.1f} - {tp_percent}% = {take_profit:.1f}")
+                take_profit = entry_price * (1 + sign * tp_percent / 100)
+                logger.debug("🔍 TP %s fixe: %.1f ± %s%% = %.1f", direction, entry_price, tp_percent, take_profit)
                 
                 # Calcul du ratio R/R pour information
-                if direction == 'LONG':
-                    sl_distance = entry_price - stop_loss
-                    tp_distance = take_profit - entry_price
-                else:  # SHORT
-                    sl_distance = stop_loss - entry_price
-                    tp_distance = entry_price - take_profit
+                sl_distance = sign * (entry_price - stop_loss)
+                tp_distance = sign * (take_profit - entry_price)
                 
                 rr_ratio = tp_distance / sl_distance if sl_distance > 0 else 0
-                logger.info(f"📊 TP Fixe {tp_percent}% → Ratio R/R: {rr_ratio:.2f}")
+                logger.info("📊 TP Fixe %s%% → Ratio R/R: %.2f", tp_percent, rr_ratio)
                 
             else:
                 # 📊 MODE ANCIEN: Ratio du risque SL (comportement original)
-                tp_ratio = self.config.get('tp_ratio', 1.0)
+                tp_ratio = self.tp_ratio
                 
-                if direction == 'LONG':
-                    tp_distance = (entry_price - stop_loss) * tp_ratio
-                    take_profit = entry_price + tp_distance
-                    logger.debug(f"🔍 TP LONG ratio: {entry_price:.1f} + {tp_distance:.1f} = {take_profit:.1f}")
-                else:  # SHORT
-                    tp_distance = (stop_loss - entry_price) * tp_ratio
-                    take_profit = entry_price - tp_distance
-                    logger.debug(f"🔍 TP SHORT ratio: {entry_price:.1f} - {tp_distance:.1f} = {take_profit:.1f}")
+                tp_distance = sign * (entry_price - stop_loss) * tp_ratio
+                take_profit = entry_price + sign * tp_distance
+                logger.debug("🔍 TP %s ratio: %.1f ± %.1f = %.1f", direction, entry_price, tp_distance, take_profit)
                 
-                logger.info(f"📊 TP Ratio {tp_ratio}x du risque SL")
+                logger.info("📊 TP Ratio %sx du risque SL", tp_ratio)
             
             return take_profit
             
         except Exception as e:
             logger.error(f"❌ Erreur calcul TP: {e}")
             # Fallback vers le mode ratio
-            tp_distance = abs(entry_price - stop_loss) * self.config.get('tp_ratio', 1.0)
-            if direction == 'LONG':
-                return entry_price + tp_distance
-            else:
-                return entry_price - tp_distance
+            tp_distance = abs(entry_price - stop_loss) * self.tp_ratio
+            return entry_price + sign * tp_distance
             
     def validate_trade(self, signal_confidence: float) -> Tuple[bool, str]:
         """
@@ -255,8 +283,15 @@ class LiveRiskManager:
     def record_trade(self, direction: str, entry_price: float, quantity: float, 
                     result: str, pnl: float):
         """Enregistre un trade terminé"""
+        now = time.time()
+        
+        # Changement de jour : remise à zéro avant de compter ce trade (comparaison de floats)
+        if not self._day_start <= now < self._day_end:
+            self.reset_daily_limits()
+            self._day_start, self._day_end = self._day_bounds(now)
+        
         trade = {
-            'timestamp': datetime.now(),
+            'timestamp': now,  # secondes epoch (time.time)
             'direction': direction,
             'entry_price': entry_price,
             'quantity': quantity,
@@ -266,13 +301,10 @@ class LiveRiskManager:
         
         self.all_trades.append(trade)
         
-        # Mise à jour des métriques journalières
-        today = datetime.now().date()
-        self.trades_today = [t for t in self.all_trades 
-                           if t['timestamp'].date() == today]
-        
-        self.daily_trades = len(self.trades_today)
-        self.daily_pnl = sum(t['pnl'] for t in self.trades_today)
+        # Mise à jour incrémentale des métriques journalières (O(1) par trade)
+        self.trades_today.append(trade)
+        self.daily_trades += 1
+        self.daily_pnl += pnl
         
         # Gestion des pertes consécutives
         if result == 'loss':
@@ -280,26 +312,26 @@ class LiveRiskManager:
         else:
             self.consecutive_losses = 0
         
-        logger.info(f"📝 Trade enregistré: {result.upper()} - PnL: {pnl:+.2f} USDT")
+        logger.info("📝 Trade enregistré: %s - PnL: %+.2f USDT", result.upper(), pnl)
         
         # Vérification des limites après trade
         self._check_emergency_limits()
+        self._refresh_daily_limit()
+    
+    def _refresh_daily_limit(self):
+        """Recalcule l'indicateur de limites journalières (à appeler après chaque changement de métriques)"""
+        self._daily_limit_hit = (
+            # Limite nombre de trades
+            self.daily_trades >= self.limits['max_daily_trades'] or
+            # Limite pertes journalières
+            self.daily_pnl <= -self.limits['max_daily_loss'] or
+            # Limite pertes consécutives
+            self.consecutive_losses >= self.limits['max_consecutive_losses']
+        )
     
     def _is_daily_limit_reached(self) -> bool:
         """Vérifie si les limites journalières sont atteintes"""
-        # Limite nombre de trades
-        if self.daily_trades >= self.limits['max_daily_trades']:
-            return True
-        
-        # Limite pertes journalières
-        if self.daily_pnl <= -self.limits['max_daily_loss']:
-            return True
-        
-        # Limite pertes consécutives
-        if self.consecutive_losses >= self.limits['max_consecutive_losses']:
-            return True
-        
-        return False
+        return self._daily_limit_hit
     
     def _check_emergency_limits(self):
         """Vérifie les limites d'urgence et active l'arrêt si nécessaire"""
@@ -321,10 +353,15 @@ class LiveRiskManager:
             self.stop_reason = reason
             logger.critical(f"🚨 ARRÊT D'URGENCE: {reason}")
     
-    def _format_quantity(self, quantity: float) -> float:
-        """Formate la quantité selon les règles Binance"""
-        # Pour BTCUSDT: 3 décimales
-        return round(quantity, 3)
+    def _format_quantity(self, symbol: Optional[str], quantity: float) -> float:
+        """Formate la quantité selon les règles Binance (arrondi inférieur au stepSize du symbole)"""
+        filters = self._symbol_filters.get(symbol)
+        if filters is None:
+            # Filtres inconnus - pour BTCUSDT: 3 décimales
+            return round(quantity, 3)
+        
+        step = filters['step']
+        return float((Decimal(str(quantity)) // step) * step)
     
     def get_risk_metrics(self) -> RiskMetrics:
         """Retourne les métriques de risque actuelles"""
@@ -349,19 +386,28 @@ class LiveRiskManager:
         elif metrics.consecutive_losses >= 3:
             status = "🟠 ATTENTION"
         
-        report = f"""
-📊 RAPPORT RISQUE - {status}
-💰 Solde: {self.account_balance:.2f} USDT
-📈 PnL Jour: {metrics.daily_pnl:+.2f} USDT
-📋 Trades Jour: {metrics.daily_trades}/{self.limits['max_daily_trades']}
-💥 Pertes Consécutives: {metrics.consecutive_losses}/{self.limits['max_consecutive_losses']}
-📉 Drawdown Max: {metrics.max_drawdown:.2f} USDT
-⚠️ Limite Utilisée: {metrics.risk_limit_used:.1f}%
-        """.strip()
+        values = (
+            status,
+            self.account_balance,
+            metrics.daily_pnl,
+            metrics.daily_trades, self.limits['max_daily_trades'],
+            metrics.consecutive_losses, self.limits['max_consecutive_losses'],
+            metrics.max_drawdown,
+            metrics.risk_limit_used
+        )
+        key = values + (self.stop_reason,)
+        
+        # Rien n'a changé depuis le dernier rapport : texte réutilisé
+        cached = self._report_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        report = _REPORT_FMT % values
         
         if self.emergency_stop:
             report += f"\n🚨 Raison arrêt: {self.stop_reason}"
         
+        self._report_cache = (key, report)
         return report
     
     def reset_daily_limits(self):
@@ -369,6 +415,7 @@ class LiveRiskManager:
         self.daily_pnl = 0.0
         self.daily_trades = 0
         self.trades_today = []
+        self._refresh_daily_limit()
         logger.info("🔄 Limites journalières réinitialisées")
     
     def override_emergency_stop(self, reason: str):
@@ -381,7 +428,7 @@ class LiveRiskManager:
     def simulate_trade_impact(self, position_size: PositionSize, result: str) -> Dict:
         """Simule l'impact d'un trade sur les métriques de risque"""
         if result == 'win':
-            pnl = position_size.risk_amount * self.config['tp_ratio']
+            pnl = position_size.risk_amount * self.tp_ratio
         else:
             pnl = -position_size.risk_amount
         
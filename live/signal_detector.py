@@ -4,50 +4,224 @@ Détecteur de signaux de trading en temps réel
 Réutilise la logique validée du backtest
 """
 import logging
+import functools
 from datetime import datetime
-from typing import Dict, Optional, Tuple
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
 from dataclasses import dataclass
+from collections import deque
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba optionnel : le noyau tourne alors en Python pur
+    njit = None
+    prange = range
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Disposition fixe du vecteur d'indicateurs (colonne -> clé, valeur par défaut)
+RSI5, RSI14, RSI21, RSI_MTF, HA_O, HA_C, CLOSE, EMA, EMA_SLOPE = range(9)
+_INDICATOR_KEYS = ('RSI_5', 'RSI_14', 'RSI_21', 'RSI_mtf', 'HA_open', 'HA_close', 'close', 'EMA', 'EMA_slope')
+_INDICATOR_DEFAULTS = (50.0, 50.0, 50.0, 50.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+# Bits du code retourné par _eval_signal
+RSI_LONG = 1     # RSI 5/14/21 en survente
+RSI_SHORT = 2    # RSI 5/14/21 en surachat
+LONG_OK = 4      # tous les filtres activés valident un LONG
+SHORT_OK = 8     # tous les filtres activés valident un SHORT
+
+def _eval_signal_py(ind, oversold, overbought, filt_ha, filt_trend, filt_mtf):
+    """Conditions RSI et filtres (HA, tendance EMA, RSI MTF) pour les deux directions, en un code binaire
+    
+    Sans branche sur les valeurs : fonctionne sur un vecteur (un tick) comme sur
+    une matrice transposée (une colonne par indicateur, tous les ticks d'un coup)
+    """
+    # Conditions RSI (même logique que le backtest)
+    rsi_long = (ind[RSI5] < oversold) & (ind[RSI14] < oversold) & (ind[RSI21] < oversold)
+    rsi_short = (ind[RSI5] > overbought) & (ind[RSI14] > overbought) & (ind[RSI21] > overbought)
+    
+    long_ok = True
+    short_ok = True
+    
+    # Confirmation Heikin Ashi : bougie verte / rouge
+    if filt_ha:
+        long_ok = long_ok & (ind[HA_C] > ind[HA_O])
+        short_ok = short_ok & (ind[HA_C] < ind[HA_O])
+    
+    # Filtre de tendance EMA
+    if filt_trend:
+        long_ok = long_ok & (ind[CLOSE] > ind[EMA]) & (ind[EMA_SLOPE] > 0)
+        short_ok = short_ok & (ind[CLOSE] < ind[EMA]) & (ind[EMA_SLOPE] < 0)
+    
+    # Filtre RSI multi-timeframe
+    if filt_mtf:
+        long_ok = long_ok & (ind[RSI_MTF] > 50)
+        short_ok = short_ok & (ind[RSI_MTF] < 50)
+    
+    return RSI_LONG * rsi_long + RSI_SHORT * rsi_short + LONG_OK * long_ok + SHORT_OK * short_ok
+
+def _batch_status_py(ind, oversold, overbought, filt_ha, filt_trend, filt_mtf, out):
+    """Code _eval_signal de chaque ligne de la matrice [N, 9] (lignes indépendantes -> parallélisable)"""
+    for i in prange(ind.shape[0]):
+        out[i] = _eval_signal(ind[i], oversold, overbought, filt_ha, filt_trend, filt_mtf)
+
+def _scan_states_py(status, out):
+    """Rejoue la machine à états pending de process_new_data sur les codes de chaque tick
+    
+    out[i, 0] / out[i, 1] passent à True quand un signal LONG / SHORT est validé au tick i
+    """
+    pending_long = False
+    pending_short = False
+    for i in range(status.shape[0]):
+        code = status[i]
+        
+        # Détection RSI (LONG prioritaire, comme en live)
+        if code & RSI_LONG and not pending_long:
+            pending_long = True
+        elif code & RSI_SHORT and not pending_short:
+            pending_short = True
+        
+        # Validation puis auto-reset des deux directions
+        if pending_long and code & LONG_OK:
+            out[i, 0] = True
+            pending_long = False
+            pending_short = False
+        elif pending_short and code & SHORT_OK:
+            out[i, 1] = True
+            pending_long = False
+            pending_short = False
+
+# Compilé en code machine si numba est disponible (cache disque entre les lancements)
+# nogil : les noyaux ne touchent aucun objet Python et libèrent le GIL,
+# un replay batch_scan dans un thread ne bloque donc pas la boucle de trading
+_eval_signal = njit(cache=True, nogil=True)(_eval_signal_py) if njit is not None else _eval_signal_py
+_batch_status = njit(parallel=True, cache=True, nogil=True)(_batch_status_py) if njit is not None else None
+_scan_states = njit(cache=True, nogil=True)(_scan_states_py) if njit is not None else _scan_states_py
+
+@dataclass(slots=True, frozen=True)
 class Signal:
-    """Structure d'un signal de trading"""
+    """Structure d'un signal de trading (immuable)"""
     timestamp: datetime
     direction: str  # 'LONG' ou 'SHORT'
     rsi_signal_time: datetime
     validation_time: datetime
     confidence: float
-    indicators: Dict
-    reasons: list
+    indicators: Mapping  # vue en lecture seule des indicateurs du tick
+    reasons: Tuple[str, ...]
 
 class LiveSignalDetector:
     """Détecteur de signaux temps réel basé sur la stratégie backtest"""
     
+    # Filtres optionnels : (clé de configuration, raison affichée, poids dans la confiance)
+    _FILTER_SPEC = (
+        ('filter_ha', "HA confirmation", 0.3),
+        ('filter_trend', "Trend EMA", 0.2),
+        ('filter_mtf_rsi', "RSI MTF", 0.1),
+    )
+    
     def __init__(self, config: Dict, filters_config: Dict):
         self.config = config
         self.filters = filters_config
         
-        # État des signaux pending
-        self.pending_long = False
-        self.pending_short = False
-        self.rsi_signal_timestamp_long = None
-        self.rsi_signal_timestamp_short = None
+        # Seuils et filtres figés à l'initialisation (pas de lookup dict à chaque tick)
+        self._oversold = float(config['rsi_oversold'])
+        self._overbought = float(config['rsi_overbought'])
+        self._filters_cached = {key: bool(filters_config.get(key, False)) for key, _, _ in self._FILTER_SPEC}
+        self._f_ha = self._filters_cached['filter_ha']
+        self._f_trend = self._filters_cached['filter_trend']
+        self._f_mtf = self._filters_cached['filter_mtf_rsi']
+        
+        # Raisons et confiance ne dépendent que des filtres activés : calculées une fois
+        self._filter_reasons, self._confidence = self._compute_filter_confidence()
+        
+        # État des signaux pending : [LONG, SHORT] -> horodatage RSI, None si rien en attente
+        # (drapeau et horodatage ne peuvent plus diverger)
+        self._pending = [None, None]
         
         # Callbacks
         self.on_signal_callbacks = []
         self.on_rsi_detection_callbacks = []
+        # Copies figées parcourues à chaque tick (reconstruites à chaque ajout)
+        self._signal_cbs = ()
+        self._rsi_cbs = ()
         
-        # Historique
-        self.signals_history = []
+        # Historique borné + compteurs (get_status sans parcours de l'historique)
+        self.history_size = 4096
+        self.signals_history = deque(maxlen=self.history_size)
+        self._total_count = 0
+        self._today_count = 0
+        self._today_date = None
         
+        # Vecteur d'indicateurs réutilisé à chaque tick (pas de dict reconstruit)
+        self._ind = np.empty(len(_INDICATOR_KEYS), dtype=np.float64)
+        # Compilation du noyau dès l'initialisation plutôt qu'au premier tick
+        self._ind[:] = _INDICATOR_DEFAULTS
+        _eval_signal(self._ind, self._oversold, self._overbought, self._f_ha, self._f_trend, self._f_mtf)
+        
+    @classmethod
+    def batch_scan(cls, ind_matrix: np.ndarray, config: Dict, filters_config: Dict) -> np.ndarray:
+        """
+        Rejoue la détection sur N ticks d'un coup (validation backtest, balayage de paramètres)
+        
+        ind_matrix : float64[N, 9], une colonne par indicateur dans l'ordre de _INDICATOR_KEYS
+        Retourne bool[N, 2] : signal LONG validé (colonne 0) / SHORT validé (colonne 1) à chaque tick
+        """
+        ind = np.ascontiguousarray(ind_matrix, dtype=np.float64)
+        params = (
+            float(config['rsi_oversold']),
+            float(config['rsi_overbought']),
+            bool(filters_config.get('filter_ha', False)),
+            bool(filters_config.get('filter_trend', False)),
+            bool(filters_config.get('filter_mtf_rsi', False))
+        )
+        
+        # Conditions de chaque tick : noyau parallèle (numba) ou vectorisation NumPy par colonne
+        if _batch_status is not None:
+            status = np.empty(ind.shape[0], dtype=np.int64)
+            _batch_status(ind, *params, status)
+        else:
+            status = np.asarray(_eval_signal_py(ind.T, *params), dtype=np.int64)
+        
+        # Machine à états pending : séquentielle par nature
+        signals = np.zeros((ind.shape[0], 2), dtype=np.bool_)
+        _scan_states(status, signals)
+        return signals
+    
+    @property
+    def pending_long(self) -> bool:
+        return self._pending[0] is not None
+    
+    @property
+    def pending_short(self) -> bool:
+        return self._pending[1] is not None
+    
+    @property
+    def rsi_signal_timestamp_long(self) -> Optional[datetime]:
+        return self._pending[0]
+    
+    @property
+    def rsi_signal_timestamp_short(self) -> Optional[datetime]:
+        return self._pending[1]
+    
     def add_signal_callback(self, callback):
         """Ajoute un callback appelé lors d'un nouveau signal"""
         self.on_signal_callbacks.append(callback)
+        self._signal_cbs = tuple(self.on_signal_callbacks)
     
     def add_rsi_detection_callback(self, callback):
         """Ajoute un callback appelé lors de la détection RSI"""
         self.on_rsi_detection_callbacks.append(callback)
+        self._rsi_cbs = tuple(self.on_rsi_detection_callbacks)
+    
+    @staticmethod
+    def _safe_dispatch(callbacks, label: str, *args):
+        """Appelle chaque callback en isolant ses erreurs"""
+        for callback in callbacks:
+            try:
+                callback(*args)
+            except Exception as e:
+                logger.error(f"❌ Erreur callback {label}: {e}")
     
     def process_new_data(self, market_data: Dict) -> Optional[Signal]:
         """
@@ -60,179 +234,94 @@ class LiveSignalDetector:
         indicators = market_data['indicators']
         current_time = market_data['timestamp']
         
+        # Évaluation de toutes les conditions en un seul appel du noyau
+        status = self._evaluate(indicators)
+        
         # Vérification RSI (détection de base)
-        rsi_long_signal = self._check_rsi_condition(indicators, 'long')
-        rsi_short_signal = self._check_rsi_condition(indicators, 'short')
+        rsi_long_signal = status & RSI_LONG
+        rsi_short_signal = status & RSI_SHORT
+        
+        pending = self._pending
         
         # Détection des nouveaux signaux RSI
-        if rsi_long_signal and not self.pending_long:
-            self.pending_long = True
-            self.rsi_signal_timestamp_long = current_time
-            logger.info(f"🎯 RSI LONG signal détecté à {current_time}")
+        if rsi_long_signal and pending[0] is None:
+            pending[0] = current_time
+            logger.info("🎯 RSI LONG signal détecté à %s", current_time)
             
             # Callback RSI détection
-            for callback in self.on_rsi_detection_callbacks:
-                try:
-                    callback('LONG', current_time, indicators)
-                except Exception as e:
-                    logger.error(f"Erreur callback RSI: {e}")
-        
-        elif rsi_short_signal and not self.pending_short:
-            self.pending_short = True
-            self.rsi_signal_timestamp_short = current_time
-            logger.info(f"🎯 RSI SHORT signal détecté à {current_time}")
+            if self._rsi_cbs:
+                self._safe_dispatch(self._rsi_cbs, "RSI", 'LONG', current_time, indicators)
+        
+        elif rsi_short_signal and pending[1] is None:
+            pending[1] = current_time
+            logger.info("🎯 RSI SHORT signal détecté à %s", current_time)
             
             # Callback RSI détection
-            for callback in self.on_rsi_detection_callbacks:
-                try:
-                    callback('SHORT', current_time, indicators)
-                except Exception as e:
-                    logger.error(f"Erreur callback RSI: {e}")
+            if self._rsi_cbs:
+                self._safe_dispatch(self._rsi_cbs, "RSI", 'SHORT', current_time, indicators)
         
         # Vérification des conditions complètes pour LONG
-        if self.pending_long:
-            signal = self._check_complete_conditions(indicators, current_time, 'LONG')
+        if pending[0] is not None:
+            signal = self._check_complete_conditions(indicators, current_time, 'LONG', status & LONG_OK)
             if signal:
-                self.pending_long = False
-                self.rsi_signal_timestamp_long = None
+                pending[0] = None
                 self._trigger_signal(signal)
                 return signal
         
         # Vérification des conditions complètes pour SHORT
-        if self.pending_short:
-            signal = self._check_complete_conditions(indicators, current_time, 'SHORT')
+        if pending[1] is not None:
+            signal = self._check_complete_conditions(indicators, current_time, 'SHORT', status & SHORT_OK)
             if signal:
-                self.pending_short = False
-                self.rsi_signal_timestamp_short = None
+                pending[1] = None
                 self._trigger_signal(signal)
                 return signal
         
         return None
     
-    def _check_rsi_condition(self, indicators: Dict, direction: str) -> bool:
-        """Vérifie les conditions RSI (même logique que le backtest)"""
+    def _evaluate(self, indicators: Dict) -> int:
+        """Copie les indicateurs dans le vecteur fixe et évalue RSI + filtres (voir _eval_signal)"""
+        ind = self._ind
         try:
-            rsi_5 = indicators.get('RSI_5', 50)
-            rsi_14 = indicators.get('RSI_14', 50)
-            rsi_21 = indicators.get('RSI_21', 50)
-            
-            if direction == 'long':
-                return (rsi_5 < self.config['rsi_oversold'] and 
-                       rsi_14 < self.config['rsi_oversold'] and 
-                       rsi_21 < self.config['rsi_oversold'])
-            elif direction == 'short':
-                return (rsi_5 > self.config['rsi_overbought'] and 
-                       rsi_14 > self.config['rsi_overbought'] and 
-                       rsi_21 > self.config['rsi_overbought'])
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Erreur vérification RSI: {e}")
-            return False
-    
-    def _check_ha_confirmation(self, indicators: Dict, direction: str) -> bool:
-        """Vérifie la confirmation Heikin Ashi"""
-        try:
-            ha_close = indicators.get('HA_close', 0)
-            ha_open = indicators.get('HA_open', 0)
-            
-            if direction == 'LONG':
-                return ha_close > ha_open  # Bougie verte
-            elif direction == 'SHORT':
-                return ha_close < ha_open  # Bougie rouge
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Erreur vérification HA: {e}")
-            return False
-    
-    def _check_trend_filter(self, indicators: Dict, direction: str) -> bool:
-        """Vérifie le filtre de tendance EMA"""
-        try:
-            current_price = indicators.get('close', 0)
-            ema = indicators.get('EMA', 0)
-            ema_slope = indicators.get('EMA_slope', 0)
-            
-            if direction == 'LONG':
-                return current_price > ema and ema_slope > 0
-            elif direction == 'SHORT':
-                return current_price < ema and ema_slope < 0
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Erreur vérification trend: {e}")
-            return False
-    
-    def _check_mtf_rsi_filter(self, indicators: Dict, direction: str) -> bool:
-        """Vérifie le filtre RSI multi-timeframe"""
-        try:
-            rsi_mtf = indicators.get('RSI_mtf', 50)
-            
-            if direction == 'LONG':
-                return rsi_mtf > 50
-            elif direction == 'SHORT':
-                return rsi_mtf < 50
-            
-            return False
-            
-        except Exception as e:
-            logger.error(f"Erreur vérification MTF RSI: {e}")
-            return False
+            for i, key in enumerate(_INDICATOR_KEYS):
+                ind[i] = indicators.get(key, _INDICATOR_DEFAULTS[i])
+        except (TypeError, ValueError) as e:
+            logger.error(f"Erreur lecture indicateurs: {e}")
+            return 0
+        
+        return int(_eval_signal(
+            ind, self._oversold, self._overbought, self._f_ha, self._f_trend, self._f_mtf
+        ))
     
-    def _check_complete_conditions(self, indicators: Dict, current_time: datetime, direction: str) -> Optional[Signal]:
-        """Vérifie toutes les conditions pour valider un signal"""
+    def _compute_filter_confidence(self) -> Tuple[Tuple[str, ...], float]:
+        """Raisons et confiance d'un signal validé (tous les filtres activés sont passés)"""
         reasons = []
-        confidence = 0.0
         
         # RSI déjà validé (pending = True)
-        reasons.append(f"RSI {direction.lower()}")
-        confidence += 0.4
-        
-        # Vérification des filtres activés
-        filters_passed = 0
-        total_filters = 0
-        
-        # Filtre Heikin Ashi
-        if self.filters.get('filter_ha', False):
-            total_filters += 1
-            if self._check_ha_confirmation(indicators, direction):
-                reasons.append("HA confirmation")
-                confidence += 0.3
-                filters_passed += 1
-            else:
-                return None  # Filtre obligatoire non passé
-        
-        # Filtre tendance
-        if self.filters.get('filter_trend', False):
-            total_filters += 1
-            if self._check_trend_filter(indicators, direction):
-                reasons.append("Trend EMA")
-                confidence += 0.2
-                filters_passed += 1
-            else:
-                return None  # Filtre obligatoire non passé
-        
-        # Filtre RSI MTF
-        if self.filters.get('filter_mtf_rsi', False):
-            total_filters += 1
-            if self._check_mtf_rsi_filter(indicators, direction):
-                reasons.append("RSI MTF")
-                confidence += 0.1
-                filters_passed += 1
-            else:
-                return None  # Filtre obligatoire non passé
+        confidence = 0.4
+        
+        # Filtres activés
+        for key, reason, weight in self._FILTER_SPEC:
+            if self._filters_cached[key]:
+                reasons.append(reason)
+                confidence += weight
         
         # Calcul de la confiance finale
-        if total_filters > 0:
-            filter_confidence = filters_passed / total_filters
-            confidence = min(confidence + filter_confidence * 0.3, 1.0)
+        if reasons:
+            confidence = min(confidence + 0.3, 1.0)
+        
+        return tuple(reasons), confidence
+    
+    def _check_complete_conditions(self, indicators: Dict, current_time: datetime, direction: str,
+                                   filters_ok: bool) -> Optional[Signal]:
+        """Vérifie toutes les conditions pour valider un signal (filters_ok : résultat des filtres du noyau)"""
+        if not filters_ok:
+            return None  # Filtre obligatoire non passé
+        
+        reasons = (f"RSI {direction.lower()}", *self._filter_reasons)
+        confidence = self._confidence
         
         # Récupération du timestamp RSI initial
-        rsi_timestamp = (self.rsi_signal_timestamp_long if direction == 'LONG' 
-                        else self.rsi_signal_timestamp_short)
+        rsi_timestamp = self._pending[0 if direction == 'LONG' else 1]
         
         # Création du signal
         signal = Signal(
@@ -241,23 +330,14 @@ class LiveSignalDetector:
             rsi_signal_time=rsi_timestamp,
             validation_time=current_time,
             confidence=round(confidence, 2),
-            indicators=indicators.copy(),
+            # Le data manager fournit déjà une copie par tick : vue sans nouvelle copie
+            indicators=MappingProxyType(indicators),
             reasons=reasons
         )
         
-        logger.info(f"✅ Signal {direction} validé - Confiance: {confidence:.1%}")
+        logger.info("✅ Signal %s validé - Confiance: %.1f%%", direction, confidence * 100)
         return signal
     
-    def _trigger_signal(self, signal: Signal):
-        """Déclenche les callbacks pour un nouveau signal"""
-        self.signals_history.append(signal)
-        
-        for callback in self.on_signal_callbacks:
-            try:
-                callback(signal)
-            except Exception as e:
-                logger.error(f"Erreur callback signal: {e}")
-    
     def get_status(self) -> Dict:
         """Retourne le statut du détecteur"""
         return {
@@ -265,50 +345,71 @@ class LiveSignalDetector:
             'pending_short': self.pending_short,
             'rsi_long_since': self.rsi_signal_timestamp_long,
             'rsi_short_since': self.rsi_signal_timestamp_short,
-            'signals_today': len([s for s in self.signals_history 
-                                if s.timestamp.date() == datetime.now().date()]),
-            'total_signals': len(self.signals_history)
+            'signals_today': self._today_count if self._today_date == datetime.now().date() else 0,
+            'total_signals': self._total_count
         }
     
     def reset_pending_signals(self):
         """Reset manuel des signaux pending (pour debugging)"""
-        self.pending_long = False
-        self.pending_short = False
-        self.rsi_signal_timestamp_long = None
-        self.rsi_signal_timestamp_short = None
+        self._pending[0] = None
+        self._pending[1] = None
         logger.info("🔄 Signaux pending réinitialisés")
 
     def _trigger_signal(self, signal: Signal):
         """Déclenche les callbacks pour un nouveau signal ET reset automatique"""
         self.signals_history.append(signal)
+        self._total_count += 1
         
-        for callback in self.on_signal_callbacks:
-            try:
-                callback(signal)
-            except Exception as e:
-                logger.error(f"❌ Erreur callback signal: {e}")
+        # Compteur du jour remis à zéro au changement de date
+        today = signal.timestamp.date()
+        if today != self._today_date:
+            self._today_date = today
+            self._today_count = 0
+        self._today_count += 1
+        
+        if self._signal_cbs:
+            self._safe_dispatch(self._signal_cbs, "signal", signal)
         
         # 🆕 AUTO-RESET après déclenchement pour éviter les signaux en double
-        logger.info(f"🔄 Auto-reset après signal {signal.direction}")
+        logger.info("🔄 Auto-reset après signal %s", signal.direction)
         self.reset_pending_signals()
         
+# Gabarit des messages de signal (rempli par format_signal_message)
+_MSG_TEMPLATE = """🚨 SIGNAL {direction} 
+📅 {hms}
+⏱️ Attente: {wait_min}.{wait_tenth}min
+📊 Confiance: {confidence:.1%}
+🔍 Filtres: {reasons}
+
+📈 Indicateurs:
+• RSI 5/14/21: {rsi5:.1f}/{rsi14:.1f}/{rsi21:.1f}
+• RSI MTF: {rsi_mtf:.1f}
+• HA: {ha}"""
+
+@functools.lru_cache(maxsize=256)
+def _fmt_time(dt: datetime, fmt: str) -> str:
+    """strftime mémoïsé (dt tronqué à la seconde par l'appelant)"""
+    return dt.strftime(fmt)
+
 # Fonction utilitaire pour formater un signal
 def format_signal_message(signal: Signal) -> str:
     """Formate un signal pour affichage/notification"""
-    wait_time = signal.validation_time - signal.rsi_signal_time
-    wait_minutes = wait_time.total_seconds() / 60
+    ind = signal.indicators
     
-    message = f"""
-🚨 SIGNAL {signal.direction} 
-📅 {signal.validation_time.strftime('%H:%M:%S')}
-⏱️ Attente: {wait_minutes:.1f}min
-📊 Confiance: {signal.confidence:.1%}
-🔍 Filtres: {', '.join(signal.reasons)}
-
-📈 Indicateurs:
-• RSI 5/14/21: {signal.indicators.get('RSI_5', 0):.1f}/{signal.indicators.get('RSI_14', 0):.1f}/{signal.indicators.get('RSI_21', 0):.1f}
-• RSI MTF: {signal.indicators.get('RSI_mtf', 0):.1f}
-• HA: {'🟢' if signal.indicators.get('HA_close', 0) > signal.indicators.get('HA_open', 0) else '🔴'}
-    """.strip()
+    # Attente en dixièmes de minute (arithmétique entière, arrondi au plus proche)
+    wait = signal.validation_time - signal.rsi_signal_time
+    wait_tenths = (wait.days * 86400 + wait.seconds + 3) // 6
     
-    return message
\ No newline at end of file
+    return _MSG_TEMPLATE.format_map({
+        'direction': signal.direction,
+        'hms': _fmt_time(signal.validation_time.replace(microsecond=0), '%H:%M:%S'),
+        'wait_min': wait_tenths // 10,
+        'wait_tenth': wait_tenths % 10,
+        'confidence': signal.confidence,
+        'reasons': ', '.join(signal.reasons),
+        'rsi5': ind.get('RSI_5', 0),
+        'rsi14': ind.get('RSI_14', 0),
+        'rsi21': ind.get('RSI_21', 0),
+        'rsi_mtf': ind.get('RSI_mtf', 0),
+        'ha': '🟢' if ind.get('HA_close', 0) > ind.get('HA_open', 0) else '🔴'
+    })
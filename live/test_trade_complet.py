@@ -7,72 +7,113 @@ Correction: Gestion appropriée de la précision des quantités selon les règle
 """
 import time
 import sys
-import math
+import threading
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_EVEN
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Ajout du chemin des modules
 sys.path.append(str(Path(__file__).parent))
 
 from binance_client import BinanceFuturesClient
-from config_live import TRADING_CONFIG, SAFETY_LIMITS
+from price_stream import BookTickerStream
+from user_data_stream import UserDataStream
+from tests._testutils import load_api_keys
 
-def load_api_keys():
-    """Charge les clés API depuis .env"""
-    try:
-        with open('.env', 'r') as f:
-            keys = {}
-            for line in f:
-                if '=' in line and not line.startswith('#'):
-                    key, value = line.strip().split('=', 1)
-                    keys[key] = value
-            return keys.get('BINANCE_API_KEY'), keys.get('BINANCE_API_SECRET')
-    except FileNotFoundError:
-        print("❌ Fichier .env non trouvé")
-        return None, None
+# Choix utilisateur -> (direction, côté d'entrée, côté de fermeture)
+_DIRECTION_TABLE = {
+    "1": ("LONG", "BUY", "SELL"),
+    "2": ("SHORT", "SELL", "BUY"),
+}
+
+# Cache des règles de précision par symbole (exchangeInfo est un gros payload)
+_EXCHANGE_INFO_CACHE = {"ts": 0.0, "by_symbol": {}, "fetch": None}
+
+# Règles connues (rarement modifiées) : utilisées si exchangeInfo n'est pas encore chargé et tarde à répondre
+_KNOWN_PRECISION = {
+    "BTCUSDC": {'quantityPrecision': 3, 'pricePrecision': 1, 'stepSize': 0.001, 'minQty': 0.001, 'tickSize': 0.1},
+}
+_KNOWN_PRECISION_WAIT = 0.5  # secondes d'attente d'exchangeInfo avant de se rabattre sur les règles connues
+
+def _with_decimal_steps(precision_info):
+    """Ajoute les pas exacts (Decimal), calculés une fois plutôt qu'à chaque formatage"""
+    precision_info['step_dec'] = Decimal(str(precision_info.get('stepSize', 0)))
+    precision_info['tick_dec'] = Decimal(str(precision_info.get('tickSize', 0)))
+    return precision_info
+
+def _build_precision_info(symbol_info):
+    """Règles de précision d'un symbole, filtres lus en une seule passe"""
+    precision_info = {
+        'quantityPrecision': symbol_info['quantityPrecision'],
+        'pricePrecision': symbol_info['pricePrecision'],
+        'baseAssetPrecision': symbol_info['baseAssetPrecision']
+    }
+    
+    for filter_info in symbol_info['filters']:
+        filter_type = filter_info['filterType']
+        if filter_type == 'LOT_SIZE':
+            precision_info['stepSize'] = float(filter_info['stepSize'])
+            precision_info['minQty'] = float(filter_info['minQty'])
+            precision_info['maxQty'] = float(filter_info['maxQty'])
+        elif filter_type == 'PRICE_FILTER':
+            precision_info['tickSize'] = float(filter_info['tickSize'])
+            precision_info['minPrice'] = float(filter_info['minPrice'])
+            precision_info['maxPrice'] = float(filter_info['maxPrice'])
+        elif filter_type == 'MIN_NOTIONAL':
+            precision_info['minNotional'] = float(filter_info['notional'])
+    
+    return _with_decimal_steps(precision_info)
+
+def _fetch_exchange_info(client):
+    """Télécharge exchangeInfo et remplace le cache indexé par symbole"""
+    info, error = client._execute_request(client.client.futures_exchange_info)
+    if error:
+        print(f"❌ Erreur récupération exchange info: {error}")
+        return
+    
+    _EXCHANGE_INFO_CACHE["by_symbol"] = {
+        symbol_info['symbol']: _build_precision_info(symbol_info)
+        for symbol_info in info['symbols']
+    }
+    _EXCHANGE_INFO_CACHE["ts"] = time.time()
+
+def _load_exchange_info(client, ttl=3600, wait=None):
+    """
+    Charge exchangeInfo au plus une fois par ttl secondes et l'indexe par symbole
+    
+    Le téléchargement tourne en arrière-plan ; wait borne l'attente (None = jusqu'à la fin).
+    Passé ce délai le cache est rendu tel quel (ancien, ou vide s'il n'a jamais été chargé).
+    """
+    if time.time() - _EXCHANGE_INFO_CACHE["ts"] <= ttl:
+        return _EXCHANGE_INFO_CACHE
+    
+    fetch = _EXCHANGE_INFO_CACHE["fetch"]
+    if fetch is None or not fetch.is_alive():
+        fetch = threading.Thread(target=_fetch_exchange_info, args=(client,))
+        fetch.daemon = True
+        fetch.start()
+        _EXCHANGE_INFO_CACHE["fetch"] = fetch
+    
+    fetch.join(wait)
+    return _EXCHANGE_INFO_CACHE
 
 def get_symbol_precision(client, symbol):
     """Récupère les informations de précision pour un symbole"""
     try:
-        # Récupération des informations d'échange
-        info, error = client._execute_request(client.client.futures_exchange_info)
-        if error:
-            print(f"❌ Erreur récupération exchange info: {error}")
-            return None
-        
-        # Recherche du symbole
-        for symbol_info in info['symbols']:
-            if symbol_info['symbol'] == symbol:
-                # Extraction des filtres
-                filters = symbol_info['filters']
-                precision_info = {
-                    'quantityPrecision': symbol_info['quantityPrecision'],
-                    'pricePrecision': symbol_info['pricePrecision'],
-                    'baseAssetPrecision': symbol_info['baseAssetPrecision']
-                }
-                
-                # Recherche du LOT_SIZE filter
-                for filter_info in filters:
-                    if filter_info['filterType'] == 'LOT_SIZE':
-                        precision_info['stepSize'] = float(filter_info['stepSize'])
-                        precision_info['minQty'] = float(filter_info['minQty'])
-                        precision_info['maxQty'] = float(filter_info['maxQty'])
-                        break
-                
-                # Recherche du PRICE_FILTER
-                for filter_info in filters:
-                    if filter_info['filterType'] == 'PRICE_FILTER':
-                        precision_info['tickSize'] = float(filter_info['tickSize'])
-                        precision_info['minPrice'] = float(filter_info['minPrice'])
-                        precision_info['maxPrice'] = float(filter_info['maxPrice'])
-                        break
-                
-                # Recherche du MIN_NOTIONAL
-                for filter_info in filters:
-                    if filter_info['filterType'] == 'MIN_NOTIONAL':
-                        precision_info['minNotional'] = float(filter_info['notional'])
-                        break
-                
-                return precision_info
+        # Attente bornée seulement si des règles connues peuvent prendre le relais
+        known = _KNOWN_PRECISION.get(symbol)
+        cache = _load_exchange_info(client, wait=_KNOWN_PRECISION_WAIT if known else None)
+        
+        precision_info = cache["by_symbol"].get(symbol)
+        if precision_info is not None:
+            return precision_info
+        
+        if not cache["ts"]:
+            # exchangeInfo jamais chargé (lent ou en erreur)
+            if known is None:
+                return None
+            print(f"⚠️ exchangeInfo indisponible - règles connues utilisées pour {symbol}")
+            return _with_decimal_steps(dict(known))
         
         print(f"❌ Symbole {symbol} non trouvé")
         return None
@@ -82,40 +123,24 @@ def get_symbol_precision(client, symbol):
         return None
 
 def format_quantity(quantity, step_size):
-    """Formate la quantité selon le stepSize de Binance"""
-    if step_size == 0:
+    """Formate la quantité selon le stepSize de Binance (step_size : float ou Decimal précalculé)"""
+    step = step_size if isinstance(step_size, Decimal) else Decimal(str(step_size))
+    if not step:
         return quantity
     
-    # Calcul du nombre de décimales nécessaires
-    step_str = f"{step_size:.10f}".rstrip('0')
-    if '.' in step_str:
-        decimals = len(step_str.split('.')[1])
-    else:
-        decimals = 0
-    
-    # Arrondi vers le bas pour éviter les erreurs de balance
-    precision_factor = 10 ** decimals
-    formatted_qty = math.floor(quantity * precision_factor) / precision_factor
-    
-    return round(formatted_qty, decimals)
+    # Arrondi vers le bas en décimal exact : pas d'erreur d'ULP (-1111 Precision)
+    steps = (Decimal(str(quantity)) / step).to_integral_value(rounding=ROUND_DOWN)
+    return float(steps * step)
 
 def format_price(price, tick_size):
-    """Formate le prix selon le tickSize de Binance"""
-    if tick_size == 0:
+    """Formate le prix selon le tickSize de Binance (tick_size : float ou Decimal précalculé)"""
+    tick = tick_size if isinstance(tick_size, Decimal) else Decimal(str(tick_size))
+    if not tick:
         return price
     
-    # Calcul du nombre de décimales nécessaires
-    tick_str = f"{tick_size:.10f}".rstrip('0')
-    if '.' in tick_str:
-        decimals = len(tick_str.split('.')[1])
-    else:
-        decimals = 0
-    
     # Arrondi au tick size le plus proche
-    precision_factor = 10 ** decimals
-    formatted_price = round(price / tick_size) * tick_size
-    
-    return round(formatted_price, decimals)
+    ticks = (Decimal(str(price)) / tick).to_integral_value(rounding=ROUND_HALF_EVEN)
+    return float(ticks * tick)
 
 def test_trade_complet():
     """Test complet d'un trade avec SL/TP et précision correcte"""
@@ -136,16 +161,13 @@ def test_trade_complet():
     print("2. SHORT (vendre)")
     direction_choice = input("Votre choix (1 ou 2): ")
     
-    if direction_choice == "1":
-        direction = "LONG"
-        side = "BUY"
-    elif direction_choice == "2":
-        direction = "SHORT"
-        side = "SELL"
-    else:
+    try:
+        direction, side, close_side = _DIRECTION_TABLE[direction_choice]
+    except KeyError:
         print("❌ Choix invalide")
         return
     
+    client = None
     try:
         # 1. Connexion Binance
         print("\n📡 1. Connexion à Binance...")
@@ -155,23 +177,33 @@ def test_trade_complet():
             return
         
         client = BinanceFuturesClient(api_key, api_secret, testnet=False)
+        # Connexion déjà ouverte par connect() : le ping la garde chaude pendant les confirmations
+        client.start_keepalive()
+        
+        # Étapes 2 à 4 indépendantes : les trois requêtes partent en parallèle
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            precision_future = executor.submit(get_symbol_precision, client, "BTCUSDC")  # USDC pour testnet
+            balance_future = executor.submit(client.get_account_balance, "USDC")
+            price_future = executor.submit(client.get_current_price, "BTCUSDC")
         
         # 2. Récupération des informations de précision
         print("🔧 2. Récupération des règles de précision...")
-        precision_info = get_symbol_precision(client, "BTCUSDC")  # USDC pour testnet
+        precision_info = precision_future.result()
         if not precision_info:
             print("❌ Impossible de récupérer les informations de précision")
             return
         
-        print(f"✅ Précision quantité: {precision_info['quantityPrecision']} décimales")
-        print(f"✅ Step Size: {precision_info['stepSize']}")
-        print(f"✅ Quantité min: {precision_info['minQty']}")
-        print(f"✅ Tick Size: {precision_info['tickSize']}")
-        print(f"✅ Notional min: {precision_info.get('minNotional', 'N/A')}")
+        sys.stdout.write(
+            f"✅ Précision quantité: {precision_info['quantityPrecision']} décimales\n"
+            f"✅ Step Size: {precision_info['stepSize']}\n"
+            f"✅ Quantité min: {precision_info['minQty']}\n"
+            f"✅ Tick Size: {precision_info['tickSize']}\n"
+            f"✅ Notional min: {precision_info.get('minNotional', 'N/A')}\n"
+        )
         
         # 3. Vérification du solde (USDC pour testnet)
         print("💰 3. Vérification du solde TESTNET...")
-        balance, error = client.get_account_balance("USDC")
+        balance, error = balance_future.result()
         if error:
             print(f"❌ Erreur solde: {error}")
             return
@@ -185,7 +217,7 @@ def test_trade_complet():
         
         # 4. Prix actuel
         print("📊 4. Récupération prix actuel...")
-        current_price, error = client.get_current_price("BTCUSDC")
+        current_price, error = price_future.result()
         if error:
             print(f"❌ Erreur prix: {error}")
             return
@@ -208,16 +240,17 @@ def test_trade_complet():
             take_profit_raw = current_price * 0.995
         
         # Formatage des prix selon tick size
-        stop_loss = format_price(stop_loss_raw, precision_info['tickSize'])
-        take_profit = format_price(take_profit_raw, precision_info['tickSize'])
-        entry_price = format_price(current_price, precision_info['tickSize'])
+        tick_dec = precision_info['tick_dec']
+        stop_loss = format_price(stop_loss_raw, tick_dec)
+        take_profit = format_price(take_profit_raw, tick_dec)
+        entry_price = format_price(current_price, tick_dec)
         
         # Calcul de la quantité avec précision correcte
         sl_distance = abs(entry_price - stop_loss)
         quantity_raw = risk_amount / sl_distance
         
         # Formatage de la quantité selon step size
-        quantity = format_quantity(quantity_raw, precision_info['stepSize'])
+        quantity = format_quantity(quantity_raw, precision_info['step_dec'])
         
         # Vérification quantité minimum
         if quantity < precision_info['minQty']:
@@ -234,20 +267,21 @@ def test_trade_complet():
             print(f"❌ Valeur position ({position_value:.2f}) inférieure au minimum notional ({precision_info['minNotional']})")
             return
         
-        print(f"✅ Entry: {entry_price:.1f} USDC")
-        print(f"✅ Stop Loss: {stop_loss:.1f} USDC")
-        print(f"✅ Take Profit: {take_profit:.1f} USDC")
-        print(f"✅ Quantité: {quantity} BTC")
-        print(f"✅ Valeur position: {position_value:.2f} USDC")
-        print(f"✅ Risque: {risk_amount:.2f} USDC")
-        
-        # Confirmation finale
-        print(f"\n📋 RÉSUMÉ DU TRADE {direction}:")
-        print(f"Direction: {direction}")
-        print(f"Quantité: {quantity} BTC (formatée selon step size)")
-        print(f"Valeur: {position_value:.2f} USDC")
-        print(f"Risque max: {risk_amount:.2f} USDC")
-        print(f"Gain potentiel: {(risk_amount * 0.5):.2f} USDC")
+        # Détail puis résumé écrits en un seul appel
+        sys.stdout.write(
+            f"✅ Entry: {entry_price:.1f} USDC\n"
+            f"✅ Stop Loss: {stop_loss:.1f} USDC\n"
+            f"✅ Take Profit: {take_profit:.1f} USDC\n"
+            f"✅ Quantité: {quantity} BTC\n"
+            f"✅ Valeur position: {position_value:.2f} USDC\n"
+            f"✅ Risque: {risk_amount:.2f} USDC\n"
+            f"\n📋 RÉSUMÉ DU TRADE {direction}:\n"
+            f"Direction: {direction}\n"
+            f"Quantité: {quantity} BTC (formatée selon step size)\n"
+            f"Valeur: {position_value:.2f} USDC\n"
+            f"Risque max: {risk_amount:.2f} USDC\n"
+            f"Gain potentiel: {(risk_amount * 0.5):.2f} USDC\n"
+        )
         
         final_confirm = input("\nConfirmer l'exécution du trade (yes/no): ")
         if final_confirm.lower() != 'yes':
@@ -265,42 +299,41 @@ def test_trade_complet():
         executed_price = float(entry_result.get('avgPrice', current_price))
         print(f"✅ Prix d'exécution: {executed_price:.1f} USDC")
         
-        # 7. Ordre Stop Loss
+        # 7-8. Stop Loss et Take Profit envoyés ensemble (un seul aller-retour batch)
         print("🛑 7. Placement Stop Loss...")
-        close_side = "SELL" if direction == "LONG" else "BUY"
-        
-        sl_result, error = client.place_stop_order("BTCUSDC", close_side, quantity, stop_loss)
+        print("🎯 8. Placement Take Profit...")
+        (sl_result, error), (tp_result, tp_error) = client.place_sl_tp_orders(
+            "BTCUSDC", close_side, quantity, stop_loss, take_profit
+        )
         if error:
             print(f"❌ Erreur Stop Loss: {error}")
             print("⚠️ ATTENTION: Position ouverte sans SL ! Fermer manuellement.")
         else:
             print(f"✅ Stop Loss placé: {sl_result.get('orderId')}")
         
-        # 8. Ordre Take Profit
-        print("🎯 8. Placement Take Profit...")
-        tp_result, error = client.place_limit_order("BTCUSDC", close_side, quantity, take_profit)
-        if error:
-            print(f"❌ Erreur Take Profit: {error}")
+        if tp_error:
+            print(f"❌ Erreur Take Profit: {tp_error}")
             print("⚠️ ATTENTION: Position ouverte sans TP ! Fermer manuellement.")
         else:
             print(f"✅ Take Profit placé: {tp_result.get('orderId')}")
         
         # 9. Résumé final
-        print("\n🎉 TRADE CRÉÉ AVEC SUCCÈS !")
-        print("="*60)
-        print(f"Direction: {direction}")
-        print(f"Quantité: {quantity} BTC")
-        print(f"Prix d'entrée: {executed_price:.1f} USDC")
-        print(f"Stop Loss: {stop_loss:.1f} USDC")
-        print(f"Take Profit: {take_profit:.1f} USDC")
-        
-        if 'sl_result' in locals() and sl_result:
-            print(f"SL Order ID: {sl_result.get('orderId')}")
-        if 'tp_result' in locals() and tp_result:
-            print(f"TP Order ID: {tp_result.get('orderId')}")
-        
-        print("\n🔍 Surveillez votre position sur Binance !")
-        print("⚠️ Le trade sera automatiquement fermé par SL ou TP")
+        summary = [
+            "\n🎉 TRADE CRÉÉ AVEC SUCCÈS !",
+            "=" * 60,
+            f"Direction: {direction}",
+            f"Quantité: {quantity} BTC",
+            f"Prix d'entrée: {executed_price:.1f} USDC",
+            f"Stop Loss: {stop_loss:.1f} USDC",
+            f"Take Profit: {take_profit:.1f} USDC",
+        ]
+        if sl_result:
+            summary.append(f"SL Order ID: {sl_result.get('orderId')}")
+        if tp_result:
+            summary.append(f"TP Order ID: {tp_result.get('orderId')}")
+        summary.append("\n🔍 Surveillez votre position sur Binance !")
+        summary.append("⚠️ Le trade sera automatiquement fermé par SL ou TP")
+        sys.stdout.write('\n'.join(summary) + '\n')
         
         # 10. Surveillance basique (optionnelle)
         monitor = input("\nVoulez-vous surveiller la position ? (yes/no): ")
@@ -308,21 +341,65 @@ def test_trade_complet():
             print("\n📊 Surveillance de la position...")
             print("Appuyez sur Ctrl+C pour arrêter la surveillance")
             
+            # Prix poussé par le flux bookTicker : plus de requête REST à chaque rafraîchissement
+            price_stream = BookTickerStream(testnet=False)
+            price_stream.subscribe("BTCUSDC")
+            price_stream.start()
+            
+            # Exécution du SL ou du TP poussée par le User Data Stream : fin de surveillance automatique
+            exit_orders = {
+                order['orderId']: label
+                for order, label in ((sl_result, "Stop Loss"), (tp_result, "Take Profit"))
+                if order
+            }
+            closed = threading.Event()
+            closed_by = []
+            
+            def on_order_update(order):
+                label = exit_orders.get(order.get('i'))
+                if label and order.get('X') == 'FILLED':
+                    closed_by.append((label, float(order.get('ap', 0))))
+                    closed.set()
+            
+            user_stream = UserDataStream(client)
+            user_stream.add_order_update_callback(on_order_update)
+            user_stream.start()
+            
+            # Affichage limité à 4 Hz et seulement si la ligne change ; repli REST au rythme d'origine (5 s)
+            write, flush = sys.stdout.write, sys.stdout.flush
+            last_line = None
+            last_rest = 0.0
+            
             try:
-                while True:
-                    current_price, _ = client.get_current_price("BTCUSDC")
+                while not closed.is_set():
+                    current_price = price_stream.get_mid_price("BTCUSDC")
+                    if current_price is None and time.monotonic() - last_rest >= 5:
+                        # Flux pas encore connecté ou cotation trop ancienne : repli REST
+                        last_rest = time.monotonic()
+                        current_price, _ = client.get_current_price("BTCUSDC")
                     if current_price:
                         if direction == "LONG":
                             pnl = (current_price - executed_price) * quantity
                         else:
                             pnl = (executed_price - current_price) * quantity
                         
-                        print(f"Prix: {current_price:.1f} USDC | PnL: {pnl:+.2f} USDC", end='\r')
+                        # Mise à jour en place : une écriture + flush explicite (pas de fin de ligne)
+                        line = f"Prix: {current_price:.1f} USDC | PnL: {pnl:+.2f} USDC"
+                        if line != last_line:
+                            write(f"\r{line}     ")
+                            flush()
+                            last_line = line
                     
-                    time.sleep(5)
+                    closed.wait(0.25)
+                
+                label, exit_price = closed_by[0]
+                print(f"\n🏁 Position fermée par {label} à {exit_price:.1f} USDC")
                     
             except KeyboardInterrupt:
                 print("\n📊 Surveillance arrêtée")
+            finally:
+                price_stream.stop()
+                user_stream.stop()
         
         print("\n✅ Test terminé avec succès !")
         return True
@@ -332,6 +409,10 @@ def test_trade_complet():
         import traceback
         traceback.print_exc()
         return False
+    
+    finally:
+        if client is not None:
+            client.shutdown()
 
 def test_precision_info():
     """Teste uniquement la récupération des informations de précision"""
@@ -0,0 +1,15 @@
+# _testutils.py
+"""
+Utilitaires partagés par les scripts de test live
+"""
+
+def load_api_keys():
+    """Charge les clés API depuis live/.env via le parseur de config_live (lu une seule fois, mis en cache)"""
+    try:
+        # Import différé : config_live lit les clés dès son import et lève une erreur sans .env
+        from config_live import load_api_credentials_from_env
+        return (load_api_credentials_from_env("BINANCE_API_KEY"),
+                load_api_credentials_from_env("BINANCE_API_SECRET"))
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        return None, None
@@ -20,13 +20,20 @@ def test_indicators():
         print("✅ Import OK")
         
         # Données de test simples
+        # OHLCV en un seul tirage (générateur PCG64 seedé : données reproductibles)
+        rng = np.random.default_rng(42)
+        ohlcv = rng.uniform(
+            low=[40000, 41000, 39000, 40000, 100],
+            high=[42000, 43000, 41000, 42000, 1000],
+            size=(100, 5)
+        )
         data = {
             'timestamp': pd.date_range('2025-01-01', periods=100, freq='5min'),
-            'open': np.random.uniform(40000, 42000, 100),
-            'high': np.random.uniform(41000, 43000, 100),
-            'low': np.random.uniform(39000, 41000, 100),
-            'close': np.random.uniform(40000, 42000, 100),
-            'volume': np.random.uniform(100, 1000, 100)
+            'open': ohlcv[:, 0],
+            'high': ohlcv[:, 1],
+            'low': ohlcv[:, 2],
+            'close': ohlcv[:, 3],
+            'volume': ohlcv[:, 4]
         }
         
         df = pd.DataFrame(data)
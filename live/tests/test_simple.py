@@ -2,16 +2,15 @@
 """
 Test de connexion basique sans tous les indicateurs
 """
-import os
 from binance_client import BinanceFuturesClient
+from tests._testutils import load_api_keys
 
 def test_connection():
     """Test simple de connexion"""
     print("🧪 Test de connexion Binance...")
     
     # Configuration
-    api_key = "0LnNG"
-    api_secret = "8K"
+    api_key, api_secret = load_api_keys()
 
     if not api_key or not api_secret:
         print("❌ Clés API manquantes")
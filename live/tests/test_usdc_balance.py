@@ -1,10 +1,13 @@
 # test_usdc_balance.py
 from binance_client import BinanceFuturesClient
+from tests._testutils import load_api_keys
 
 def test_usdc_balance():
-    # Vos clés API
-    api_key = "0NG"
-    api_secret = "EaK"
+    # Clés API (.env)
+    api_key, api_secret = load_api_keys()
+    if not api_key or not api_secret:
+        print("❌ Clés API manquantes")
+        return
     
     client = BinanceFuturesClient(api_key, api_secret, testnet=False)
     
@@ -0,0 +1,94 @@
+# trade_archive.py
+"""
+Archive SQLite des trades terminés
+Écriture asynchrone : le thread de trading ne fait qu'empiler les trades
+"""
+import logging
+import queue
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+class TradeArchive:
+    """Archive des trades terminés dans une table SQLite (thread d'écriture dédié)"""
+
+    COLUMNS = (
+        "trade_id", "symbol", "direction", "quantity", "entry_price", "exit_price",
+        "stop_loss", "take_profit", "pnl", "exit_reason", "opened_at", "closed_at"
+    )
+
+    def __init__(self, filename: str, table: str = "live_trades", batch_size: int = 100):
+        self.filename = filename
+        self.table = table
+        self.batch_size = batch_size
+
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._writer_loop)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def add(self, trade):
+        """Met un trade terminé en file d'écriture (non bloquant)"""
+        self._queue.put((
+            trade.trade_id,
+            trade.symbol,
+            trade.direction,
+            trade.quantity,
+            trade.entry_price,
+            trade.exit_price,
+            trade.stop_loss,
+            trade.take_profit,
+            trade.pnl,
+            trade.exit_reason,
+            trade.opened_at.isoformat() if trade.opened_at else None,
+            trade.closed_at.isoformat() if trade.closed_at else None
+        ))
+
+    def close(self, timeout: float = 5.0):
+        """Écrit les trades en attente puis arrête le thread d'écriture"""
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+
+    def _writer_loop(self):
+        """Vide la file par lots (executemany) dans la base SQLite"""
+        try:
+            # Connexion créée dans ce thread : sqlite3 interdit le partage entre threads
+            conn = sqlite3.connect(self.filename)
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                f"({', '.join(self.COLUMNS)})"
+            )
+            conn.commit()
+        except Exception as e:
+            logger.error(f"❌ Erreur ouverture archive trades {self.filename}: {e}")
+            return
+
+        insert_sql = (
+            f"INSERT INTO {self.table} ({', '.join(self.COLUMNS)}) "
+            f"VALUES ({', '.join('?' * len(self.COLUMNS))})"
+        )
+
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if None in batch:
+                running = False
+                batch = [row for row in batch if row is not None]
+
+            if not batch:
+                continue
+
+            try:
+                conn.executemany(insert_sql, batch)
+                conn.commit()
+            except Exception as e:
+                logger.error(f"❌ Erreur écriture archive trades: {e}")
+
+        conn.close()
@@ -0,0 +1,162 @@
+# user_data_stream.py
+"""
+Flux WebSocket "User Data Stream" Binance Futures
+Pousse les mises à jour d'ordres (ORDER_TRADE_UPDATE) au lieu de les interroger en REST
+"""
+import logging
+import json
+import time
+import threading
+from typing import Callable, Dict
+import websocket
+from binance_client import BinanceFuturesClient
+
+logger = logging.getLogger(__name__)
+
+class UserDataStream:
+    """Flux des événements du compte (ordres) via listenKey"""
+
+    def __init__(self, binance_client: BinanceFuturesClient):
+        self.client = binance_client
+
+        # WebSocket
+        self.ws = None
+        self.ws_thread = None
+        self.ws_running = False
+        self.listen_key = None
+        self.reconnect_attempts = 0
+        self.max_reconnects = 5
+        self.should_run = False
+
+        # Keepalive du listenKey (expire après 60 min sans keepalive)
+        self.keepalive_interval = 30 * 60  # secondes
+        self._stop_event = threading.Event()
+        self.keepalive_thread = None
+
+        # Callbacks
+        self.on_order_update_callbacks = []
+
+        # Dernière mise à jour
+        self.last_update = None
+
+    def add_order_update_callback(self, callback: Callable[[Dict], None]):
+        """Ajoute un callback appelé avec l'objet ordre ('o') de chaque ORDER_TRADE_UPDATE"""
+        self.on_order_update_callbacks.append(callback)
+
+    def start(self) -> bool:
+        """Crée le listenKey et démarre le WebSocket"""
+        if self.ws_running:
+            return True
+
+        try:
+            result, error = self.client._execute_request(self.client.client.futures_stream_get_listen_key)
+            if error:
+                logger.error(f"❌ Erreur création listenKey: {error}")
+                return False
+
+            # python-binance renvoie directement la clé (ou le dict brut selon la version)
+            self.listen_key = result['listenKey'] if isinstance(result, dict) else result
+            self.should_run = True
+            self._stop_event.clear()
+
+            base_url = "wss://fstream.binance.com" if not self.client.testnet else "wss://stream.binancefuture.com"
+            ws_url = f"{base_url}/ws/{self.listen_key}"
+
+            logger.info("🔌 Connexion User Data Stream...")
+
+            self.ws = websocket.WebSocketApp(
+                ws_url,
+                on_open=self._on_ws_open,
+                on_message=self._on_ws_message,
+                on_error=self._on_ws_error,
+                on_close=self._on_ws_close
+            )
+
+            self.ws_thread = threading.Thread(target=self.ws.run_forever, kwargs={"skip_utf8_validation": True})
+            self.ws_thread.daemon = True
+            self.ws_thread.start()
+
+            if self.keepalive_thread is None or not self.keepalive_thread.is_alive():
+                self.keepalive_thread = threading.Thread(target=self._keepalive_loop)
+                self.keepalive_thread.daemon = True
+                self.keepalive_thread.start()
+
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Erreur démarrage User Data Stream: {e}")
+            return False
+
+    def stop(self):
+        """Arrête le WebSocket et le keepalive"""
+        self.should_run = False
+        self._stop_event.set()
+        if self.ws:
+            self.ws_running = False
+            self.ws.close()
+            logger.info("🔌 User Data Stream fermé")
+
+    def is_connected(self) -> bool:
+        """Indique si les événements d'ordres sont actuellement reçus"""
+        return self.ws_running
+
+    def _keepalive_loop(self):
+        """Prolonge périodiquement la validité du listenKey"""
+        while not self._stop_event.wait(self.keepalive_interval):
+            _, error = self.client._execute_request(
+                self.client.client.futures_stream_keepalive,
+                listenKey=self.listen_key
+            )
+            if error:
+                logger.warning(f"⚠️ Erreur keepalive listenKey: {error}")
+
+    def _on_ws_open(self, ws):
+        """Callback ouverture WebSocket"""
+        logger.info("✅ User Data Stream connecté")
+        self.ws_running = True
+        self.reconnect_attempts = 0
+
+    def _on_ws_message(self, ws, message):
+        """Callback réception message WebSocket"""
+        try:
+            data = json.loads(message)
+            event_type = data.get('e')
+            self.last_update = time.monotonic()
+
+            if event_type == 'ORDER_TRADE_UPDATE':
+                order = data.get('o', {})
+                for callback in self.on_order_update_callbacks:
+                    try:
+                        callback(order)
+                    except Exception as e:
+                        logger.error(f"❌ Erreur callback ordre: {e}")
+
+            elif event_type == 'listenKeyExpired':
+                # Plus aucun événement ne sera reçu : les appelants repassent en REST
+                logger.warning("⚠️ listenKey expiré - reconnexion du User Data Stream")
+                self.ws_running = False
+                ws.close()
+
+        except Exception as e:
+            logger.error(f"❌ Erreur traitement message User Data Stream: {e}")
+
+    def _on_ws_error(self, ws, error):
+        """Callback erreur WebSocket"""
+        logger.error(f"❌ Erreur User Data Stream: {error}")
+
+    def _on_ws_close(self, ws, close_status_code, close_msg):
+        """Callback fermeture WebSocket"""
+        logger.warning(f"⚠️ User Data Stream fermé: {close_status_code} - {close_msg}")
+        self.ws_running = False
+
+        if not self.should_run:
+            return
+
+        # Tentative de reconnexion (nouveau listenKey)
+        if self.reconnect_attempts < self.max_reconnects:
+            self.reconnect_attempts += 1
+            logger.info(f"🔄 Reconnexion User Data Stream {self.reconnect_attempts}/{self.max_reconnects}")
+            time.sleep(5)
+            self.start()
+        else:
+            logger.error("❌ Max tentatives de reconnexion User Data Stream atteint")
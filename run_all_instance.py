@@ -3,11 +3,13 @@ import sys
 import time
 import argparse
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 def find_bot_dirs(base_dir, only=None):
-    dirs = [d for d in os.listdir(base_dir)
-            if d.startswith("bot_") and os.path.isdir(os.path.join(base_dir, d))]
+    # scandir : le type de chaque entrée vient de la lecture du dossier (pas de stat par entrée)
+    with os.scandir(base_dir) as it:
+        dirs = [e.name for e in it if e.name.startswith("bot_") and e.is_dir()]
     dirs.sort()
     if only:
         wanted = set(only)
@@ -22,36 +24,15 @@ def pick_python(bot_dir):
             return exe
     return sys.executable
 
-def make_console_bat(bot_dir, python_exe):
-    """Crée un .bat qui lance main.py, montre la sortie et reste ouvert."""
-    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-    bat_path = os.path.join(bot_dir, f"_run_main_{ts}.bat")
-    content = f"""@echo off
-setlocal
-cd /d "%~dp0"
-title {os.path.basename(bot_dir)}
-echo [INFO] Dossier: %CD%
-echo [INFO] Python: {python_exe}
-echo [INFO] Lancement: "{python_exe}" -u main.py
-echo.
-"{python_exe}" -u main.py
-echo.
-echo [TERMINE] %DATE% %TIME%
-pause
-"""
-    with open(bat_path, "w", encoding="utf-8") as f:
-        f.write(content)
-    return bat_path
-
 def launch_console(bot_dir):
-    """Lance le .bat dans une nouvelle fenêtre via 'start' (fiable)."""
+    """Lance main.py dans une nouvelle fenêtre cmd qui reste ouverte (sans .bat intermédiaire)."""
     python_exe = pick_python(bot_dir)
-    bat = make_console_bat(bot_dir, python_exe)
     title = os.path.basename(bot_dir)
 
     # 'start' est une commande interne de cmd → shell=True requis
-    # Le premier argument entre guillemets après start est le titre
-    cmd = f'start "{title}" "{bat}"'
+    # Le premier argument entre guillemets après start est le titre ;
+    # cmd /k retire la paire de guillemets externe et garde la fenêtre ouverte
+    cmd = f'start "{title}" cmd /k ""{python_exe}" -u main.py & echo. & echo [TERMINE] & pause"'
     subprocess.Popen(cmd, cwd=bot_dir, shell=True, close_fds=True)
 
 def launch_background(bot_dir):
@@ -75,14 +56,39 @@ def launch_background(bot_dir):
         close_fds=True,
     )
 
+# Modules lourds communs aux bots (importés une fois pour chauffer le cache disque de l'OS)
+WARMUP_MODULES = ("numpy", "pandas", "binance.client", "websocket")
+VENV_EXCLUDE_RE = r"[\\/](\.?venv|env)[\\/]"
+
+def prewarm(bot_paths):
+    """Précompile le bytecode de chaque bot et importe une fois les gros modules par interpréteur."""
+    python_exes = set()
+    for bot_path in bot_paths:
+        python_exe = pick_python(bot_path)
+        python_exes.add(python_exe)
+        # __pycache__ rempli d'avance : aucun bot ne recompile ses .py au démarrage
+        # (venv local exclu : pick_python le cherche dans le dossier du bot)
+        subprocess.run([python_exe, "-m", "compileall", "-q", "-x", VENV_EXCLUDE_RE, bot_path],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       creationflags=subprocess.CREATE_NO_WINDOW)
+
+    imports = "; ".join(f"import {m}" for m in WARMUP_MODULES)
+    for python_exe in python_exes:
+        # Échec ignoré (module absent d'un venv) : simple optimisation
+        subprocess.run([python_exe, "-c", imports],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       creationflags=subprocess.CREATE_NO_WINDOW)
+
 def main():
     parser = argparse.ArgumentParser(description="Lancer tous les bot_*/main.py (Windows).")
     parser.add_argument("--mode", choices=["console", "background"], default="console",
                         help="console = fenêtre par bot (live), background = sans fenêtre (logs).")
-    parser.add_argument("--delay", type=float, default=0.4,
-                        help="Pause entre lancements (éviter collisions).")
+    parser.add_argument("--delay", type=float, default=0.0,
+                        help="Pause entre lancements (0 = tous les bots lancés en parallèle).")
     parser.add_argument("--only", nargs="*", default=None,
                         help="Ne lancer que certains dossiers (ex: --only bot_final bot_abc).")
+    parser.add_argument("--no-warmup", action="store_true",
+                        help="Ne pas précompiler ni préimporter avant le lancement.")
     args = parser.parse_args()
 
     if os.name != "nt":
@@ -98,22 +104,34 @@ def main():
 
     print("Bots détectés:", bot_dirs)
 
-    for d in bot_dirs:
+    if not args.no_warmup:
+        print("Préchauffage (bytecode + imports)...")
+        prewarm([os.path.join(base_dir, d) for d in bot_dirs])
+
+    def launch(d):
         bot_path = os.path.join(base_dir, d)
         if not os.path.isfile(os.path.join(bot_path, "main.py")):
-            print(f" - {d}: aucun main.py, ignoré.")
-            continue
+            return f" - {d}: aucun main.py, ignoré."
 
         try:
             if args.mode == "console":
                 launch_console(bot_path)
-                print(f" - {d}: fenêtre ouverte (live).")
-            else:
-                launch_background(bot_path)
-                print(f" - {d}: lancé en arrière-plan (logs dans {d}\\logs).")
-            time.sleep(args.delay)
+                return f" - {d}: fenêtre ouverte (live)."
+            launch_background(bot_path)
+            return f" - {d}: lancé en arrière-plan (logs dans {d}\\logs)."
         except Exception as e:
-            print(f" - {d}: échec du lancement → {e}")
+            return f" - {d}: échec du lancement → {e}"
+
+    if args.delay > 0:
+        # Lancements échelonnés à la demande
+        for d in bot_dirs:
+            print(launch(d))
+            time.sleep(args.delay)
+    else:
+        # Chaque bot a son propre dossier et ses logs : Popen en parallèle
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            for message in executor.map(launch, bot_dirs):
+                print(message)
 
     print("Terminé.")
 